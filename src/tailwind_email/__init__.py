@@ -2,7 +2,7 @@
 tailwind-email: Transform HTML with Tailwind CSS classes into email-client-compatible HTML.
 """
 
-from tailwind_email.converter import TailwindEmailConverter, convert
+from tailwind_email.converter import TailwindEmailConverter, convert, convert_fragment
 
 __version__ = "0.1.0"
-__all__ = ["convert", "TailwindEmailConverter"]
+__all__ = ["convert", "convert_fragment", "TailwindEmailConverter"]
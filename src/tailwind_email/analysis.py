@@ -0,0 +1,177 @@
+"""
+Email size analysis.
+
+Attributes the bytes of a converted document to top-level sections, to
+inline styles versus markup and content, and to the utility classes that
+produced the styles. The accounting is collected while the converter
+processes and serializes the document, so no re-parse of the output is needed.
+"""
+
+from typing import Optional, Union
+
+from bs4 import BeautifulSoup, Tag
+
+# Gmail clips messages whose HTML exceeds roughly 102 KB
+GMAIL_CLIP_BYTES = 102 * 1024
+
+# Labels for bytes outside the body sections
+HEAD_SECTION = "head"
+DOCUMENT_SECTION = "document"
+
+# Byte categories
+STYLE = "style"
+MARKUP = "markup"
+CONTENT = "content"
+
+
+def find_sections(soup: Union[BeautifulSoup, Tag]) -> dict[int, str]:
+    """
+    Find the top-level sections of an email body.
+
+    Starting from <body>, single-child wrappers (the usual centering tables
+    and cells) are descended until an element with several element children
+    is found; those children are the sections.
+
+    Args:
+        soup: Parsed document
+
+    Returns:
+        Mapping of id(section element) -> section label
+    """
+    root = soup.body if soup.body is not None else soup
+    while True:
+        children = [child for child in root.children if isinstance(child, Tag)]
+        if len(children) != 1 or not children[0].contents:
+            break
+        root = children[0]
+
+    sections: dict[int, str] = {}
+    for index, child in enumerate(children, start=1):
+        label = f"{index}:{child.name}"
+        element_id = child.get("id")
+        if isinstance(element_id, str) and element_id:
+            label += f"#{element_id}"
+        sections[id(child)] = label
+    return sections
+
+
+class SizeReport:
+    """Byte accounting for a converted document."""
+
+    def __init__(self, budget: int = GMAIL_CLIP_BYTES) -> None:
+        """
+        Initialize the report.
+
+        Args:
+            budget: Size budget in bytes (default: Gmail's ~102 KB clipping limit)
+        """
+        self.budget = budget
+        self.total_bytes = 0
+        self.categories: dict[str, int] = {STYLE: 0, MARKUP: 0, CONTENT: 0}
+        self.sections: dict[str, int] = {}
+        self.classes: dict[str, int] = {}
+
+    @property
+    def style_bytes(self) -> int:
+        """Bytes in inline style attributes and <style> blocks."""
+        return self.categories[STYLE]
+
+    @property
+    def markup_bytes(self) -> int:
+        """Bytes in tags, non-style attributes and comments."""
+        return self.categories[MARKUP]
+
+    @property
+    def content_bytes(self) -> int:
+        """Bytes of text content."""
+        return self.categories[CONTENT]
+
+    @property
+    def over_budget(self) -> bool:
+        """Whether the document exceeds the size budget."""
+        return self.total_bytes > self.budget
+
+    @property
+    def warnings(self) -> list[str]:
+        """Human-readable warnings about the document size."""
+        if not self.over_budget:
+            return []
+        return [
+            f"Output is {self.total_bytes / 1024:.1f} KB, over the "
+            f"{self.budget / 1024:.1f} KB budget; Gmail clips messages above ~102 KB"
+        ]
+
+    def add(self, section: str, text: str, category: str, exclude: int = 0) -> int:
+        """
+        Account for a serialized chunk.
+
+        Args:
+            section: Section label the chunk belongs to
+            text: Serialized text
+            category: One of 'style', 'markup' or 'content'
+            exclude: Bytes of the chunk already accounted for elsewhere
+
+        Returns:
+            Number of bytes added
+        """
+        size = (len(text) if text.isascii() else len(text.encode("utf-8"))) - exclude
+        self.total_bytes += size
+        self.categories[category] += size
+        self.sections[section] = self.sections.get(section, 0) + size
+        return size
+
+    def add_class_bytes(self, cls: str, size: int) -> None:
+        """
+        Attribute inline style bytes to a utility class.
+
+        Args:
+            cls: Utility class name
+            size: Bytes of style declarations the class produced
+        """
+        self.classes[cls] = self.classes.get(cls, 0) + size
+
+    def top_sections(self, limit: Optional[int] = None) -> list[tuple[str, int]]:
+        """
+        Sections ordered by size, largest first.
+
+        Args:
+            limit: Maximum number of entries (default: all)
+
+        Returns:
+            List of (section label, bytes)
+        """
+        return sorted(self.sections.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def top_classes(self, limit: Optional[int] = None) -> list[tuple[str, int]]:
+        """
+        Utility classes ordered by the inline style bytes they produced.
+
+        Args:
+            limit: Maximum number of entries (default: all)
+
+        Returns:
+            List of (class name, bytes)
+        """
+        return sorted(self.classes.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def summary(self, limit: int = 10) -> str:
+        """
+        Render a plain-text summary of the report.
+
+        Args:
+            limit: Number of sections and classes to list
+
+        Returns:
+            Multi-line summary
+        """
+        lines = [
+            f"Total: {self.total_bytes} bytes (budget {self.budget})",
+            f"Style: {self.style_bytes}  Markup: {self.markup_bytes}  "
+            f"Content: {self.content_bytes}",
+        ]
+        lines.extend(self.warnings)
+        lines.append("Sections:")
+        lines.extend(f"  {label}: {size}" for label, size in self.top_sections(limit))
+        lines.append("Classes:")
+        lines.extend(f"  {cls}: {size}" for cls, size in self.top_classes(limit))
+        return "\n".join(lines)
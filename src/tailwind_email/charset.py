@@ -0,0 +1,62 @@
+"""
+Character encoding of HTML input.
+
+Bytes are decoded with the first of: the encoding the caller gives, a byte
+order mark, the charset declared by a <meta> element near the start of the
+document, and UTF-8. Output is always UTF-8; the serializer rewrites
+<meta charset> declarations to match.
+"""
+
+import codecs
+from typing import Optional
+
+from bs4.dammit import EncodingDetector
+
+# Encoding of input without a byte order mark or declaration
+DEFAULT_CHARSET = "utf-8"
+
+# Encoding of converted output (matches the serializer's <meta charset>)
+OUTPUT_CHARSET = "utf-8"
+
+# Leading bytes searched for a <meta> charset declaration
+DECLARATION_WINDOW = 4096
+
+_BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def detect_charset(data: bytes, encoding: Optional[str] = None) -> str:
+    """
+    Determine the encoding of HTML bytes.
+
+    Args:
+        data: HTML bytes
+        encoding: Encoding given by the caller, which wins when set
+
+    Returns:
+        Python codec name to decode the bytes with
+    """
+    if encoding:
+        return encoding
+
+    head = data[:DECLARATION_WINDOW]
+    for mark, name in _BYTE_ORDER_MARKS:
+        if head.startswith(mark):
+            return name
+
+    declared = EncodingDetector.find_declared_encoding(
+        head, is_html=True, search_entire_document=True
+    )
+    if not declared:
+        return DEFAULT_CHARSET
+    try:
+        codec = codecs.lookup(declared).name
+    except LookupError:
+        return DEFAULT_CHARSET
+    # The declaration was readable as ASCII, so it cannot be a 16/32-bit encoding
+    if codec.startswith(("utf-16", "utf-32")):
+        return DEFAULT_CHARSET
+    return declared
@@ -0,0 +1,280 @@
+"""
+Target email client profiles.
+
+A profile is compiled once per audience (a set of client families) from the
+support matrix in ``mappings.clients``. The transformer applies it when a
+class is first resolved, and caches the result, so declarations that no
+client in the audience renders are dropped, and client-specific additions
+are made, without any per-element work.
+
+A support report ANDs the client bitmask of every distinct declaration a
+document emits, so the clients that will ignore part of it are known as soon
+as the conversion finishes.
+"""
+
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Optional
+
+from tailwind_email.mappings.clients import (
+    ALL_CLIENTS,
+    CLIENT_ADDITIONS,
+    CLIENT_BITS,
+    CLIENTS,
+    FEATURE_SUPPORT,
+    PREFIX_SUPPORT,
+    PROPERTY_SUPPORT,
+    VALUE_SUPPORT,
+)
+
+# Property prefixes of client-specific declarations
+_VENDOR_PREFIXES = tuple(PREFIX_SUPPORT)
+
+
+def client_mask(clients: Iterable[str]) -> int:
+    """
+    Build the bitmask of a set of client families.
+
+    Args:
+        clients: Client names from CLIENTS
+
+    Returns:
+        Bitmask with one bit per client
+
+    Raises:
+        ValueError: If a client name is unknown
+    """
+    mask = 0
+    for name in clients:
+        if name not in CLIENT_BITS:
+            raise ValueError(
+                f"Unknown email client: {name!r} (expected one of {', '.join(CLIENTS)})"
+            )
+        mask |= CLIENT_BITS[name]
+    return mask
+
+
+def client_names(mask: int) -> list[str]:
+    """
+    List the client families in a bitmask.
+
+    Args:
+        mask: Client bitmask
+
+    Returns:
+        Client names in CLIENTS order
+    """
+    return [name for name in CLIENTS if mask & CLIENT_BITS[name]]
+
+
+def support_mask(prop: str, value: str) -> int:
+    """
+    Look up which clients render a declaration.
+
+    Args:
+        prop: CSS property name
+        value: CSS value
+
+    Returns:
+        Bitmask of supporting clients (ALL_CLIENTS for unlisted properties)
+    """
+    mask = VALUE_SUPPORT.get((prop, value))
+    if mask is not None:
+        return mask
+    mask = PROPERTY_SUPPORT.get(prop)
+    if mask is not None:
+        return mask
+    if prop.startswith("-") or prop.startswith("mso-"):
+        for prefix, prefix_mask in PREFIX_SUPPORT.items():
+            if prop.startswith(prefix):
+                return prefix_mask
+    return ALL_CLIENTS
+
+
+class ClientProfile:
+    """
+    Compiled declaration filter for an audience of email clients.
+
+    Profiles are immutable and shared; two profiles for the same audience
+    compare equal.
+    """
+
+    def __init__(self, mask: int) -> None:
+        """
+        Compile the profile.
+
+        Args:
+            mask: Bitmask of the target clients
+        """
+        self.mask = mask
+        self.clients = client_names(mask)
+        # Properties no target client renders
+        self.dropped_properties = frozenset(
+            prop for prop, support in PROPERTY_SUPPORT.items() if not support & mask
+        )
+        # Values no target client renders, for properties rendered otherwise
+        self.dropped_values = frozenset(
+            key for key, support in VALUE_SUPPORT.items() if not support & mask
+        )
+        self.dropped_prefixes = tuple(
+            prefix for prefix, support in PREFIX_SUPPORT.items() if not support & mask
+        )
+        # Trigger property -> declarations to add
+        self.additions: dict[str, dict[str, str]] = {}
+        for client in self.clients:
+            for prop, declarations in CLIENT_ADDITIONS.get(client, {}).items():
+                self.additions.setdefault(prop, {}).update(declarations)
+
+    def apply(self, properties: dict[str, str]) -> dict[str, str]:
+        """
+        Filter a class's declarations for the audience.
+
+        Args:
+            properties: CSS properties generated for a class
+
+        Returns:
+            New dictionary without dead declarations and with client additions
+        """
+        result: dict[str, str] = {}
+        for prop, value in properties.items():
+            if prop in self.dropped_properties or (prop, value) in self.dropped_values:
+                continue
+            if self.dropped_prefixes and prop.startswith(self.dropped_prefixes):
+                continue
+            result[prop] = value
+            extra = self.additions.get(prop)
+            if extra:
+                for added, added_value in extra.items():
+                    result.setdefault(added, added_value)
+        return result
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ClientProfile) and other.mask == self.mask
+
+    def __hash__(self) -> int:
+        return hash(self.mask)
+
+    def __repr__(self) -> str:
+        return f"ClientProfile({', '.join(self.clients)})"
+
+
+class SupportReport:
+    """
+    Which clients will ignore part of a document's CSS.
+
+    Filled in while the converter processes the document: each distinct
+    declaration is looked up once and its client bitmask ANDed into the
+    document's mask of clients that render everything.
+    """
+
+    def __init__(self, clients: int = ALL_CLIENTS) -> None:
+        """
+        Initialize the report.
+
+        Args:
+            clients: Bitmask of the clients to report on (default: all)
+        """
+        self.clients = clients
+        self.supported = clients
+        # Distinct (property, value) -> supporting clients
+        self.declarations: dict[tuple[str, str], int] = {}
+        # Stylesheet features such as '@media' -> supporting clients
+        self.features: dict[str, int] = {}
+
+    def add(self, properties: dict[str, str]) -> None:
+        """
+        Account for emitted declarations.
+
+        Vendor-prefixed declarations (mso-*, -webkit-*, ...) are written for
+        specific clients on purpose and are not counted against the others.
+
+        Args:
+            properties: CSS property -> value
+        """
+        seen = self.declarations
+        for item in properties.items():
+            prop, value = item
+            if "!" in value:
+                item = (prop, value.replace("!important", "").strip())
+            if item in seen or prop.startswith(_VENDOR_PREFIXES):
+                continue
+            mask = support_mask(*item)
+            seen[item] = mask
+            self.supported &= mask
+
+    def add_feature(self, feature: str) -> None:
+        """
+        Account for a stylesheet feature.
+
+        Args:
+            feature: Key of FEATURE_SUPPORT, such as '@media'
+        """
+        if feature not in self.features:
+            mask = FEATURE_SUPPORT.get(feature, ALL_CLIENTS)
+            self.features[feature] = mask
+            self.supported &= mask
+
+    @property
+    def supported_clients(self) -> list[str]:
+        """Clients that render every emitted declaration."""
+        return client_names(self.supported)
+
+    @property
+    def affected_clients(self) -> list[str]:
+        """Clients that ignore at least one emitted declaration."""
+        return client_names(self.clients & ~self.supported)
+
+    @property
+    def issues(self) -> dict[str, list[str]]:
+        """Ignored declarations and features per affected client."""
+        result: dict[str, list[str]] = {}
+        for client in self.affected_clients:
+            bit = CLIENT_BITS[client]
+            labels = {
+                f"{prop}: {value}" if (prop, value) in VALUE_SUPPORT else prop
+                for (prop, value), mask in self.declarations.items()
+                if not mask & bit
+            }
+            labels.update(feature for feature, mask in self.features.items() if not mask & bit)
+            result[client] = sorted(labels)
+        return result
+
+    def summary(self) -> str:
+        """
+        Render a plain-text summary of the report.
+
+        Returns:
+            Multi-line summary
+        """
+        if not self.affected_clients:
+            return "All clients render every declaration"
+        return "\n".join(
+            f"{client}: ignores {', '.join(labels)}" for client, labels in self.issues.items()
+        )
+
+
+def compile_profile(clients: Optional[Iterable[str]]) -> Optional[ClientProfile]:
+    """
+    Compile the profile for an audience, reusing earlier compilations.
+
+    Args:
+        clients: Target client names, or None for no filtering
+
+    Returns:
+        ClientProfile, or None when clients is None
+
+    Raises:
+        ValueError: If a client name is unknown or the audience is empty
+    """
+    if clients is None:
+        return None
+    mask = client_mask(clients)
+    if not mask:
+        raise ValueError("At least one target client is required")
+    return _compile_profile(mask)
+
+
+@lru_cache(maxsize=128)
+def _compile_profile(mask: int) -> ClientProfile:
+    """Compile a profile once per audience bitmask."""
+    return ClientProfile(mask)
@@ -5,14 +5,79 @@ This module provides the primary API for converting HTML with Tailwind classes
 to email-compatible HTML with inline styles.
 """
 
-from typing import Any, Optional
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Any, Optional, Union
 
-from bs4 import Tag
+from bs4 import BeautifulSoup, Tag
 
+from tailwind_email.analysis import GMAIL_CLIP_BYTES, SizeReport
+from tailwind_email.charset import DEFAULT_CHARSET, OUTPUT_CHARSET, detect_charset
+from tailwind_email.clients import SupportReport, compile_profile
 from tailwind_email.fallbacks import FallbackGenerator
+from tailwind_email.inliner import MatchedStyles, StylesheetIndex, build_index
+from tailwind_email.mappings.clients import ALL_CLIENTS
+from tailwind_email.mappings.variants import DARK_VARIANT
+from tailwind_email.mime import html_part
+from tailwind_email.optimizer import (
+    INHERITED_PROPERTIES,
+    collapse_shorthands,
+    declared_properties,
+    prune_inherited,
+)
 from tailwind_email.parser import TailwindClassParser
+from tailwind_email.plan import (
+    ConversionPlan,
+    ElementKey,
+    element_keys,
+    is_spliceable,
+    splice,
+)
+from tailwind_email.plugins import PluginRegistry, VisitContext
+from tailwind_email.recorder import SlowConversionRecorder
+from tailwind_email.serializer import HTMLSerializer
+from tailwind_email.stylesheet import (
+    DEFAULT_CLASS_PREFIX,
+    VARIANT_CLASS_PREFIX,
+    SharedStyleExtractor,
+    VariantStylesheet,
+    insert_head_style,
+)
+from tailwind_email.subtrees import SubtreeIndex, copy_converted
+from tailwind_email.template import TemplatePlaceholders
+from tailwind_email.text import PlainTextRenderer
+from tailwind_email.theme import (
+    ThemeConfig,
+    ThemeTables,
+    compile_theme,
+    is_affected,
+    theme_changes,
+)
 from tailwind_email.transformer import CSSTransformer
-from tailwind_email.utils import merge_styles
+from tailwind_email.utils import parse_style_string
+
+# Size-reduction stages tried in order when output exceeds the budget,
+# as (stage name, option name, option value)
+BUDGET_FALLBACK_STAGES: tuple[tuple[str, str, Any], ...] = (
+    ("collapse_shorthands", "collapse_shorthands", True),
+    ("prune_inherited", "prune_inherited", True),
+    ("hybrid_styles", "compatibility", "modern"),
+    ("minify", "minify", True),
+)
+
+# Splits component CSS into candidate class names for reload invalidation
+_CSS_TOKEN = re.compile(r"[\s;{}]+")
+
+# Single worker so background theme reloads apply in submission order
+_RELOAD_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="theme-reload")
 
 
 class ConversionOptions:
@@ -26,17 +91,69 @@ class ConversionOptions:
         include_mso_properties: bool = True,
         preserve_classes: bool = False,
         preserve_unsupported_classes: bool = True,
+        collapse_shorthands: bool = False,
+        minify: bool = False,
+        prune_inherited: bool = False,
+        analyze_size: bool = False,
+        size_budget: int = GMAIL_CLIP_BYTES,
+        fit_to_budget: bool = False,
+        variant_styles: bool = False,
+        inline_style_blocks: bool = False,
+        component_css: Optional[str] = None,
+        theme: Optional[ThemeConfig] = None,
+        target_clients: Optional[list[str]] = None,
+        analyze_support: bool = False,
+        preserve_templates: bool = False,
+        plain_text: bool = False,
     ) -> None:
         """
         Initialize conversion options.
 
         Args:
-            compatibility: Compatibility mode ('strict' or 'modern')
+            compatibility: Compatibility mode ('strict' inlines everything;
+                'modern' moves repeated declaration sets into a shared head
+                <style> block and keeps layout-critical properties inline)
             base_font_size: Base font size for rem/em conversion (default: 16)
             include_vml_fallbacks: Include VML fallbacks for Outlook (default: True)
             include_mso_properties: Include MSO-specific CSS properties (default: True)
             preserve_classes: Keep original Tailwind classes in output (default: False)
             preserve_unsupported_classes: Keep non-Tailwind classes (default: True)
+            collapse_shorthands: Fold complete longhand sets into shorthands
+                such as padding, margin, border-radius and border (default: False)
+            minify: Minify output during serialization: collapse whitespace
+                outside <pre>, compact styles, drop empty attributes (default: False)
+            prune_inherited: Drop inherited-property declarations that equal the
+                parent's computed value (default: False)
+            analyze_size: Attribute output bytes to sections, styles and utility
+                classes while converting (default: False)
+            size_budget: Output size budget in bytes; larger documents are flagged
+                (default: 102 KB, Gmail's clipping limit)
+            fit_to_budget: When the output exceeds size_budget, re-convert with
+                progressively more size-reduction stages enabled (default: False)
+            variant_styles: Emit responsive (sm:, md:, max-md:, ...) and dark:
+                variant classes as @media rules in a head <style> block
+                instead of dropping them (default: False)
+            inline_style_blocks: Inline simple rules from head <style> blocks
+                (type, class, id, attribute and descendant selectors) during
+                the same traversal; @apply directives are expanded (default: False)
+            component_css: Component stylesheet (e.g. '.btn { @apply px-6 py-3; }')
+                whose rules are inlined wherever they match; rules that
+                cannot be inlined are added to the head (default: None)
+            theme: Theme configuration (dict or JSON string) whose 'colors',
+                'spacing' and 'fonts' sections extend or override the
+                built-in mappings (default: None)
+            target_clients: Email clients the output is for (e.g. ['outlook',
+                'gmail']); declarations none of them render are dropped and
+                client-specific ones such as mso-* are added or removed to
+                match (default: None, no filtering)
+            analyze_support: Report which email clients (of target_clients,
+                or all) ignore some of the emitted CSS (default: False)
+            preserve_templates: Treat the input as template source: Jinja and
+                Handlebars regions ({{ ... }}, {% ... %}, {{#each}}, ...) are
+                kept intact in text and attributes, and classes containing
+                them are left for render time (default: False)
+            plain_text: Also render a text/plain alternative of the document
+                while serializing it (default: False)
         """
         self.compatibility = compatibility
         self.base_font_size = base_font_size
@@ -44,6 +161,178 @@ class ConversionOptions:
         self.include_mso_properties = include_mso_properties
         self.preserve_classes = preserve_classes
         self.preserve_unsupported_classes = preserve_unsupported_classes
+        self.collapse_shorthands = collapse_shorthands
+        self.minify = minify
+        self.prune_inherited = prune_inherited
+        self.analyze_size = analyze_size
+        self.size_budget = size_budget
+        self.fit_to_budget = fit_to_budget
+        self.variant_styles = variant_styles
+        self.inline_style_blocks = inline_style_blocks
+        self.component_css = component_css
+        self.theme = theme
+        self.target_clients = target_clients
+        self.analyze_support = analyze_support
+        self.preserve_templates = preserve_templates
+        self.plain_text = plain_text
+
+    @classmethod
+    def from_dict(cls, options: dict[str, Any]) -> "ConversionOptions":
+        """
+        Create options from a dictionary, ignoring unknown keys.
+
+        Args:
+            options: Dictionary of option names to values
+
+        Returns:
+            ConversionOptions instance
+        """
+        conversion_options = cls()
+        for name in conversion_options.to_dict():
+            if name in options:
+                setattr(conversion_options, name, options[name])
+        return conversion_options
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert options to a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary of option names to values
+        """
+        return {
+            "compatibility": self.compatibility,
+            "base_font_size": self.base_font_size,
+            "include_vml_fallbacks": self.include_vml_fallbacks,
+            "include_mso_properties": self.include_mso_properties,
+            "preserve_classes": self.preserve_classes,
+            "preserve_unsupported_classes": self.preserve_unsupported_classes,
+            "collapse_shorthands": self.collapse_shorthands,
+            "minify": self.minify,
+            "prune_inherited": self.prune_inherited,
+            "analyze_size": self.analyze_size,
+            "size_budget": self.size_budget,
+            "fit_to_budget": self.fit_to_budget,
+            "variant_styles": self.variant_styles,
+            "inline_style_blocks": self.inline_style_blocks,
+            "component_css": self.component_css,
+            "theme": self.theme,
+            "target_clients": self.target_clients,
+            "analyze_support": self.analyze_support,
+            "preserve_templates": self.preserve_templates,
+            "plain_text": self.plain_text,
+        }
+
+    def copy(self) -> "ConversionOptions":
+        """
+        Create an independent copy of the options.
+
+        Returns:
+            ConversionOptions instance with the same values
+        """
+        return ConversionOptions.from_dict(self.to_dict())
+
+
+class ConversionResult:
+    """Converted HTML together with conversion diagnostics."""
+
+    def __init__(
+        self,
+        html: str,
+        timings: Optional[dict[str, float]] = None,
+        bytes_saved: Optional[dict[str, int]] = None,
+        size_report: Optional[SizeReport] = None,
+        fallback_stages: Optional[list[str]] = None,
+        support_report: Optional[SupportReport] = None,
+        text: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the result.
+
+        Args:
+            html: Converted HTML
+            timings: Phase timings in milliseconds
+            bytes_saved: Bytes removed from the output per optimization stage
+            size_report: Byte accounting, when size analysis is enabled
+            fallback_stages: Size-reduction stages enabled to fit the budget
+            support_report: Client support of the emitted CSS, when support
+                analysis is enabled
+            text: Plain-text alternative, when plain_text is enabled
+        """
+        self.html = html
+        self.timings = timings or {}
+        self.bytes_saved = bytes_saved or {}
+        self.size_report = size_report
+        self.fallback_stages = fallback_stages or []
+        self.support_report = support_report
+        self.text = text
+
+    @property
+    def size(self) -> int:
+        """Size of the converted HTML in UTF-8 bytes."""
+        return len(self.html.encode("utf-8"))
+
+    @property
+    def total_bytes_saved(self) -> int:
+        """Total bytes removed by all optimization stages."""
+        return sum(self.bytes_saved.values())
+
+    def __str__(self) -> str:
+        return self.html
+
+
+class _ThemeSnapshot:
+    """
+    Theme tables with the parser and transformer bound to them.
+
+    Snapshots are never modified after creation. Reloading a theme builds a
+    new snapshot and replaces the converter's reference in one assignment,
+    so each conversion sees a single consistent theme without locking.
+    """
+
+    def __init__(
+        self, theme: ThemeTables, parser: TailwindClassParser, transformer: CSSTransformer
+    ) -> None:
+        self.theme = theme
+        self.parser = parser
+        self.transformer = transformer
+
+    def resolve_apply(self, classes: list[str]) -> dict[str, str]:
+        """Resolve the utility list of an @apply directive."""
+        return self.transformer.resolve_utilities(self.parser.filter_supported_classes(classes))
+
+
+class _ConversionState:
+    """Per-conversion accumulators threaded through the traversal."""
+
+    def __init__(
+        self,
+        options: ConversionOptions,
+        snapshot: _ThemeSnapshot,
+        size_report: Optional[SizeReport] = None,
+        placeholders: Optional[TemplatePlaceholders] = None,
+        class_prefix: str = "",
+    ) -> None:
+        self.options = options
+        self.snapshot = snapshot
+        self.placeholders = placeholders
+        # Prepended to generated class names, to keep separately converted parts apart
+        self.class_prefix = class_prefix
+        self.bytes_saved: dict[str, int] = {}
+        # Bytes saved by writing generated stylesheets in compact syntax, for the minify stage
+        self.stylesheet_minified = 0
+        self.size_report = size_report
+        # id(subtree root) -> content id of subtrees converted by copying, for the serializer
+        self.repeated: Optional[dict[int, int]] = None
+        self.support_report: Optional[SupportReport] = None
+        if options.analyze_support:
+            profile = snapshot.transformer.profile
+            self.support_report = SupportReport(profile.mask if profile else ALL_CLIENTS)
+        self.variants: Optional[VariantStylesheet] = None
+        if options.variant_styles:
+            self.variants = VariantStylesheet(
+                prefix=class_prefix + VARIANT_CLASS_PREFIX, minify=options.minify
+            )
 
 
 class TailwindEmailConverter:
@@ -55,22 +344,121 @@ class TailwindEmailConverter:
         html_output = converter.convert(html_input)
     """
 
-    def __init__(self, options: Optional[ConversionOptions] = None) -> None:
+    def __init__(
+        self,
+        options: Optional[ConversionOptions] = None,
+        recorder: Optional[SlowConversionRecorder] = None,
+        theme: Optional[ThemeTables] = None,
+        plugins: Optional[PluginRegistry] = None,
+    ) -> None:
         """
         Initialize the converter.
 
         Args:
             options: Conversion options (uses defaults if not provided)
+            recorder: Optional recorder that spools conversions slower than its
+                threshold for offline profiling
+            theme: Precompiled theme tables, used instead of compiling
+                options.theme (e.g. tables owned by a ThemeRegistry)
+            plugins: Element handlers to run during the traversal (a new,
+                empty registry is created if not provided)
         """
         self.options = options or ConversionOptions()
-        self.parser = TailwindClassParser()
-        self.transformer = CSSTransformer(
-            base_font_size=self.options.base_font_size,
-            include_mso=self.options.include_mso_properties,
+        self.recorder = recorder
+        self.plugins = plugins if plugins is not None else PluginRegistry()
+        tables = theme or compile_theme(self.options.theme)
+        self._snapshot = _ThemeSnapshot(
+            tables,
+            TailwindClassParser(theme=tables),
+            CSSTransformer(
+                base_font_size=self.options.base_font_size,
+                include_mso=self.options.include_mso_properties,
+                theme=tables,
+                profile=compile_profile(self.options.target_clients),
+            ),
         )
+        self._reload_lock = threading.Lock()
         self.fallback_generator = FallbackGenerator(
             include_vml=self.options.include_vml_fallbacks,
         )
+        # Parsed component_css: (source, theme key, index, rules left for the head)
+        self._components: Optional[tuple[str, str, StylesheetIndex, str]] = None
+
+    @property
+    def theme(self) -> ThemeTables:
+        """Compiled theme tables currently in use."""
+        return self._snapshot.theme
+
+    @property
+    def parser(self) -> TailwindClassParser:
+        """Class parser bound to the current theme."""
+        return self._snapshot.parser
+
+    @property
+    def transformer(self) -> CSSTransformer:
+        """CSS transformer bound to the current theme."""
+        return self._snapshot.transformer
+
+    def reload_theme(
+        self, config: Optional[ThemeConfig], theme: Optional[ThemeTables] = None
+    ) -> ThemeTables:
+        """
+        Switch to a new theme without interrupting conversions.
+
+        The new tables, parser and transformer are built off to the side and
+        swapped in with a single assignment; conversions already running
+        finish with the theme they started with. Cached class results and the
+        parsed component_css are kept unless the change affects them.
+
+        Args:
+            config: New theme dictionary or JSON string (None for the defaults)
+            theme: Precompiled tables for config (compiled when not given)
+
+        Returns:
+            ThemeTables now in use
+
+        Raises:
+            ValueError: If the theme is malformed
+        """
+        tables = theme or compile_theme(config)
+        with self._reload_lock:
+            current = self._snapshot
+            options = self.options.copy()
+            options.theme = config
+            self.options = options
+            if tables == current.theme:
+                return current.theme
+
+            changes = theme_changes(current.theme, tables)
+            self._snapshot = _ThemeSnapshot(
+                tables,
+                TailwindClassParser(theme=tables),
+                current.transformer.with_theme(tables, changes),
+            )
+
+            components = self._components
+            if components is not None and components[1] == current.theme.key:
+                css, _, index, leftover = components
+                if not any(is_affected(token, changes) for token in _CSS_TOKEN.split(css)):
+                    self._components = (css, tables.key, index, leftover)
+        return tables
+
+    def reload_theme_async(
+        self, config: Optional[ThemeConfig], theme: Optional[ThemeTables] = None
+    ) -> "Future[ThemeTables]":
+        """
+        Reload the theme on a background thread.
+
+        Reloads are applied one at a time, in submission order.
+
+        Args:
+            config: New theme dictionary or JSON string (None for the defaults)
+            theme: Precompiled tables for config (compiled when not given)
+
+        Returns:
+            Future resolving to the ThemeTables swapped in
+        """
+        return _RELOAD_EXECUTOR.submit(self.reload_theme, config, theme)
 
     def convert(self, html: str) -> str:
         """
@@ -82,68 +470,901 @@ class TailwindEmailConverter:
         Returns:
             Output HTML string with inline styles
         """
-        # Parse HTML
-        soup = self.parser.parse_html(html)
+        return self.convert_with_report(html).html
+
+    def convert_fragment(self, html: str) -> str:
+        """
+        Convert a fragment such as a component partial.
+
+        The output is the converted fragment alone, without the <html>,
+        <head> and <body> elements a document gets. Head styles generated by
+        the conversion come first.
+
+        Args:
+            html: Fragment HTML with Tailwind classes
+
+        Returns:
+            Converted fragment HTML
+        """
+        return self.convert_with_report(html, fragment=True).html
+
+    def convert_bytes(self, data: bytes, encoding: Optional[str] = None) -> bytes:
+        """
+        Convert HTML bytes, e.g. as read from storage, to UTF-8 bytes.
+
+        The parser decodes the input itself (see iter_convert()), and the
+        output is encoded chunk by chunk as it is serialized.
+
+        Args:
+            data: Input HTML bytes with Tailwind classes
+            encoding: Encoding of data (detected from a byte order mark or
+                <meta> charset declaration, else UTF-8, when not given)
+
+        Returns:
+            Output HTML encoded as UTF-8
+        """
+        return b"".join(
+            chunk.encode(OUTPUT_CHARSET) for chunk in self.iter_convert(data, encoding=encoding)
+        )
+
+    def convert_file(
+        self,
+        path: Union[str, Path],
+        out_path: Union[str, Path],
+        encoding: Optional[str] = None,
+    ) -> int:
+        """
+        Convert an HTML file, writing the output to another file as it is serialized.
+
+        The file is read as bytes and converted like convert_bytes() input.
+        The output goes to a temporary file next to out_path, which replaces
+        out_path only once the conversion has succeeded, so a failed
+        conversion leaves an existing output (or the input, when converting
+        in place) untouched.
+
+        Args:
+            path: Input HTML file
+            out_path: Output file, written as UTF-8 (may be the input file)
+            encoding: Encoding of the input (detected when not given, see
+                convert_bytes())
+
+        Returns:
+            Number of bytes written
+        """
+        with open(path, "rb") as file:
+            source = file.read()
+
+        target = Path(out_path)
+        temporary = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        written = 0
+        try:
+            with open(temporary, "xb") as output:
+                for chunk in self.iter_convert(source, encoding=encoding):
+                    written += output.write(chunk.encode(OUTPUT_CHARSET))
+            if target.exists():
+                shutil.copymode(target, temporary)
+            os.replace(temporary, target)
+        except BaseException:
+            temporary.unlink(missing_ok=True)
+            raise
+        return written
+
+    def convert_to_part(
+        self,
+        html: Union[str, bytes],
+        fragment: bool = False,
+        encoding: Optional[str] = None,
+    ) -> EmailMessage:
+        """
+        Convert HTML into a quoted-printable text/html MIME part.
+
+        The output is encoded while it is serialized (see iter_convert()),
+        so only the encoded payload is ever held as a whole.
+
+        Args:
+            html: Input HTML with Tailwind classes, as a string or as bytes
+            fragment: Convert a fragment (see convert_fragment())
+            encoding: Encoding of bytes input (see convert_bytes())
+
+        Returns:
+            EmailMessage holding the text/html part
+        """
+        return html_part(self.iter_convert(html, fragment, encoding))
+
+    def iter_convert(
+        self,
+        html: Union[str, bytes],
+        fragment: bool = False,
+        encoding: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Convert HTML and stream the output as it is serialized.
+
+        The whole output never exists as one string. No size or support
+        report is collected; with fit_to_budget, which needs the size of the
+        output first, the result of convert_with_report() is yielded whole.
+
+        Args:
+            html: Input HTML with Tailwind classes, as a string or as bytes
+            fragment: Convert a fragment (see convert_fragment())
+            encoding: Encoding of bytes input (see convert_bytes())
+
+        Yields:
+            Consecutive pieces of the output HTML
+        """
+        options = self.options
+        if options.fit_to_budget:
+            yield self.convert_with_report(html, fragment, encoding).html
+            return
+
+        source, charset = self._parser_input(html, encoding)
+        soup, state, timings = self._parse_and_process(source, options, charset)
+        serializer = HTMLSerializer(minify=options.minify, repeated=state.repeated)
+        chunks = serializer.iter_fragment_chunks(soup) if fragment else serializer.iter_chunks(soup)
+
+        # Time spent serializing, not waiting for the consumer
+        elapsed = 0.0
+        placeholders = state.placeholders
+        started = time.perf_counter()
+        for chunk in chunks:
+            if placeholders is not None:
+                chunk = placeholders.restore(chunk)
+            elapsed += time.perf_counter() - started
+            yield chunk
+            started = time.perf_counter()
+        elapsed += time.perf_counter() - started
+        timings["serialize"] = elapsed * 1000
+
+        self._record_if_slow(
+            "iter_convert", source, charset, fragment, options, state.snapshot.theme, timings
+        )
+
+    def convert_with_report(
+        self,
+        html: Union[str, bytes],
+        fragment: bool = False,
+        encoding: Optional[str] = None,
+    ) -> ConversionResult:
+        """
+        Convert HTML and return the output together with diagnostics.
+
+        Args:
+            html: Input HTML with Tailwind classes, as a string or as bytes
+            fragment: Convert a fragment (see convert_fragment())
+            encoding: Encoding of bytes input (see convert_bytes())
+
+        Returns:
+            ConversionResult with the HTML, phase timings and bytes saved
+        """
+        source, charset = self._parser_input(html, encoding)
+        result = self._convert_pass(source, self.options, fragment, charset)
+        if self.options.fit_to_budget and result.size > self.options.size_budget:
+            result = self._fit_to_budget(source, result, fragment, charset)
+
+        self._record_if_slow(
+            "convert_with_report",
+            source,
+            charset,
+            fragment,
+            self.options,
+            self.theme,
+            result.timings,
+        )
+
+        return result
+
+    def compile(self, html: str) -> ConversionPlan:
+        """
+        Convert HTML once and record a plan for HTML with the same structure.
+
+        The plan stores the class and style attributes produced for every
+        classed element, so HTML rendered from the same template with other
+        text can be converted by splicing them in. See ConversionPlan.
+
+        Args:
+            html: Representative HTML of the template (e.g. one rendering)
+
+        Returns:
+            ConversionPlan that falls back to convert() when it cannot apply
+        """
+        snapshot = self._snapshot
+        if not is_spliceable(self.options) or self.plugins:
+            return ConversionPlan(self.convert, None)
+
+        recorded = self._record_attributes(html, snapshot)
+        if recorded is None:
+            return ConversionPlan(self.convert, None)
+        keys, attributes = recorded
+        return ConversionPlan(
+            self._convert_spliced,
+            keys,
+            attributes,
+            is_current=lambda: self._snapshot is snapshot,
+        )
+
+    def _convert_spliced(self, html: str) -> str:
+        """
+        Convert HTML a plan does not match, keeping the plan's output markup.
+
+        The converted class and style attributes are spliced into the raw
+        HTML as an applied plan would, so results do not depend on whether
+        the plan matched.
+
+        Args:
+            html: Rendered HTML
+
+        Returns:
+            HTML with converted attributes, or the result of convert() when
+            the parser restructures its classed elements
+        """
+        recorded = self._record_attributes(html, self._snapshot)
+        if recorded is not None:
+            spliced = splice(html, *recorded)
+            if spliced is not None:
+                return spliced
+        return self.convert(html)
+
+    def _record_attributes(
+        self, html: str, snapshot: _ThemeSnapshot
+    ) -> Optional[tuple[list[ElementKey], list[dict[str, str]]]]:
+        """
+        Convert HTML and record the attributes of its classed elements.
+
+        Args:
+            html: HTML source
+            snapshot: Theme to convert with
+
+        Returns:
+            Tuple of (key of each classed element, its converted class/style
+            attributes), or None when the parser moved or repaired classed
+            elements
+        """
+        soup = snapshot.parser.parse_html(html)
+        elements: list[tuple[Tag, ElementKey]] = []
+        for element in snapshot.parser.get_elements_with_classes(soup):
+            style = element.get("style")
+            elements.append(
+                (
+                    element,
+                    (
+                        element.name,
+                        " ".join(snapshot.parser.extract_classes(element)),
+                        str(style) if style is not None else None,
+                    ),
+                )
+            )
+        keys = [key for _, key in elements]
+        if element_keys(html) != keys:
+            return None
 
-        # Process each element with classes
-        for element in self.parser.get_elements_with_classes(soup):
-            self._process_element(element)
+        self._process_tree(soup, _ConversionState(self.options, snapshot))
+        attributes: list[dict[str, str]] = []
+        for element, _ in elements:
+            converted = {}
+            for name in ("class", "style"):
+                value = element.get(name)
+                if value is not None:
+                    converted[name] = " ".join(value) if isinstance(value, list) else str(value)
+            attributes.append(converted)
+        return keys, attributes
 
-        # Return the modified HTML
-        return str(soup)
+    def _record_if_slow(
+        self,
+        entry: str,
+        source: Union[str, bytes],
+        charset: Optional[str],
+        fragment: bool,
+        options: ConversionOptions,
+        theme: ThemeTables,
+        timings: dict[str, float],
+    ) -> None:
+        """
+        Spool a conversion with the recorder if it was slow enough.
+
+        Args:
+            entry: Method the conversion ran through (see recorder.ENTRY_POINTS)
+            source: Input as given to the parser
+            charset: Encoding of bytes input, or None for string input
+            fragment: Whether the input was converted as a fragment
+            options: Options the conversion used
+            theme: Theme tables the conversion used
+            timings: Phase timings in milliseconds
+        """
+        recorder = self.recorder
+        if recorder is None or not recorder.should_record(sum(timings.values())):
+            return
+        recorder.record(
+            _as_text(source, charset),
+            options.to_dict(),
+            timings,
+            entry=entry,
+            fragment=fragment,
+            encoding=(charset or DEFAULT_CHARSET) if isinstance(source, bytes) else None,
+            theme_key=theme.key,
+        )
+
+    def _parser_input(
+        self, html: Union[str, bytes], encoding: Optional[str]
+    ) -> tuple[Union[str, bytes], Optional[str]]:
+        """
+        Prepare input for the parser.
+
+        Bytes are left for the parser to decode, unless template regions
+        have to be found in the text first.
+
+        Args:
+            html: Input HTML string or bytes
+            encoding: Encoding of bytes given by the caller
+
+        Returns:
+            Tuple of (input for the parser, encoding of bytes input or None)
+        """
+        if isinstance(html, str):
+            return html, None
+        charset = detect_charset(html, encoding)
+        if self.options.preserve_templates:
+            return html.decode(charset, "replace"), None
+        return html, charset
+
+    def _parse_and_process(
+        self,
+        html: Union[str, bytes],
+        options: ConversionOptions,
+        encoding: Optional[str] = None,
+        size_report: Optional[SizeReport] = None,
+    ) -> tuple[BeautifulSoup, _ConversionState, dict[str, float]]:
+        """
+        Parse a document and process every element in a single traversal.
+
+        Args:
+            html: Input HTML string, or bytes in encoding
+            options: Options for this pass
+            encoding: Encoding of bytes input
+            size_report: Report to account the output bytes in (optional)
+
+        Returns:
+            Tuple of (processed document, conversion state, parse and process
+            timings in milliseconds)
+        """
+        start = time.perf_counter()
+
+        # Parse HTML, with template regions swapped for placeholders
+        placeholders = None
+        if options.preserve_templates and isinstance(html, str):
+            placeholders = TemplatePlaceholders()
+            html = placeholders.protect(html)
+        soup = self.parser.parse_html(html, encoding)
+        parsed = time.perf_counter()
+
+        state = _ConversionState(options, self._snapshot, size_report, placeholders)
+        self._process_tree(soup, state)
+        processed = time.perf_counter()
+
+        timings = {"parse": (parsed - start) * 1000, "process": (processed - parsed) * 1000}
+        return soup, state, timings
+
+    def _convert_pass(
+        self,
+        html: Union[str, bytes],
+        options: ConversionOptions,
+        fragment: bool = False,
+        encoding: Optional[str] = None,
+    ) -> ConversionResult:
+        """
+        Run a single parse/process/serialize pass.
+
+        Args:
+            html: Input HTML string, or bytes in encoding
+            options: Options for this pass
+            fragment: Serialize without the document scaffolding
+            encoding: Encoding of bytes input
+
+        Returns:
+            ConversionResult for the pass
+        """
+        size_report = SizeReport(options.size_budget) if options.analyze_size else None
+        soup, state, timings = self._parse_and_process(html, options, encoding, size_report)
+        processed = time.perf_counter()
+
+        # Serialize the modified HTML, rendering the plain text along the way
+        text_renderer = PlainTextRenderer(state.placeholders) if options.plain_text else None
+        serializer = HTMLSerializer(
+            minify=options.minify,
+            size_report=size_report,
+            repeated=state.repeated,
+            text_renderer=text_renderer,
+        )
+        output = serializer.serialize_fragment(soup) if fragment else serializer.serialize(soup)
+        if state.placeholders is not None:
+            output = state.placeholders.restore(output)
+        text = text_renderer.render() if text_renderer is not None else None
+        timings["serialize"] = (time.perf_counter() - processed) * 1000
+
+        if options.minify:
+            state.bytes_saved["minify"] = serializer.bytes_saved + state.stylesheet_minified
+
+        return ConversionResult(
+            output,
+            timings=timings,
+            bytes_saved=state.bytes_saved,
+            size_report=size_report,
+            support_report=state.support_report,
+            text=text,
+        )
+
+    def _convert_fragment(self, html: str, class_prefix: str = "") -> tuple[str, str]:
+        """
+        Convert a content fragment for insertion into a converted document.
+
+        Args:
+            html: Fragment HTML with Tailwind classes
+            class_prefix: Prefix for generated class names, unique per fragment
+                of the document
+
+        Returns:
+            Tuple of (head markup the conversion added, converted fragment)
+        """
+        snapshot = self._snapshot
+        soup = snapshot.parser.parse_html(html)
+        state = _ConversionState(self.options, snapshot, class_prefix=class_prefix)
+        self._process_tree(soup, state)
+
+        serializer = HTMLSerializer(minify=self.options.minify, repeated=state.repeated)
+        head = soup.head.extract() if soup.head is not None else None
+        return (
+            serializer.serialize_fragment(head) if head is not None else "",
+            serializer.serialize_fragment(soup),
+        )
+
+    def _fit_to_budget(
+        self,
+        html: Union[str, bytes],
+        result: ConversionResult,
+        fragment: bool = False,
+        encoding: Optional[str] = None,
+    ) -> ConversionResult:
+        """
+        Re-convert with size-reduction stages enabled until the output fits.
+
+        Stages from BUDGET_FALLBACK_STAGES are enabled cumulatively, cheapest
+        first; stages already enabled in the options are skipped. Timings of
+        all passes are summed so the report reflects the full cost.
+
+        Args:
+            html: Input HTML string, or bytes in encoding
+            result: Result of the first pass
+            fragment: Serialize without the document scaffolding
+            encoding: Encoding of bytes input
+
+        Returns:
+            Result of the last pass, with the stages that were enabled
+        """
+        options = self.options.copy()
+        timings = dict(result.timings)
+        stages: list[str] = []
+
+        for stage, name, value in BUDGET_FALLBACK_STAGES:
+            if result.size <= options.size_budget:
+                break
+            if getattr(options, name) == value:
+                continue
+
+            setattr(options, name, value)
+            stages.append(stage)
+            result = self._convert_pass(html, options, fragment, encoding)
+            for phase, elapsed in result.timings.items():
+                timings[phase] = timings.get(phase, 0.0) + elapsed
+
+        result.timings = timings
+        result.fallback_stages = stages
+        return result
+
+    def _process_tree(self, soup: BeautifulSoup, state: _ConversionState) -> None:
+        """
+        Walk the document in order, converting classes and pruning inherited styles.
+
+        With inline_style_blocks, head <style> rules are indexed before the walk
+        and matched against each element as it is visited.
+
+        Registered element handlers run on each element once its styles
+        are converted.
+
+        When every element converts on its own attributes alone, a subtree
+        with the same shape as one already converted gets that result copied
+        instead of being walked again.
+
+        In 'modern' compatibility mode, repeated declaration sets are moved to
+        a shared head stylesheet once the walk is complete; collected variant
+        rules are written to their own head stylesheet after it.
+
+        Args:
+            soup: Parsed document
+            state: Per-conversion accumulators
+        """
+        prune = state.options.prune_inherited
+        modern = state.options.compatibility == "modern"
+        pruned_bytes = 0
+        used_classes: Optional[set[str]] = set() if state.variants is not None else None
+        index = self._build_style_index(soup, state)
+        # Properties that stylesheets left in the document may set
+        declared = self._stylesheet_properties(soup) if prune or modern else frozenset()
+        contested: frozenset[str] = frozenset()
+        if prune:
+            contested = (
+                INHERITED_PROPERTIES if declared is None else declared & INHERITED_PROPERTIES
+            )
+        # Class rules could lose to external stylesheets, so nothing moves then
+        extractor = None
+        if modern and declared is not None:
+            extractor = SharedStyleExtractor(
+                prefix=state.class_prefix + DEFAULT_CLASS_PREFIX,
+                minify=state.options.minify,
+                reserved=declared,
+            )
+        # Classes before conversion, for matching descendant selectors
+        original_classes: dict[int, list[str]] = {}
+        plugins = self.plugins
+        context = VisitContext(soup, state.options, state.placeholders) if plugins else None
+        # Shape id -> first converted instance, when results do not depend on context
+        subtrees = None
+        converted: dict[int, Tag] = {}
+        repeated: dict[int, int] = {}
+        if index is None and not prune and state.size_report is None and context is None:
+            subtrees = SubtreeIndex(soup)
+            if subtrees.repeats:
+                state.repeated = repeated
+            else:
+                subtrees = None
+
+        # Each entry carries the known computed inherited values of its parent
+        stack: list[tuple[Tag, dict[str, str]]] = [(soup, {})]
+        while stack:
+            element, inherited = stack.pop()
+
+            if element is not soup:
+                if subtrees is not None:
+                    first = converted.setdefault(subtrees.shapes[id(element)], element)
+                    if first is not element:
+                        for source, copied in copy_converted(first, element):
+                            if state.variants is not None:
+                                state.variants.add_copy(source, copied)
+                            if extractor is not None:
+                                extractor.add(copied)
+                        # Only subtrees whose content repeats are worth rendering once
+                        for instance in (first, element):
+                            content = subtrees.contents[id(instance)]
+                            if content in subtrees.repeated_contents:
+                                repeated[id(instance)] = content
+                        continue
+
+                matched = None
+                if index is not None:
+                    classes = self.parser.extract_classes(element)
+                    matched = index.match(element, classes, original_classes)
+                    if classes:
+                        original_classes[id(element)] = classes
+                if "class" in element.attrs or matched is not None:
+                    self._process_element(element, state, matched)
+                if prune:
+                    overridden = contested
+                    if state.variants is not None:
+                        # Variant @media rules can change the element's values
+                        overridden = contested | state.variants.overridden(element)
+                    inherited, saved = self._prune_element(element, inherited, overridden)
+                    pruned_bytes += saved
+                if context is not None and not plugins.visit(element, context):
+                    # Removed by a handler
+                    continue
+                if extractor is not None:
+                    extractor.add(element)
+                if used_classes is not None and "class" in element.attrs:
+                    used_classes.update(self.parser.extract_classes(element))
+
+            for child in reversed(element.contents):
+                if isinstance(child, Tag):
+                    stack.append((child, inherited))
+
+        if prune:
+            state.bytes_saved["prune_inherited"] = pruned_bytes
+        if extractor is not None:
+            state.bytes_saved["hybrid_styles"] = extractor.apply(soup, state.variants)
+            state.stylesheet_minified += extractor.minified_bytes
+        if state.variants is not None:
+            state.variants.apply(soup, used_classes)
+            state.stylesheet_minified += state.variants.minified_bytes
+
+    def _build_style_index(
+        self, soup: BeautifulSoup, state: _ConversionState
+    ) -> Optional[StylesheetIndex]:
+        """
+        Build the index of stylesheet rules to inline into a document.
+
+        Component rules are parsed once per converter and copied for each
+        document; head <style> rules are added when inline_style_blocks is on.
 
-    def _process_element(self, element: Tag) -> None:
+        Args:
+            soup: Parsed document
+            state: Per-conversion accumulators
+
+        Returns:
+            StylesheetIndex, or None when there are no rules to inline
+        """
+        options = state.options
+        components = self._component_index(options.component_css, state.snapshot)
+        if components is None and not options.inline_style_blocks:
+            return None
+
+        resolver = state.snapshot.resolve_apply
+        if components is not None:
+            component_index, leftover = components
+            index = component_index.copy()
+            index.apply_resolver = resolver
+        else:
+            index, leftover = StylesheetIndex(resolver), ""
+
+        if options.inline_style_blocks:
+            build_index(soup, index)
+        if leftover:
+            insert_head_style(soup, leftover, first=True)
+        return index if len(index) else None
+
+    def _component_index(
+        self, css: Optional[str], snapshot: _ThemeSnapshot
+    ) -> Optional[tuple[StylesheetIndex, str]]:
+        """
+        Parse component CSS, reusing the previous result for the same source and theme.
+
+        Args:
+            css: Component stylesheet text
+            snapshot: Theme the @apply directives resolve against
+
+        Returns:
+            Tuple of (index of component rules, rules left for the head), or None
+        """
+        if not css:
+            return None
+        components = self._components
+        if components is None or components[:2] != (css, snapshot.theme.key):
+            index = StylesheetIndex(snapshot.resolve_apply)
+            leftover = index.add_stylesheet(css).strip()
+            components = (css, snapshot.theme.key, index, leftover)
+            self._components = components
+        return components[2], components[3]
+
+    def _stylesheet_properties(self, soup: BeautifulSoup) -> Optional[frozenset[str]]:
+        """
+        List the properties the document's stylesheets may set.
+
+        Inline declarations of these properties are not the only source of
+        their computed values, so they are never pruned, and they stay inline
+        rather than moving into lower-priority class rules.
+
+        Args:
+            soup: Parsed document, after stylesheet rules have been inlined
+
+        Returns:
+            Properties declared by <style> blocks, or None when an external
+            stylesheet could set anything
+        """
+        css: list[str] = []
+        for node in soup.find_all(["style", "link"]):
+            if node.name == "link":
+                rel = node.get("rel")
+                values = rel.split() if isinstance(rel, str) else rel or []
+                if "stylesheet" in [value.lower() for value in values]:
+                    return None
+            elif node.string:
+                css.append(str(node.string))
+        return declared_properties("\n".join(css)) if css else frozenset()
+
+    def _prune_element(
+        self,
+        element: Tag,
+        inherited: dict[str, str],
+        contested: frozenset[str] = frozenset(),
+    ) -> tuple[dict[str, str], int]:
+        """
+        Drop declarations that repeat the parent's computed inherited values.
+
+        Args:
+            element: BeautifulSoup Tag element
+            inherited: Known computed inherited values of the parent
+            contested: Properties stylesheet rules may set on the element
+
+        Returns:
+            Tuple of (known computed values for children, bytes removed)
+        """
+        style = element.get("style", "")
+        if isinstance(style, list):
+            style = " ".join(style)
+        declarations = parse_style_string(str(style)) if style else {}
+
+        kept, context = prune_inherited(
+            element.name, element.attrs, declarations, inherited, contested
+        )
+        if len(kept) == len(declarations):
+            return context, 0
+
+        if kept:
+            new_style = self.transformer.to_style_string(kept)
+            element["style"] = new_style
+            return context, len(style) - len(new_style)
+
+        del element["style"]
+        return context, len(style) + len(' style=""')
+
+    def _process_element(
+        self,
+        element: Tag,
+        state: Optional[_ConversionState] = None,
+        matched: Optional[MatchedStyles] = None,
+    ) -> None:
         """
         Process a single element, converting its Tailwind classes to inline styles.
 
         Args:
             element: BeautifulSoup Tag element
+            state: Per-conversion accumulators (optional)
+            matched: Declarations of matching <style> rules (optional)
         """
-        # Extract classes
-        original_classes = self.parser.extract_classes(element)
-        if not original_classes:
+        options = state.options if state is not None else self.options
+        snapshot = state.snapshot if state is not None else self._snapshot
+        parser = snapshot.parser
+        transformer = snapshot.transformer
+
+        # Extract classes; classes built by template expressions resolve at render time
+        classes = parser.extract_classes(element)
+        dynamic_classes: list[str] = []
+        if state is not None and state.placeholders is not None:
+            dynamic_classes = [c for c in classes if state.placeholders.contains(c)]
+        original_classes = [c for c in classes if c not in dynamic_classes]
+        if not original_classes and matched is None:
             return
 
         # Filter to supported classes
-        supported_classes = self.parser.filter_supported_classes(original_classes)
+        supported_classes = parser.filter_supported_classes(original_classes)
+
+        # Collect responsive and dark-mode variants for the @media stylesheet
+        variant_classes: set[str] = set()
+        if state is not None and state.variants is not None:
+            variant_classes = self._collect_variants(
+                element, original_classes, state.variants, snapshot, state.support_report
+            )
 
         # Transform classes to CSS properties
-        css_properties = self.transformer.transform_classes(supported_classes)
+        css_properties = transformer.transform_classes(supported_classes)
+
+        if css_properties or matched is not None:
+            # Attribute the generated declarations to the classes that won them
+            if css_properties and state is not None and state.size_report is not None:
+                self._attribute_class_bytes(
+                    supported_classes, css_properties, state.size_report, transformer
+                )
 
-        if css_properties:
             # Get existing style attribute
             existing_style = element.get("style", "")
             if isinstance(existing_style, list):
                 existing_style = " ".join(existing_style)
 
-            # Convert properties to style string
-            new_style = self.transformer.to_style_string(css_properties)
+            # Merge with existing styles (converted properties win) and
+            # stylesheet rules (ordered by specificity against utilities)
+            merged = parse_style_string(str(existing_style))
+            if matched is not None:
+                merged = matched.merge(merged, css_properties)
+            else:
+                merged.update(css_properties)
 
-            # Merge with existing styles
-            merged_style = merge_styles(str(existing_style), new_style)
+            # Fold complete longhand sets into shorthands
+            if options.collapse_shorthands:
+                merged = collapse_shorthands(merged)
 
             # Set the style attribute
-            element["style"] = merged_style
+            if merged:
+                element["style"] = transformer.to_style_string(merged)
+                if state is not None and state.support_report is not None:
+                    state.support_report.add(merged)
 
             # Generate VML fallbacks for border-radius if needed
-            if self.options.include_vml_fallbacks:
+            if css_properties and options.include_vml_fallbacks:
                 self._add_vml_fallbacks(element, css_properties)
 
+        if not original_classes:
+            return
+
         # Handle class attribute
-        if self.options.preserve_classes:
+        if options.preserve_classes:
             # Keep all original classes
             pass
-        elif self.options.preserve_unsupported_classes:
-            # Keep only non-Tailwind classes
-            non_tailwind = [c for c in original_classes if not self.parser.is_tailwind_class(c)]
-            if non_tailwind:
-                element["class"] = " ".join(non_tailwind)
+        elif options.preserve_unsupported_classes:
+            # Keep only non-Tailwind and template-built classes
+            kept = [
+                c
+                for c in classes
+                if c in dynamic_classes
+                or (not parser.is_tailwind_class(c) and c not in variant_classes)
+            ]
+            if kept:
+                element["class"] = " ".join(kept)
             else:
                 del element["class"]
+        elif dynamic_classes:
+            # Remove all classes but the template-built ones
+            element["class"] = " ".join(dynamic_classes)
         else:
             # Remove all classes
             del element["class"]
 
+    def _collect_variants(
+        self,
+        element: Tag,
+        classes: list[str],
+        variants: VariantStylesheet,
+        snapshot: _ThemeSnapshot,
+        support_report: Optional[SupportReport] = None,
+    ) -> set[str]:
+        """
+        Register an element's responsive and dark-mode variant classes.
+
+        Args:
+            element: BeautifulSoup Tag element
+            classes: Original classes of the element
+            variants: Stylesheet collecting the variant rules
+            snapshot: Theme of the conversion
+            support_report: Report to account the @media rules in (optional)
+
+        Returns:
+            Set of variant classes that were converted
+        """
+        converted: set[str] = set()
+        rules: list[tuple[tuple[str, ...], dict[str, str]]] = []
+        for cls in classes:
+            split = snapshot.parser.split_variants(cls)
+            if split is None:
+                continue
+            names, base = split
+            if not snapshot.parser.filter_supported_classes([base]):
+                continue
+            properties = snapshot.transformer.transform_class(base)
+            if properties:
+                rules.append((names, properties))
+                converted.add(cls)
+                if support_report is not None:
+                    support_report.add(properties)
+                    support_report.add_feature("@media")
+                    if DARK_VARIANT in names:
+                        support_report.add_feature("prefers-color-scheme")
+
+        if rules:
+            variants.add(element, rules)
+        return converted
+
+    def _attribute_class_bytes(
+        self,
+        classes: list[str],
+        css_properties: dict[str, str],
+        size_report: SizeReport,
+        transformer: CSSTransformer,
+    ) -> None:
+        """
+        Attribute inline style bytes to the utility classes that produced them.
+
+        Each declaration is charged to the last class that set the property,
+        measured as 'prop: value; ' before any minification.
+
+        Args:
+            classes: Supported classes in order
+            css_properties: Combined properties generated for the classes
+            size_report: Report to update
+            transformer: Transformer of the conversion
+        """
+        owners: dict[str, str] = {}
+        for cls in classes:
+            for prop in transformer.transform_class(cls) or {}:
+                owners[prop] = cls
+
+        for prop, cls in owners.items():
+            size_report.add_class_bytes(cls, len(prop) + len(css_properties[prop]) + 4)
+
     def _add_vml_fallbacks(self, element: Tag, css_properties: dict[str, str]) -> None:
         """
         Add VML fallbacks for CSS properties that need them.
@@ -171,6 +1392,13 @@ class TailwindEmailConverter:
             # For now, we just ensure the CSS is there (VML requires wrapping the element)
 
 
+def _as_text(html: Union[str, bytes], encoding: Optional[str]) -> str:
+    """Input HTML as a string, e.g. for recording."""
+    if isinstance(html, str):
+        return html
+    return html.decode(encoding or DEFAULT_CHARSET, "replace")
+
+
 def convert(html: str, options: Optional[dict[str, Any]] = None) -> str:
     """
     Convert HTML with Tailwind classes to email-compatible HTML.
@@ -186,6 +1414,21 @@ def convert(html: str, options: Optional[dict[str, Any]] = None) -> str:
             - include_mso_properties: Include MSO CSS properties (default: True)
             - preserve_classes: Keep original classes in output (default: False)
             - preserve_unsupported_classes: Keep non-Tailwind classes (default: True)
+            - collapse_shorthands: Fold longhands into shorthands (default: False)
+            - minify: Minify output during serialization (default: False)
+            - prune_inherited: Drop redundant inherited declarations (default: False)
+            - analyze_size: Collect a size report (default: False)
+            - size_budget: Size budget in bytes (default: 102 KB)
+            - fit_to_budget: Apply size-reduction stages until the output fits
+              size_budget (default: False)
+            - variant_styles: Emit sm:/md:/dark: variants as @media rules (default: False)
+            - inline_style_blocks: Inline simple head <style> rules (default: False)
+            - component_css: Component stylesheet with @apply rules to inline (default: None)
+            - theme: Theme dict or JSON extending colors, spacing and fonts (default: None)
+            - target_clients: Email clients to tailor declarations for (default: None)
+            - analyze_support: Collect a client support report (default: False)
+            - preserve_templates: Keep Jinja/Handlebars regions of template source (default: False)
+            - plain_text: Render a plain-text alternative as well (default: False)
 
     Returns:
         Output HTML string with inline styles
@@ -197,23 +1440,27 @@ def convert(html: str, options: Optional[dict[str, Any]] = None) -> str:
         >>> print(output)
         <div style="padding: 16px; background-color: #3b82f6; color: #ffffff">Hello</div>
     """
-    conversion_options = ConversionOptions()
-
-    if options:
-        if "compatibility" in options:
-            conversion_options.compatibility = options["compatibility"]
-        if "base_font_size" in options:
-            conversion_options.base_font_size = options["base_font_size"]
-        if "include_vml_fallbacks" in options:
-            conversion_options.include_vml_fallbacks = options["include_vml_fallbacks"]
-        if "include_mso_properties" in options:
-            conversion_options.include_mso_properties = options["include_mso_properties"]
-        if "preserve_classes" in options:
-            conversion_options.preserve_classes = options["preserve_classes"]
-        if "preserve_unsupported_classes" in options:
-            conversion_options.preserve_unsupported_classes = options[
-                "preserve_unsupported_classes"
-            ]
+    conversion_options = ConversionOptions.from_dict(options or {})
 
     converter = TailwindEmailConverter(conversion_options)
     return converter.convert(html)
+
+
+def convert_fragment(html: str, options: Optional[dict[str, Any]] = None) -> str:
+    """
+    Convert an HTML fragment, returning it without document scaffolding.
+
+    Args:
+        html: Fragment HTML with Tailwind classes
+        options: Optional dictionary of conversion options (see convert())
+
+    Returns:
+        Converted fragment HTML
+
+    Example:
+        >>> from tailwind_email import convert_fragment
+        >>> convert_fragment('<td class="p-4">Hi</td>')
+        '<td style="padding: 16px">Hi</td>'
+    """
+    converter = TailwindEmailConverter(ConversionOptions.from_dict(options or {}))
+    return converter.convert_fragment(html)
@@ -0,0 +1,608 @@
+"""
+Inliner for rules in <style> blocks.
+
+Parses the simple rules of a document's head stylesheets (type, class, id,
+attribute and descendant selectors) and indexes them by the rightmost
+compound selector, so each element only checks the few rules that could
+match it. Matching happens inside the converter's single traversal.
+
+Rules the inliner cannot handle (at-rules such as @media and @supports,
+pseudo-classes, other combinators) stay in the <style> block untouched, as
+do <style> blocks limited to some media or of another type than CSS.
+
+Tailwind ``@apply`` directives are expanded into declarations before the
+rules are indexed, using a resolver that maps a utility list to CSS
+properties.
+"""
+
+import re
+from typing import Callable, Optional, Union
+
+from bs4 import BeautifulSoup, Tag
+
+from tailwind_email.utils import scan_declarations
+
+# Specificity of a Tailwind utility class selector (ids, classes, types)
+UTILITY_SPECIFICITY = (0, 1, 0)
+
+# Elements that are never rendered and never receive inlined styles
+NON_RENDERED_TAGS = frozenset(["base", "head", "link", "meta", "script", "style", "title"])
+
+# Resolves the utility list of an @apply directive to CSS properties
+ApplyResolver = Callable[[list[str]], dict[str, str]]
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_APPLY_RE = re.compile(r"@apply\s+([^;{}]*?)\s*(?:;|(?=\}))")
+_IMPORTANT_RE = re.compile(r"\s*!\s*important\s*$", re.IGNORECASE)
+
+_IDENT = r"-?[_a-zA-Z][_a-zA-Z0-9-]*"
+_COMPOUND_PART_RE = re.compile(
+    rf"(?P<type>{_IDENT}|\*)"
+    rf"|\.(?P<cls>{_IDENT})"
+    rf"|#(?P<id>{_IDENT})"
+    rf"|\[\s*(?P<attr>{_IDENT})\s*"
+    rf"(?:(?P<op>[~|^$*]?=)\s*(?:\"(?P<dq>[^\"]*)\"|'(?P<sq>[^']*)'|(?P<bare>{_IDENT}))\s*)?\]"
+)
+
+
+class AttributeCondition:
+    """An attribute selector such as [href] or [href^="https"]."""
+
+    def __init__(self, name: str, operator: Optional[str] = None, value: str = "") -> None:
+        """
+        Initialize the condition.
+
+        Args:
+            name: Attribute name
+            operator: One of '=', '~=', '|=', '^=', '$=', '*=' (None for presence)
+            value: Value to compare against
+        """
+        self.name = name
+        self.operator = operator
+        self.value = value
+
+    def matches(self, element: Tag) -> bool:
+        """Check the condition against an element."""
+        actual = element.get(self.name)
+        if actual is None:
+            return False
+        if self.operator is None:
+            return True
+
+        text = " ".join(actual) if isinstance(actual, list) else str(actual)
+        value = self.value
+        if self.operator == "=":
+            return text == value
+        if self.operator == "~=":
+            return value in text.split()
+        if self.operator == "|=":
+            return text == value or text.startswith(value + "-")
+        if not value:
+            return False
+        if self.operator == "^=":
+            return text.startswith(value)
+        if self.operator == "$=":
+            return text.endswith(value)
+        return value in text
+
+
+class CompoundSelector:
+    """A sequence of simple selectors without combinators, e.g. td.cell#main."""
+
+    def __init__(
+        self,
+        tag: Optional[str] = None,
+        element_id: Optional[str] = None,
+        classes: Optional[list[str]] = None,
+        attributes: Optional[list[AttributeCondition]] = None,
+    ) -> None:
+        """
+        Initialize the compound selector.
+
+        Args:
+            tag: Element name (None for any element)
+            element_id: Required id
+            classes: Required classes
+            attributes: Required attribute conditions
+        """
+        self.tag = tag
+        self.element_id = element_id
+        self.classes = classes or []
+        self.attributes = attributes or []
+
+    def matches(self, element: Tag, classes: list[str]) -> bool:
+        """
+        Check the compound selector against an element.
+
+        Args:
+            element: Element to check
+            classes: The element's original classes
+
+        Returns:
+            True if every simple selector matches
+        """
+        if self.tag is not None and element.name != self.tag:
+            return False
+        if self.element_id is not None and element.get("id") != self.element_id:
+            return False
+        for cls in self.classes:
+            if cls not in classes:
+                return False
+        return all(condition.matches(element) for condition in self.attributes)
+
+
+class StyleRule:
+    """A single selector with the declarations of its rule."""
+
+    def __init__(
+        self,
+        compounds: list[CompoundSelector],
+        declarations: dict[str, str],
+        important: dict[str, str],
+        specificity: tuple[int, int, int],
+        order: int,
+    ) -> None:
+        """
+        Initialize the rule.
+
+        Args:
+            compounds: Compound selectors joined by descendant combinators
+            declarations: Normal declarations
+            important: !important declarations (values without the flag)
+            specificity: Selector specificity (ids, classes, types)
+            order: Source order across all parsed stylesheets
+        """
+        self.compounds = compounds
+        self.declarations = declarations
+        self.important = important
+        self.specificity = specificity
+        self.order = order
+
+
+class MatchedStyles:
+    """Cascaded declarations from stylesheet rules matching one element."""
+
+    def __init__(self) -> None:
+        """Initialize an empty match."""
+        self.normal: dict[str, str] = {}
+        self.important: dict[str, str] = {}
+        self.beats_utilities: set[str] = set()
+
+    def merge(self, inline: dict[str, str], utilities: dict[str, str]) -> dict[str, str]:
+        """
+        Combine stylesheet declarations with inline and utility styles.
+
+        The inline style attribute overrides normal stylesheet declarations
+        and !important stylesheet declarations override it. Utility styles
+        override the result, except properties won by a stylesheet rule more
+        specific than a utility class or marked !important.
+
+        Args:
+            inline: Declarations of the existing style attribute
+            utilities: Declarations generated from utility classes
+
+        Returns:
+            Merged declarations
+        """
+        merged = dict(self.normal)
+        merged.update(inline)
+        protected = {prop for prop in self.beats_utilities if prop not in inline}
+        for prop, value in self.important.items():
+            if "!important" not in inline.get(prop, ""):
+                merged[prop] = f"{value} !important"
+                protected.add(prop)
+
+        for prop, value in utilities.items():
+            if prop not in protected:
+                merged[prop] = value
+        return merged
+
+
+def split_declarations(body: str) -> list[tuple[str, str]]:
+    """
+    Split a declaration block into (property, value) pairs.
+
+    Semicolons inside strings and parentheses (e.g. data URIs) do not split.
+
+    Args:
+        body: Declaration block without braces
+
+    Returns:
+        List of (lowercase property, value) pairs
+    """
+    return [(prop.lower(), value) for prop, value in scan_declarations(body)[0]]
+
+
+def expand_apply(css: str, resolver: ApplyResolver) -> str:
+    """
+    Replace @apply directives with the declarations of their utilities.
+
+    A trailing '!important' in the utility list marks every generated
+    declaration as important.
+
+    Args:
+        css: Stylesheet text
+        resolver: Maps a utility list to CSS properties
+
+    Returns:
+        Stylesheet text without @apply directives
+    """
+
+    def replace(match: "re.Match[str]") -> str:
+        utilities = match.group(1).split()
+        suffix = ""
+        if "!important" in utilities:
+            utilities = [cls for cls in utilities if cls != "!important"]
+            suffix = " !important"
+        properties = resolver(utilities)
+        return "; ".join(f"{prop}: {value}{suffix}" for prop, value in properties.items()) + ";"
+
+    return _APPLY_RE.sub(replace, css)
+
+
+def parse_selector(selector: str) -> Optional[list[CompoundSelector]]:
+    """
+    Parse a selector made of compound selectors and descendant combinators.
+
+    Args:
+        selector: Selector text such as 'table.card td a[href]'
+
+    Returns:
+        List of compound selectors, or None if the selector uses anything
+        else (pseudo-classes, child/sibling combinators, namespaces, ...)
+    """
+    compounds: list[CompoundSelector] = []
+    for part in _split_compounds(selector):
+        compound = CompoundSelector()
+        position = 0
+        while position < len(part):
+            match = _COMPOUND_PART_RE.match(part, position)
+            if match is None:
+                return None
+            if match.group("type") is not None:
+                if position:
+                    return None
+                if match.group("type") != "*":
+                    compound.tag = match.group("type").lower()
+            elif match.group("cls") is not None:
+                compound.classes.append(match.group("cls"))
+            elif match.group("id") is not None:
+                if compound.element_id is not None:
+                    return None
+                compound.element_id = match.group("id")
+            else:
+                value = match.group("dq") or match.group("sq") or match.group("bare") or ""
+                compound.attributes.append(
+                    AttributeCondition(match.group("attr").lower(), match.group("op"), value)
+                )
+            position = match.end()
+        compounds.append(compound)
+    return compounds or None
+
+
+def specificity(compounds: list[CompoundSelector]) -> tuple[int, int, int]:
+    """
+    Calculate the specificity of a parsed selector.
+
+    Args:
+        compounds: Parsed selector
+
+    Returns:
+        Tuple of (ids, classes and attributes, types)
+    """
+    ids = sum(1 for compound in compounds if compound.element_id is not None)
+    classes = sum(len(compound.classes) + len(compound.attributes) for compound in compounds)
+    types = sum(1 for compound in compounds if compound.tag is not None)
+    return ids, classes, types
+
+
+class StylesheetIndex:
+    """Stylesheet rules indexed by the rightmost compound selector."""
+
+    def __init__(self, apply_resolver: Optional[ApplyResolver] = None) -> None:
+        """
+        Initialize an empty index.
+
+        Args:
+            apply_resolver: Resolver for @apply directives (directives are
+                left in place when not given)
+        """
+        self.apply_resolver = apply_resolver
+        self.by_id: dict[str, list[StyleRule]] = {}
+        self.by_class: dict[str, list[StyleRule]] = {}
+        self.by_tag: dict[str, list[StyleRule]] = {}
+        self.universal: list[StyleRule] = []
+        self.rule_count = 0
+
+    def __len__(self) -> int:
+        return self.rule_count
+
+    def copy(self) -> "StylesheetIndex":
+        """
+        Create an index with the same rules that can be extended independently.
+
+        Returns:
+            StylesheetIndex sharing the (immutable) rules of this one
+        """
+        index = StylesheetIndex(self.apply_resolver)
+        index.by_id = {key: list(rules) for key, rules in self.by_id.items()}
+        index.by_class = {key: list(rules) for key, rules in self.by_class.items()}
+        index.by_tag = {key: list(rules) for key, rules in self.by_tag.items()}
+        index.universal = list(self.universal)
+        index.rule_count = self.rule_count
+        return index
+
+    def add_stylesheet(self, css: str) -> str:
+        """
+        Index the supported rules of a stylesheet.
+
+        Args:
+            css: Stylesheet text
+
+        Returns:
+            Stylesheet text with the indexed rules removed
+        """
+        css = _COMMENT_RE.sub("", css)
+        if self.apply_resolver is not None and "@apply" in css:
+            css = expand_apply(css, self.apply_resolver)
+
+        remaining: list[str] = []
+        for prelude, body, text in _split_rules(css):
+            if body is None or prelude.startswith("@"):
+                remaining.append(text)
+                continue
+
+            unsupported: list[str] = []
+            normal: dict[str, str] = {}
+            important: dict[str, str] = {}
+            for prop, value in split_declarations(body):
+                flagged = _IMPORTANT_RE.search(value)
+                if flagged:
+                    important[prop] = value[: flagged.start()]
+                    normal.pop(prop, None)
+                elif prop not in important:
+                    normal[prop] = value
+
+            for selector in _split_selector_list(prelude):
+                compounds = parse_selector(selector)
+                if compounds is None:
+                    unsupported.append(selector)
+                    continue
+                self._add(
+                    StyleRule(compounds, normal, important, specificity(compounds), self.rule_count)
+                )
+
+            if unsupported:
+                remaining.append(f"{', '.join(unsupported)} {{{body}}}")
+
+        return "\n".join(remaining)
+
+    def match(
+        self,
+        element: Tag,
+        classes: list[str],
+        ancestor_classes: dict[int, list[str]],
+    ) -> Optional[MatchedStyles]:
+        """
+        Cascade the declarations of all rules matching an element.
+
+        Args:
+            element: Element to match
+            classes: The element's original classes
+            ancestor_classes: Original classes of processed ancestors by id()
+
+        Returns:
+            MatchedStyles, or None when no rule matches
+        """
+        if element.name in NON_RENDERED_TAGS:
+            return None
+
+        candidates: list[StyleRule] = []
+        element_id = element.get("id")
+        if isinstance(element_id, str) and element_id in self.by_id:
+            candidates.extend(self.by_id[element_id])
+        for cls in classes:
+            candidates.extend(self.by_class.get(cls, ()))
+        candidates.extend(self.by_tag.get(element.name, ()))
+        candidates.extend(self.universal)
+        if not candidates:
+            return None
+
+        matched = [
+            rule for rule in candidates if self._matches(rule, element, classes, ancestor_classes)
+        ]
+        if not matched:
+            return None
+
+        result = MatchedStyles()
+        matched.sort(key=lambda rule: (rule.specificity, rule.order))
+        for rule in matched:
+            beats_utilities = rule.specificity > UTILITY_SPECIFICITY
+            for prop, value in rule.declarations.items():
+                result.normal[prop] = value
+                if beats_utilities:
+                    result.beats_utilities.add(prop)
+                else:
+                    result.beats_utilities.discard(prop)
+            result.important.update(rule.important)
+        return result
+
+    def _add(self, rule: StyleRule) -> None:
+        """Add a rule to the bucket of its rightmost compound selector."""
+        self.rule_count += 1
+        key = rule.compounds[-1]
+        if key.element_id is not None:
+            self.by_id.setdefault(key.element_id, []).append(rule)
+        elif key.classes:
+            self.by_class.setdefault(key.classes[0], []).append(rule)
+        elif key.tag is not None:
+            self.by_tag.setdefault(key.tag, []).append(rule)
+        else:
+            self.universal.append(rule)
+
+    def _matches(
+        self,
+        rule: StyleRule,
+        element: Tag,
+        classes: list[str],
+        ancestor_classes: dict[int, list[str]],
+    ) -> bool:
+        """Match a rule right to left, walking ancestors for descendant combinators."""
+        compounds = rule.compounds
+        if not compounds[-1].matches(element, classes):
+            return False
+
+        index = len(compounds) - 2
+        node = element.parent
+        while index >= 0:
+            while node is not None and not isinstance(node, BeautifulSoup):
+                node_classes = ancestor_classes.get(id(node))
+                if node_classes is None:
+                    node_classes = _classes_of(node)
+                if compounds[index].matches(node, node_classes):
+                    break
+                node = node.parent
+            else:
+                return False
+            index -= 1
+            node = node.parent
+        return True
+
+
+def build_index(
+    soup: Union[BeautifulSoup, Tag], index: Optional[StylesheetIndex] = None
+) -> StylesheetIndex:
+    """
+    Index the rules of the <style> blocks in the document head.
+
+    Indexed rules are removed from their <style> block, and blocks left
+    empty are removed from the document. Blocks that only apply to some
+    media (a media attribute other than "all") or are not CSS (a type other
+    than text/css) are left in place untouched.
+
+    Args:
+        soup: Parsed document
+        index: Index to extend (default: a new empty index)
+
+    Returns:
+        StylesheetIndex (empty if the document has no head styles)
+    """
+    if index is None:
+        index = StylesheetIndex()
+    if soup.head is None:
+        return index
+
+    for style in soup.head.find_all("style"):
+        if not _applies_always(style):
+            continue
+        css = style.string
+        if not css:
+            continue
+        remaining = index.add_stylesheet(str(css)).strip()
+        if remaining:
+            style.string = remaining
+        else:
+            style.decompose()
+    return index
+
+
+def _applies_always(style: Tag) -> bool:
+    """Check whether a <style> element is CSS that applies to all media."""
+    media = style.get("media")
+    if isinstance(media, str) and media.strip().lower() not in ("", "all"):
+        return False
+    content_type = style.get("type")
+    return not isinstance(content_type, str) or content_type.strip().lower() in ("", "text/css")
+
+
+def _classes_of(element: Tag) -> list[str]:
+    """Current classes of an element."""
+    classes = element.get("class")
+    if classes is None:
+        return []
+    return classes.split() if isinstance(classes, str) else list(classes)
+
+
+def _split_compounds(selector: str) -> list[str]:
+    """Split a selector on whitespace outside attribute brackets."""
+    parts: list[str] = []
+    current = ""
+    depth = 0
+    for char in selector.strip():
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        if char.isspace() and not depth:
+            if current:
+                parts.append(current)
+            current = ""
+        else:
+            current += char
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _split_selector_list(prelude: str) -> list[str]:
+    """Split a selector list on commas outside brackets, parentheses and strings."""
+    selectors: list[str] = []
+    depth = 0
+    quote = ""
+    start = 0
+    for index, char in enumerate(prelude + ","):
+        if quote:
+            if char == quote:
+                quote = ""
+        elif char in "\"'":
+            quote = char
+        elif char in "[(":
+            depth += 1
+        elif char in "])":
+            depth -= 1
+        elif char == "," and not depth:
+            selector = prelude[start:index].strip()
+            if selector:
+                selectors.append(selector)
+            start = index + 1
+    return selectors
+
+
+def _split_rules(css: str) -> list[tuple[str, Optional[str], str]]:
+    """
+    Split a stylesheet into top-level statements.
+
+    Returns:
+        List of (prelude, block body or None, original text)
+    """
+    statements: list[tuple[str, Optional[str], str]] = []
+    depth = 0
+    quote = ""
+    start = 0
+    body_start = 0
+    for index, char in enumerate(css):
+        if quote:
+            if char == quote:
+                quote = ""
+        elif char in "\"'":
+            quote = char
+        elif char == "{":
+            if not depth:
+                body_start = index
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if not depth:
+                prelude = css[start:body_start].strip()
+                statements.append((prelude, css[body_start + 1 : index], css[start : index + 1]))
+                start = index + 1
+        elif char == ";" and not depth:
+            statement = css[start : index + 1].strip()
+            if statement:
+                statements.append((statement, None, statement))
+            start = index + 1
+
+    tail = css[start:].strip()
+    if tail:
+        statements.append((tail, None, tail))
+    return [(prelude, body, text.strip()) for prelude, body, text in statements]
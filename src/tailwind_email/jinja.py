@@ -0,0 +1,260 @@
+"""
+Jinja2 integration.
+
+``TailwindExtension`` converts Tailwind classes while a template compiles,
+so rendering costs nothing for classes that are written out in the source.
+Class attributes that are partly built by template expressions, such as
+``class="p-4 {{ 'bg-red-500' if overdue else 'bg-green-500' }}"``, are
+split: the static classes are inlined at compile time, and the dynamic
+part becomes a ``tailwind_style`` / ``tailwind_classes`` filter block that
+resolves at render time through a memoized class string -> style cache.
+
+Example:
+    env = Environment(extensions=[TailwindExtension])
+    env.tailwind_options = ConversionOptions(theme=brand_theme)
+    html = env.get_template("receipt.html").render(order=order)
+
+Only class and style attributes are rewritten; document-level stages of the
+converter (variants, hybrid styles, pruning, fallbacks) are not applied.
+"""
+
+import re
+from typing import Optional
+
+from jinja2 import Environment
+from jinja2.ext import Extension
+
+from tailwind_email.clients import compile_profile
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.optimizer import minify_style
+from tailwind_email.parser import TailwindClassParser
+from tailwind_email.template import TemplatePlaceholders
+from tailwind_email.theme import compile_theme
+from tailwind_email.transformer import CSSTransformer
+from tailwind_email.utils import (
+    MARKUP_PATTERN,
+    find_attributes,
+    parse_style_string,
+    replace_class_attribute,
+    unquote_attribute,
+)
+
+# Maximum number of dynamic class strings remembered per resolver
+DYNAMIC_CACHE_SIZE = 4096
+
+
+class ClassResolver:
+    """
+    Resolves class strings to inline styles with one converter's settings.
+
+    Results for whole class strings are memoized, so a dynamic class
+    attribute costs one dictionary lookup per render once each of its
+    values has been seen.
+    """
+
+    def __init__(self, options: Optional[ConversionOptions] = None) -> None:
+        """
+        Initialize the resolver.
+
+        Args:
+            options: Conversion options; base_font_size, include_mso_properties,
+                theme, target_clients, minify and the class preservation
+                options apply (uses defaults if not provided)
+        """
+        self.options = options or ConversionOptions()
+        theme = compile_theme(self.options.theme)
+        self.parser = TailwindClassParser(theme=theme)
+        self.transformer = CSSTransformer(
+            base_font_size=self.options.base_font_size,
+            include_mso=self.options.include_mso_properties,
+            theme=theme,
+            profile=compile_profile(self.options.target_clients),
+        )
+        # Class string -> (style, classes kept in the class attribute)
+        self._cache: dict[str, tuple[str, str]] = {}
+
+    def properties(self, classes: list[str]) -> dict[str, str]:
+        """
+        Resolve classes to CSS properties.
+
+        Args:
+            classes: Class names in order
+
+        Returns:
+            Combined dictionary of CSS properties
+        """
+        return self.transformer.transform_classes(self.parser.filter_supported_classes(classes))
+
+    def kept_classes(self, classes: list[str]) -> list[str]:
+        """
+        Select the classes that stay in the class attribute.
+
+        Args:
+            classes: Class names in order
+
+        Returns:
+            Classes kept according to the preservation options
+        """
+        if self.options.preserve_classes:
+            return classes
+        if self.options.preserve_unsupported_classes:
+            return [c for c in classes if not self.parser.is_tailwind_class(c)]
+        return []
+
+    def style_string(self, properties: dict[str, str]) -> str:
+        """
+        Render CSS properties as a style attribute value.
+
+        Args:
+            properties: Dictionary of CSS property -> value
+
+        Returns:
+            Inline style string, compact when minifying
+        """
+        style = self.transformer.to_style_string(properties)
+        return minify_style(style) if self.options.minify else style
+
+    def resolve(self, class_string: str) -> tuple[str, str]:
+        """
+        Resolve a class string, reusing earlier results.
+
+        Args:
+            class_string: Space-separated class names
+
+        Returns:
+            Tuple of (inline style, classes to keep)
+        """
+        try:
+            return self._cache[class_string]
+        except KeyError:
+            pass
+
+        classes = class_string.split()
+        properties = self.properties(classes)
+        result = (
+            self.style_string(properties) if properties else "",
+            " ".join(self.kept_classes(classes)),
+        )
+        if len(self._cache) < DYNAMIC_CACHE_SIZE:
+            self._cache[class_string] = result
+        return result
+
+    def style(self, class_string: object) -> str:
+        """Filter: inline style for a rendered class string."""
+        return self.resolve(str(class_string))[0]
+
+    def classes(self, class_string: object) -> str:
+        """Filter: classes of a rendered class string that stay classes."""
+        return self.resolve(str(class_string))[1]
+
+
+class TailwindExtension(Extension):
+    """
+    Jinja2 extension that inlines Tailwind classes at template compile time.
+
+    Options are read from ``environment.tailwind_options`` when the first
+    template compiles. Templates must use Jinja's default delimiters.
+    """
+
+    def __init__(self, environment: Environment) -> None:
+        super().__init__(environment)
+        environment.extend(tailwind_options=None)
+        self._resolver: Optional[ClassResolver] = None
+        environment.filters["tailwind_style"] = lambda value: self.resolver.style(value)
+        environment.filters["tailwind_classes"] = lambda value: self.resolver.classes(value)
+
+    @property
+    def resolver(self) -> ClassResolver:
+        """Resolver built from the environment's options."""
+        if self._resolver is None:
+            self._resolver = ClassResolver(self.environment.tailwind_options)  # type: ignore[attr-defined]
+        return self._resolver
+
+    def preprocess(self, source: str, name: Optional[str], filename: Optional[str] = None) -> str:
+        """
+        Rewrite the class attributes of a template source.
+
+        Args:
+            source: Template source
+            name: Template name
+            filename: Template file name
+
+        Returns:
+            Source with static classes inlined and dynamic ones deferred to filters
+        """
+        placeholders = TemplatePlaceholders()
+        protected = placeholders.protect(source)
+
+        def rewrite(match: re.Match[str]) -> str:
+            if match.group(2) is None:
+                return match.group()
+            attributes = self._rewrite_attributes(match.group(3), placeholders)
+            if attributes is None:
+                return match.group()
+            return f"<{match.group(2)}{attributes}>"
+
+        return placeholders.restore(MARKUP_PATTERN.sub(rewrite, protected))
+
+    def _rewrite_attributes(
+        self, attributes: str, placeholders: TemplatePlaceholders
+    ) -> Optional[str]:
+        """
+        Rewrite the class and style attributes of one tag.
+
+        Args:
+            attributes: Protected attribute string of the tag
+            placeholders: Placeholders of the template source
+
+        Returns:
+            New attribute string, or None when the tag has no class attribute
+        """
+        found = find_attributes(attributes)
+        class_attribute = found.get("class")
+        if class_attribute is None or class_attribute.group(2) is None:
+            return None
+        style_attribute = found.get("style")
+
+        value, quote = unquote_attribute(class_attribute.group(2))
+        region_text = placeholders.restore(value)
+        if placeholders.contains(value) and self.environment.block_start_string in region_text:
+            # Classes inside control blocks are only known when rendering
+            static, dynamic = [], region_text
+        else:
+            tokens = value.split()
+            static = [t for t in tokens if not placeholders.contains(t)]
+            dynamic = placeholders.restore(" ".join(t for t in tokens if placeholders.contains(t)))
+
+        resolver = self.resolver
+        declarations: dict[str, str] = {}
+        if style_attribute is not None and style_attribute.group(2) is not None:
+            declarations = parse_style_string(unquote_attribute(style_attribute.group(2))[0])
+        declarations.update(resolver.properties(static))
+
+        # Static parts are escaped; dynamic parts are template code and kept verbatim
+        kept = [_escape(c, quote) for c in resolver.kept_classes(static)]
+        style = _escape(resolver.style_string(declarations), quote) if declarations else ""
+        if dynamic:
+            kept.append(self._filter_block("tailwind_classes", dynamic))
+            separator = ";" if resolver.options.minify else "; "
+            style = (style + separator if style else "") + self._filter_block(
+                "tailwind_style", dynamic
+            )
+
+        # Replace the class attribute in place and put the style after it
+        replacement = []
+        if kept:
+            replacement.append(f"class={quote}{' '.join(kept)}{quote}")
+        if style:
+            replacement.append(f"style={quote}{style}{quote}")
+        return replace_class_attribute(attributes, found, " ".join(replacement))
+
+    def _filter_block(self, name: str, body: str) -> str:
+        """Wrap template source in a filter block."""
+        env = self.environment
+        start, end = env.block_start_string, env.block_end_string
+        return f"{start} filter {name} {end}{body}{start} endfilter {end}"
+
+
+def _escape(text: str, quote: str) -> str:
+    """Escape the quote character of an attribute value."""
+    return text.replace(quote, "&quot;" if quote == '"' else "&#39;")
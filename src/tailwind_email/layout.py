@@ -0,0 +1,209 @@
+"""
+Shared layouts with named slots.
+
+Most messages wrap a small body in the same header and footer. A layout is
+converted once and kept as static chunks of converted HTML split at its
+slots; composing a message converts only the slot contents and joins them
+with the chunks, so the shared chrome is never parsed again.
+
+Slots are HTML comments, which the parser keeps where they are, even
+between table rows:
+
+    <table class="w-full">
+      <tr><td class="p-6">Logo</td></tr>
+      <!-- slot:body -->
+      <tr><td class="p-6 text-xs">Footer</td></tr>
+    </table>
+
+Head styles generated for slot contents (responsive variants, hybrid-mode
+rules) are added to the layout's head. Their generated class names are
+prefixed with the slot name, so they cannot clash with the layout's own.
+"""
+
+import re
+from typing import Optional
+
+from tailwind_email.converter import ConversionOptions, TailwindEmailConverter
+from tailwind_email.theme import ThemeTables
+
+# Slot markers: <!-- slot:name -->
+SLOT_PATTERN = re.compile(r"<!--\s*slot:\s*([A-Za-z][\w-]*)\s*-->")
+
+# Where head markup of the slot contents goes
+_HEAD_END = re.compile(r"</head\s*>", re.IGNORECASE)
+_BODY_START = re.compile(r"<body[\s>]", re.IGNORECASE)
+
+# Hole kinds other than slot names
+_HEAD = 0
+_NEW_HEAD = 1
+
+
+class ConvertedLayout:
+    """A converted layout split into static chunks around its slots."""
+
+    def __init__(self, html: str, theme: ThemeTables) -> None:
+        """
+        Split converted layout HTML.
+
+        Args:
+            html: Converted layout HTML with slot markers
+            theme: Theme tables the layout was converted with
+        """
+        self.theme = theme
+        holes: list[tuple[int, int, object]] = [
+            (match.start(), match.end(), match.group(1)) for match in SLOT_PATTERN.finditer(html)
+        ]
+        head = _HEAD_END.search(html)
+        if head is not None:
+            holes.append((head.start(), head.start(), _HEAD))
+        else:
+            body = _BODY_START.search(html)
+            if body is not None:
+                holes.append((body.start(), body.start(), _NEW_HEAD))
+        holes.sort(key=lambda hole: hole[0])
+
+        # Static chunks, with one hole between each pair
+        self.chunks: list[str] = []
+        self.holes: list[object] = []
+        position = 0
+        for start, end, hole in holes:
+            self.chunks.append(html[position:start])
+            self.holes.append(hole)
+            position = end
+        self.chunks.append(html[position:])
+
+    @property
+    def slots(self) -> list[str]:
+        """Slot names in document order, without repeats."""
+        return list(dict.fromkeys(hole for hole in self.holes if isinstance(hole, str)))
+
+    def join(self, head: str, contents: dict[str, str]) -> str:
+        """
+        Join the static chunks with converted contents.
+
+        Args:
+            head: Head markup generated for the contents
+            contents: Slot name -> converted HTML (missing slots stay empty)
+
+        Returns:
+            Complete HTML document
+        """
+        parts = [self.chunks[0]]
+        for hole, chunk in zip(self.holes, self.chunks[1:]):
+            if hole == _HEAD:
+                parts.append(head)
+            elif hole == _NEW_HEAD:
+                if head:
+                    parts.append(f"<head>{head}</head>")
+            else:
+                parts.append(contents.get(str(hole), ""))
+            parts.append(chunk)
+        return "".join(parts)
+
+
+class LayoutRegistry:
+    """
+    Named layouts converted once and composed with per-message content.
+
+    Example:
+        layouts = LayoutRegistry()
+        layouts.register("transactional", layout_html)
+        html = layouts.compose("transactional", {"body": body_html})
+    """
+
+    def __init__(
+        self,
+        options: Optional[ConversionOptions] = None,
+        converter: Optional[TailwindEmailConverter] = None,
+    ) -> None:
+        """
+        Initialize the registry.
+
+        Args:
+            options: Conversion options for layouts and contents (ignored
+                when a converter is given)
+            converter: Converter to share, e.g. one of a ThemeRegistry
+        """
+        self.converter = converter or TailwindEmailConverter(options)
+        # Layout name -> (source, converted layout or None until first use)
+        self._layouts: dict[str, tuple[str, Optional[ConvertedLayout]]] = {}
+
+    def register(self, name: str, html: str) -> None:
+        """
+        Register or replace a layout.
+
+        Args:
+            name: Layout name
+            html: Layout HTML with <!-- slot:name --> markers
+        """
+        self._layouts[name] = (html, None)
+
+    def unregister(self, name: str) -> None:
+        """
+        Remove a layout.
+
+        Args:
+            name: Layout name
+
+        Raises:
+            KeyError: If the layout is not registered
+        """
+        del self._layouts[name]
+
+    def layout(self, name: str) -> ConvertedLayout:
+        """
+        Get a converted layout, converting it on first use.
+
+        Layouts are converted again after the converter's theme changes.
+
+        Args:
+            name: Layout name
+
+        Returns:
+            ConvertedLayout
+
+        Raises:
+            KeyError: If the layout is not registered
+        """
+        source, converted = self._layouts[name]
+        theme = self.converter.theme
+        if converted is None or converted.theme is not theme:
+            converted = ConvertedLayout(self.converter.convert(source), theme)
+            self._layouts[name] = (source, converted)
+        return converted
+
+    def compose(self, name: str, contents: dict[str, str]) -> str:
+        """
+        Convert slot contents and join them with a layout.
+
+        Args:
+            name: Layout name
+            contents: Slot name -> HTML with Tailwind classes
+
+        Returns:
+            Complete converted HTML document
+
+        Raises:
+            KeyError: If the layout is not registered
+            ValueError: If contents name a slot the layout does not have
+        """
+        layout = self.layout(name)
+        slots = layout.slots
+        unknown = sorted(set(contents) - set(slots))
+        if unknown:
+            raise ValueError(f"Layout {name!r} has no slots named {', '.join(unknown)}")
+
+        heads: list[str] = []
+        converted: dict[str, str] = {}
+        for slot in slots:
+            html = contents.get(slot)
+            if html:
+                head, converted[slot] = self.converter._convert_fragment(html, f"{slot}-")
+                heads.append(head)
+        return layout.join("".join(heads), converted)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._layouts
+
+    def __len__(self) -> int:
+        return len(self._layouts)
@@ -28,6 +28,7 @@ from tailwind_email.mappings.typography import (
     TEXT_DECORATION_CLASSES,
     TEXT_TRANSFORM_CLASSES,
 )
+from tailwind_email.mappings.variants import BREAKPOINTS, MEDIA_VARIANTS
 
 __all__ = [
     "COLOR_PALETTE",
@@ -49,4 +50,6 @@ __all__ = [
     "BORDER_STYLE_CLASSES",
     "BOX_SHADOW_CLASSES",
     "OPACITY_CLASSES",
+    "BREAKPOINTS",
+    "MEDIA_VARIANTS",
 ]
@@ -0,0 +1,99 @@
+"""
+Email client CSS support matrix.
+
+Each client family is one bit; each property (and, where support depends on
+it, each property value) maps to the bitmask of clients that render it.
+Properties missing from the tables are assumed to be supported everywhere.
+
+The data is a conservative summary of https://www.caniemail.com/ for the
+declarations this library emits: partial support counts as supported, so
+only declarations a client ignores outright are flagged.
+"""
+
+from __future__ import annotations
+
+# Client families, in bit order
+CLIENTS: tuple[str, ...] = (
+    "apple_mail",  # Apple Mail on macOS and iOS
+    "gmail",  # Gmail web and apps
+    "outlook",  # Outlook for Windows (Word rendering engine)
+    "outlook_com",  # Outlook.com and the new Outlook apps
+    "yahoo",  # Yahoo Mail and AOL
+    "samsung_email",  # Samsung Email on Android
+    "thunderbird",  # Mozilla Thunderbird
+)
+
+CLIENT_BITS: dict[str, int] = {name: 1 << index for index, name in enumerate(CLIENTS)}
+
+ALL_CLIENTS = (1 << len(CLIENTS)) - 1
+
+APPLE_MAIL = CLIENT_BITS["apple_mail"]
+GMAIL = CLIENT_BITS["gmail"]
+OUTLOOK = CLIENT_BITS["outlook"]
+OUTLOOK_COM = CLIENT_BITS["outlook_com"]
+YAHOO = CLIENT_BITS["yahoo"]
+SAMSUNG_EMAIL = CLIENT_BITS["samsung_email"]
+THUNDERBIRD = CLIENT_BITS["thunderbird"]
+
+_NOT_OUTLOOK = ALL_CLIENTS & ~OUTLOOK
+
+# Property -> clients that support it
+PROPERTY_SUPPORT: dict[str, int] = {
+    "border-radius": _NOT_OUTLOOK,
+    "border-top-left-radius": _NOT_OUTLOOK,
+    "border-top-right-radius": _NOT_OUTLOOK,
+    "border-bottom-left-radius": _NOT_OUTLOOK,
+    "border-bottom-right-radius": _NOT_OUTLOOK,
+    "box-shadow": APPLE_MAIL | OUTLOOK_COM | SAMSUNG_EMAIL | THUNDERBIRD | YAHOO,
+    "opacity": _NOT_OUTLOOK,
+    "max-width": _NOT_OUTLOOK,
+    "min-width": _NOT_OUTLOOK,
+    "max-height": _NOT_OUTLOOK,
+    "min-height": _NOT_OUTLOOK,
+    "overflow": _NOT_OUTLOOK,
+    "overflow-x": _NOT_OUTLOOK,
+    "overflow-y": _NOT_OUTLOOK,
+    "text-overflow": _NOT_OUTLOOK,
+    "visibility": _NOT_OUTLOOK,
+    "outline-color": APPLE_MAIL | OUTLOOK_COM | SAMSUNG_EMAIL | THUNDERBIRD,
+    "background-image": _NOT_OUTLOOK,
+    "background-size": _NOT_OUTLOOK,
+    "background-position": _NOT_OUTLOOK,
+    "background-repeat": _NOT_OUTLOOK,
+    "overflow-wrap": _NOT_OUTLOOK,
+}
+
+# (property, value) -> clients that support it, where it differs from the property
+VALUE_SUPPORT: dict[tuple[str, str], int] = {
+    ("display", "flex"): APPLE_MAIL | GMAIL | OUTLOOK_COM | SAMSUNG_EMAIL | THUNDERBIRD | YAHOO,
+    ("display", "inline-flex"): APPLE_MAIL | GMAIL | OUTLOOK_COM | SAMSUNG_EMAIL | THUNDERBIRD,
+    ("display", "grid"): APPLE_MAIL | SAMSUNG_EMAIL | THUNDERBIRD,
+    ("display", "inline-grid"): APPLE_MAIL | SAMSUNG_EMAIL | THUNDERBIRD,
+    ("display", "contents"): APPLE_MAIL | THUNDERBIRD,
+    ("display", "flow-root"): APPLE_MAIL | THUNDERBIRD,
+}
+
+# Vendor prefix -> clients that understand properties starting with it
+PREFIX_SUPPORT: dict[str, int] = {
+    "mso-": OUTLOOK,
+    "-webkit-": APPLE_MAIL | SAMSUNG_EMAIL,
+    "-moz-": THUNDERBIRD,
+}
+
+# Stylesheet features -> clients that support them
+FEATURE_SUPPORT: dict[str, int] = {
+    "@media": _NOT_OUTLOOK,
+    "prefers-color-scheme": APPLE_MAIL | OUTLOOK_COM | THUNDERBIRD,
+}
+
+# Client -> {trigger property: declarations added alongside it}
+CLIENT_ADDITIONS: dict[str, dict[str, dict[str, str]]] = {
+    "outlook": {
+        # Outlook otherwise treats line-height as a minimum
+        "line-height": {"mso-line-height-rule": "exactly"},
+    },
+    "apple_mail": {
+        # Stop iOS from enlarging small text
+        "font-size": {"-webkit-text-size-adjust": "100%"},
+    },
+}
@@ -7,6 +7,8 @@ Based on https://tailwindcss.com/docs/customizing-colors
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+
 # Complete Tailwind CSS v4 color palette
 COLOR_PALETTE: dict[str, str] = {
     # Special colors
@@ -282,25 +284,29 @@ COLOR_PALETTE: dict[str, str] = {
 }
 
 
-def get_color(color_name: str) -> str | None:
+def get_color(color_name: str, palette: Mapping[str, str] | None = None) -> str | None:
     """
     Get hex color value for a Tailwind color name.
 
     Args:
         color_name: Color name like 'blue-500' or 'white'
+        palette: Palette to look up instead of COLOR_PALETTE (e.g. a theme's)
 
     Returns:
         Hex color value or None if not found
     """
-    return COLOR_PALETTE.get(color_name)
+    return (COLOR_PALETTE if palette is None else palette).get(color_name)
 
 
-def parse_color_with_opacity(class_name: str) -> tuple[str | None, float | None]:
+def parse_color_with_opacity(
+    class_name: str, palette: Mapping[str, str] | None = None
+) -> tuple[str | None, float | None]:
     """
     Parse a color class that may include opacity.
 
     Args:
         class_name: Color class like 'blue-500' or 'blue-500/75'
+        palette: Palette to look up instead of COLOR_PALETTE (e.g. a theme's)
 
     Returns:
         Tuple of (hex_color, opacity) where opacity is None if not specified
@@ -309,7 +315,7 @@ def parse_color_with_opacity(class_name: str) -> tuple[str | None, float | None]
         color_part, opacity_str = class_name.rsplit("/", 1)
         try:
             opacity = int(opacity_str) / 100
-            return get_color(color_part), opacity
+            return get_color(color_part, palette), opacity
         except ValueError:
-            return get_color(class_name), None
-    return get_color(class_name), None
+            return get_color(class_name, palette), None
+    return get_color(class_name, palette), None
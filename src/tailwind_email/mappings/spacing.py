@@ -6,6 +6,8 @@ Tailwind v4 uses a spacing multiplier where 1 unit = 0.25rem = 4px (at 16px base
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+
 # Default spacing scale in pixels (1 unit = 4px)
 # Based on Tailwind's default spacing scale
 SPACING_SCALE: dict[str, str] = {
@@ -52,7 +54,9 @@ SPACING_SPECIAL: dict[str, str] = {
 }
 
 
-def get_spacing_value(value: str, base_font_size: int = 16) -> str | None:
+def get_spacing_value(
+    value: str, base_font_size: int = 16, scale: Mapping[str, str] | None = None
+) -> str | None:
     """
     Get pixel value for a spacing value.
 
@@ -65,13 +69,16 @@ def get_spacing_value(value: str, base_font_size: int = 16) -> str | None:
     Args:
         value: The spacing value from the class
         base_font_size: Base font size for rem conversion
+        scale: Spacing scale to look up instead of SPACING_SCALE (e.g. a theme's)
 
     Returns:
         CSS value string or None if invalid
     """
     # Check scale first
-    if value in SPACING_SCALE:
-        return SPACING_SCALE[value]
+    if scale is None:
+        scale = SPACING_SCALE
+    if value in scale:
+        return scale[value]
 
     # Check special values
     if value in SPACING_SPECIAL:
@@ -0,0 +1,28 @@
+"""
+Tailwind CSS variant prefixes that map to media queries.
+
+Responsive and dark-mode variants cannot be inlined, so they are emitted as
+@media rules in a head stylesheet. Other state variants (hover:, focus:, ...)
+have no email-safe equivalent and are dropped.
+"""
+
+# Default Tailwind breakpoints (min-width in px)
+BREAKPOINTS: dict[str, int] = {
+    "sm": 640,
+    "md": 768,
+    "lg": 1024,
+    "xl": 1280,
+    "2xl": 1536,
+}
+
+# Prefix for max-width variants (max-sm:, max-md:, ...)
+MAX_BREAKPOINT_PREFIX = "max-"
+
+DARK_VARIANT = "dark"
+
+DARK_MODE_QUERY = "(prefers-color-scheme: dark)"
+
+# All variant names that can be expressed as a media query
+MEDIA_VARIANTS = frozenset(
+    [*BREAKPOINTS, *(MAX_BREAKPOINT_PREFIX + name for name in BREAKPOINTS), DARK_VARIANT]
+)
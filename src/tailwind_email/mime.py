@@ -0,0 +1,177 @@
+"""
+Quoted-printable MIME output.
+
+Converted HTML is encoded while it is serialized: chunks from
+TailwindEmailConverter.iter_convert() go straight through an incremental
+quoted-printable encoder (RFC 2045), so neither the HTML nor a second encoded
+copy of it is ever held as one string before the MIME part is built.
+
+Lines of the encoded output are at most 76 characters long. Long lines get
+soft line breaks that never split an escape sequence, and whitespace at the
+end of a line is escaped so transports cannot strip it.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+from email.message import EmailMessage
+
+from tailwind_email.charset import OUTPUT_CHARSET
+
+# Longest encoded line, excluding the line separator
+MAX_LINE_LENGTH = 76
+
+# Bytes that must be escaped anywhere in a line (space and tab only at its end)
+_UNSAFE_BYTES = re.compile(rb"[^\t\x20-\x3c\x3e-\x7e]")
+
+_EQUALS = ord("=")
+_WHITESPACE = (ord(" "), ord("\t"))
+
+
+def _escape(match: re.Match[bytes]) -> bytes:
+    """Quoted-printable escape of one byte."""
+    return b"=%02X" % match.group()[0]
+
+
+class QuotedPrintableEncoder:
+    """
+    Incremental quoted-printable encoder for text.
+
+    Example:
+        encoder = QuotedPrintableEncoder()
+        for chunk in chunks:
+            stream.write(encoder.encode(chunk))
+        stream.write(encoder.finish())
+    """
+
+    def __init__(self, charset: str = OUTPUT_CHARSET, linesep: bytes = b"\r\n") -> None:
+        """
+        Initialize the encoder.
+
+        Args:
+            charset: Encoding of the text before quoting
+            linesep: Line separator of the encoded output
+        """
+        self.charset = charset
+        self.linesep = linesep
+        # Encoded line not yet written, and whether the text ended in a CR
+        self._line = bytearray()
+        self._carriage_return = False
+
+    def encode(self, text: str) -> bytes:
+        """
+        Encode the next piece of text.
+
+        Args:
+            text: Text to encode
+
+        Returns:
+            Encoded complete lines (the current line is held back until it
+            ends or fills up)
+        """
+        if self._carriage_return:
+            text = "\r" + text
+            self._carriage_return = False
+        if text.endswith("\r"):
+            text = text[:-1]
+            self._carriage_return = True
+
+        output = bytearray()
+        lines = text.encode(self.charset).split(b"\n")
+        for index, line in enumerate(lines):
+            if index:
+                self._end_line(output)
+            if line.endswith(b"\r") and index < len(lines) - 1:
+                line = line[:-1]
+            self._append(_UNSAFE_BYTES.sub(_escape, line), output)
+        return bytes(output)
+
+    def finish(self) -> bytes:
+        """
+        Encode the rest of the text.
+
+        Returns:
+            The last encoded line, without a line separator
+        """
+        output = bytearray()
+        if self._carriage_return:
+            self._append(b"=0D", output)
+            self._carriage_return = False
+        self._escape_trailing_whitespace(output)
+        output += self._line
+        self._line = bytearray()
+        return bytes(output)
+
+    def _append(self, escaped: bytes, output: bytearray) -> None:
+        """Add escaped bytes to the current line, breaking it when it fills up."""
+        line = self._line
+        # One column is kept free for the "=" of a soft line break
+        while len(line) + len(escaped) > MAX_LINE_LENGTH - 1:
+            cut = MAX_LINE_LENGTH - 1 - len(line)
+            if cut >= 1 and escaped[cut - 1] == _EQUALS:
+                cut -= 1
+            elif cut >= 2 and escaped[cut - 2] == _EQUALS:
+                cut -= 2
+            output += line
+            output += escaped[:cut]
+            output += b"="
+            output += self.linesep
+            line.clear()
+            escaped = escaped[cut:]
+        line += escaped
+
+    def _end_line(self, output: bytearray) -> None:
+        """Write the current line followed by a hard line break."""
+        self._escape_trailing_whitespace(output)
+        output += self._line
+        output += self.linesep
+        self._line.clear()
+
+    def _escape_trailing_whitespace(self, output: bytearray) -> None:
+        """Escape a space or tab ending the current line."""
+        line = self._line
+        if line and line[-1] in _WHITESPACE:
+            last = line.pop()
+            self._append(b"=%02X" % last, output)
+
+
+def iter_quoted_printable(chunks: Iterable[str], linesep: bytes = b"\r\n") -> Iterator[bytes]:
+    """
+    Quoted-printable encode a stream of text as UTF-8.
+
+    Args:
+        chunks: Pieces of text, e.g. from TailwindEmailConverter.iter_convert()
+        linesep: Line separator of the encoded output
+
+    Yields:
+        Pieces of the encoded output
+    """
+    encoder = QuotedPrintableEncoder(linesep=linesep)
+    for chunk in chunks:
+        encoded = encoder.encode(chunk)
+        if encoded:
+            yield encoded
+    last = encoder.finish()
+    if last:
+        yield last
+
+
+def html_part(chunks: Iterable[str]) -> EmailMessage:
+    """
+    Build a quoted-printable text/html MIME part from streamed HTML.
+
+    The payload is stored encoded, so the email package writes it as is.
+    Add the part to a message with e.g. message.make_alternative() followed
+    by message.attach(part).
+
+    Args:
+        chunks: Pieces of UTF-8 HTML, e.g. from TailwindEmailConverter.iter_convert()
+
+    Returns:
+        EmailMessage holding the text/html part
+    """
+    payload = b"".join(iter_quoted_printable(chunks, linesep=b"\n")).decode("ascii")
+    part = EmailMessage()
+    part["Content-Type"] = f'text/html; charset="{OUTPUT_CHARSET}"'
+    part["Content-Transfer-Encoding"] = "quoted-printable"
+    part.set_payload(payload)
+    return part
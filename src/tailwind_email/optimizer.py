@@ -0,0 +1,669 @@
+"""
+Output size optimizations for inline styles.
+
+Provides style compaction that folds complete sets of longhand properties
+(e.g. ``padding-top`` ... ``padding-left``) into their shorthand equivalents
+while preserving the effective value of every longhand, and compact style
+syntax used by the minifying serializer.
+"""
+
+import re
+from typing import Callable, Optional
+
+from tailwind_email.utils import scan_declarations
+
+# Box sides in shorthand order
+BOX_SIDES = ("top", "right", "bottom", "left")
+
+# Border radius corners in shorthand order
+RADIUS_CORNERS = ("top-left", "top-right", "bottom-right", "bottom-left")
+
+# Border components in shorthand order
+BORDER_COMPONENTS = ("width", "style", "color")
+
+# Initial values set by border shorthands for omitted components
+BORDER_INITIAL_VALUES: dict[str, str] = {
+    "width": "medium",
+    "style": "none",
+    "color": "currentcolor",
+}
+
+BORDER_STYLE_KEYWORDS = frozenset(
+    [
+        "none",
+        "hidden",
+        "dotted",
+        "dashed",
+        "solid",
+        "double",
+        "groove",
+        "ridge",
+        "inset",
+        "outset",
+    ]
+)
+
+BORDER_WIDTH_KEYWORDS = frozenset(["thin", "medium", "thick"])
+
+# CSS-wide keywords cannot be expanded into longhands
+CSS_WIDE_KEYWORDS = frozenset(["inherit", "initial", "unset", "revert", "revert-layer"])
+
+# Properties that interact with a family's shorthand and block compaction
+_BLOCKING_PREFIXES: dict[str, tuple[str, ...]] = {
+    "padding": ("padding-inline", "padding-block"),
+    "margin": ("margin-inline", "margin-block"),
+    "border-radius": ("border-start-", "border-end-"),
+    "border": ("border-image", "border-inline", "border-block"),
+}
+
+
+def split_css_values(value: str) -> list[str]:
+    """
+    Split a CSS value on whitespace, keeping parenthesized groups together.
+
+    Args:
+        value: CSS value like '1px solid rgba(0, 0, 0, 0.5)'
+
+    Returns:
+        List of value tokens
+    """
+    tokens: list[str] = []
+    current: list[str] = []
+    depth = 0
+
+    for char in value.strip():
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+
+        if char.isspace() and depth == 0:
+            if current:
+                tokens.append("".join(current))
+                current = []
+        else:
+            current.append(char)
+
+    if current:
+        tokens.append("".join(current))
+
+    return tokens
+
+
+def expand_box_value(value: str) -> Optional[list[str]]:
+    """
+    Expand a 1-4 value box shorthand into [top, right, bottom, left].
+
+    Args:
+        value: Shorthand value like '8px 16px'
+
+    Returns:
+        List of four values, or None if the value cannot be expanded
+    """
+    if not _is_expandable(value) or "/" in value:
+        return None
+
+    tokens = split_css_values(value)
+    if len(tokens) == 1:
+        return tokens * 4
+    if len(tokens) == 2:
+        return [tokens[0], tokens[1], tokens[0], tokens[1]]
+    if len(tokens) == 3:
+        return [tokens[0], tokens[1], tokens[2], tokens[1]]
+    if len(tokens) == 4:
+        return tokens
+    return None
+
+
+def compress_box_value(values: list[str]) -> str:
+    """
+    Compress [top, right, bottom, left] into the shortest box shorthand value.
+
+    Args:
+        values: List of four values
+
+    Returns:
+        Shorthand value with 1-4 tokens
+    """
+    top, right, bottom, left = values
+    if right == left:
+        if top == bottom:
+            if top == right:
+                return top
+            return f"{top} {right}"
+        return f"{top} {right} {bottom}"
+    return f"{top} {right} {bottom} {left}"
+
+
+# Zero lengths whose unit can be dropped (e.g. '0px', '0.0px')
+_ZERO_LENGTH_RE = re.compile(r"(?<![\w.#-])-?0+(?:\.0+)?(?:px|em|rem|pt)(?![\w%])")
+
+# Six-digit hex colors made of three repeated pairs (e.g. '#ffffff', '#3366CC')
+_SHORT_HEX_RE = re.compile(r"#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3(?![0-9a-fA-F])")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Quoted strings and url() arguments are never rewritten
+_VERBATIM_RE = re.compile(r"(\"[^\"]*\"|'[^']*'|url\([^)]*\))", re.IGNORECASE)
+
+
+def shorten_hex_color(value: str) -> str:
+    """
+    Shorten six-digit hex colors to their three-digit form where possible.
+
+    Args:
+        value: CSS value that may contain hex colors like '#ffffff'
+
+    Returns:
+        Value with colors like '#fff'
+    """
+    return _SHORT_HEX_RE.sub(lambda m: f"#{m.group(1)}{m.group(2)}{m.group(3)}".lower(), value)
+
+
+def minify_css_value(value: str) -> str:
+    """
+    Write a CSS value in its most compact equivalent form.
+
+    Collapses whitespace, drops spaces after commas, removes units from zero
+    lengths and shortens hex colors. Quoted strings and url() arguments are
+    left untouched.
+
+    Args:
+        value: CSS value like '0px 16px' or 'rgba(0, 0, 0, 0.5)'
+
+    Returns:
+        Minified value
+    """
+    parts = _VERBATIM_RE.split(value.strip())
+    for i in range(0, len(parts), 2):
+        part = _WHITESPACE_RE.sub(" ", parts[i]).replace(", ", ",")
+        part = _ZERO_LENGTH_RE.sub("0", part)
+        parts[i] = shorten_hex_color(part)
+    return "".join(parts)
+
+
+def minify_style(style: str) -> str:
+    """
+    Write an inline style string with compact syntax.
+
+    Declarations are kept in order, including repeated properties used as
+    fallbacks. Styles that do not parse cleanly are returned unchanged.
+
+    Args:
+        style: Inline style string like 'margin: 0px; color: #ffffff'
+
+    Returns:
+        Compact style string like 'margin:0;color:#fff'
+    """
+    declarations, clean = scan_declarations(style)
+    if not clean:
+        return style
+    return ";".join(f"{prop}:{minify_css_value(value)}" for prop, value in declarations)
+
+
+def collapse_shorthands(properties: dict[str, str]) -> dict[str, str]:
+    """
+    Fold complete longhand sets into shorthands.
+
+    Handles ``padding``, ``margin``, ``border-radius`` and ``border``. The
+    declarations of each family are replayed in order to compute the effective
+    value of every longhand, so shorthand/longhand overrides keep their
+    cascade semantics. A family is only rewritten when the compact form is
+    shorter than the original declarations.
+
+    Args:
+        properties: Ordered dictionary of CSS property -> value
+
+    Returns:
+        New ordered dictionary with compacted declarations
+    """
+    result = properties
+    for family in _FAMILIES:
+        result = _collapse_family(result, family)
+    return result
+
+
+class _Family:
+    """Description of a shorthand family and how to encode it."""
+
+    def __init__(
+        self,
+        name: str,
+        shorthands: dict[str, Callable[[str], Optional[dict[str, str]]]],
+        longhands: tuple[str, ...],
+        encode: Callable[[dict[str, str]], list[dict[str, str]]],
+    ) -> None:
+        self.name = name
+        self.shorthands = shorthands
+        self.longhands = longhands
+        self.members = frozenset(longhands) | frozenset(shorthands)
+        self.encode = encode
+
+
+def _is_expandable(value: str) -> bool:
+    """Check whether a value can be safely expanded into longhands."""
+    lowered = value.lower()
+    if "!important" in lowered or "var(" in lowered:
+        return False
+    return lowered.strip() not in CSS_WIDE_KEYWORDS
+
+
+def _box_family(name: str, longhands: tuple[str, ...]) -> _Family:
+    """Build a family for a four-valued box shorthand."""
+
+    def expand(value: str) -> Optional[dict[str, str]]:
+        values = expand_box_value(value)
+        if values is None:
+            return None
+        return dict(zip(longhands, values))
+
+    def encode(effective: dict[str, str]) -> list[dict[str, str]]:
+        if len(effective) != len(longhands):
+            return []
+        return [{name: compress_box_value([effective[p] for p in longhands])}]
+
+    return _Family(name, {name: expand}, longhands, encode)
+
+
+def _border_slot(side: str, component: str) -> str:
+    return f"border-{side}-{component}"
+
+
+def _parse_border_value(value: str) -> Optional[dict[str, str]]:
+    """Parse a border side shorthand value into width/style/color."""
+    if not _is_expandable(value):
+        return None
+
+    parsed: dict[str, str] = {}
+    for token in split_css_values(value):
+        lowered = token.lower()
+        if lowered in BORDER_STYLE_KEYWORDS:
+            component = "style"
+        elif lowered in BORDER_WIDTH_KEYWORDS or lowered[:1].isdigit() or lowered[:1] in ".-":
+            component = "width"
+        elif lowered.startswith("calc("):
+            component = "width"
+        else:
+            component = "color"
+        if component in parsed:
+            return None
+        parsed[component] = token
+
+    for component, initial in BORDER_INITIAL_VALUES.items():
+        parsed.setdefault(component, initial)
+    return parsed
+
+
+def _border_family() -> _Family:
+    """Build the border family covering widths, styles and colors of all sides."""
+    longhands = tuple(
+        _border_slot(side, component) for side in BOX_SIDES for component in BORDER_COMPONENTS
+    )
+    shorthands: dict[str, Callable[[str], Optional[dict[str, str]]]] = {}
+
+    def full(value: str) -> Optional[dict[str, str]]:
+        parsed = _parse_border_value(value)
+        if parsed is None:
+            return None
+        return {_border_slot(s, c): parsed[c] for s in BOX_SIDES for c in BORDER_COMPONENTS}
+
+    shorthands["border"] = full
+
+    for side in BOX_SIDES:
+
+        def side_shorthand(value: str, side: str = side) -> Optional[dict[str, str]]:
+            parsed = _parse_border_value(value)
+            if parsed is None:
+                return None
+            return {_border_slot(side, c): parsed[c] for c in BORDER_COMPONENTS}
+
+        shorthands[f"border-{side}"] = side_shorthand
+
+    for component in BORDER_COMPONENTS:
+
+        def component_shorthand(value: str, component: str = component) -> Optional[dict[str, str]]:
+            values = expand_box_value(value)
+            if values is None:
+                return None
+            return {_border_slot(s, component): v for s, v in zip(BOX_SIDES, values)}
+
+        shorthands[f"border-{component}"] = component_shorthand
+
+    def encode(effective: dict[str, str]) -> list[dict[str, str]]:
+        candidates: list[dict[str, str]] = []
+
+        # Single `border` declaration when every side is identical
+        if len(effective) == len(longhands):
+            first = [effective[_border_slot("top", c)] for c in BORDER_COMPONENTS]
+            if all(
+                [effective[_border_slot(s, c)] for c in BORDER_COMPONENTS] == first
+                for s in BOX_SIDES
+            ):
+                candidates.append({"border": " ".join(first)})
+
+        # Component-wise: border-width / border-style / border-color
+        by_component: dict[str, str] = {}
+        for component in BORDER_COMPONENTS:
+            slots = [_border_slot(s, component) for s in BOX_SIDES]
+            if all(slot in effective for slot in slots):
+                by_component[f"border-{component}"] = compress_box_value(
+                    [effective[slot] for slot in slots]
+                )
+            else:
+                by_component.update({slot: effective[slot] for slot in slots if slot in effective})
+        candidates.append(by_component)
+
+        # Side-wise: border-top / border-right / ...
+        by_side: dict[str, str] = {}
+        for side in BOX_SIDES:
+            slots = [_border_slot(side, c) for c in BORDER_COMPONENTS]
+            if all(slot in effective for slot in slots):
+                by_side[f"border-{side}"] = " ".join(effective[slot] for slot in slots)
+            else:
+                by_side.update({slot: effective[slot] for slot in slots if slot in effective})
+        candidates.append(by_side)
+
+        return candidates
+
+    return _Family("border", shorthands, longhands, encode)
+
+
+def _style_length(properties: dict[str, str]) -> int:
+    """Length of declarations when serialized as 'prop: value; ...'."""
+    return sum(len(k) + len(v) + 4 for k, v in properties.items())
+
+
+def _collapse_family(properties: dict[str, str], family: _Family) -> dict[str, str]:
+    """Replace a family's declarations with its shortest equivalent encoding."""
+    members = [prop for prop in properties if prop in family.members]
+    if len(members) < 2:
+        return properties
+
+    blocking = _BLOCKING_PREFIXES.get(family.name, ())
+    if blocking and any(prop.startswith(blocking) for prop in properties):
+        return properties
+
+    # Replay declarations in order to compute effective longhand values
+    effective: dict[str, str] = {}
+    for prop in members:
+        value = properties[prop]
+        if prop in family.shorthands:
+            expanded = family.shorthands[prop](value)
+            if expanded is None:
+                return properties
+            effective.update(expanded)
+        else:
+            if not _is_expandable(value):
+                return properties
+            effective[prop] = value
+
+    original = {prop: properties[prop] for prop in members}
+    best = original
+    for candidate in family.encode(effective):
+        if _style_length(candidate) < _style_length(best):
+            best = candidate
+
+    if best is original:
+        return properties
+
+    # Emit the replacement at the position of the family's first declaration
+    result: dict[str, str] = {}
+    for prop, value in properties.items():
+        if prop in family.members:
+            if prop == members[0]:
+                result.update(best)
+            continue
+        result[prop] = value
+    return result
+
+
+_FAMILIES = (
+    _box_family("padding", tuple(f"padding-{side}" for side in BOX_SIDES)),
+    _box_family("margin", tuple(f"margin-{side}" for side in BOX_SIDES)),
+    _box_family("border-radius", tuple(f"border-{corner}-radius" for corner in RADIUS_CORNERS)),
+    _border_family(),
+)
+
+
+# CSS properties whose computed value is inherited by descendants
+INHERITED_PROPERTIES = frozenset(
+    [
+        "color",
+        "direction",
+        "font-family",
+        "font-size",
+        "font-style",
+        "font-variant",
+        "font-weight",
+        "letter-spacing",
+        "line-height",
+        "mso-line-height-rule",
+        "overflow-wrap",
+        "text-align",
+        "text-indent",
+        "text-transform",
+        "visibility",
+        "white-space",
+        "word-break",
+        "word-spacing",
+        "-webkit-font-smoothing",
+        "-moz-osx-font-smoothing",
+    ]
+)
+
+# Elements that do not reliably inherit text styles in email clients
+# (quirks-mode tables, Outlook's Word engine, form controls)
+INHERITANCE_BARRIER_TAGS = frozenset(
+    [
+        "table",
+        "caption",
+        "thead",
+        "tbody",
+        "tfoot",
+        "tr",
+        "td",
+        "th",
+        "button",
+        "input",
+        "select",
+        "option",
+        "textarea",
+    ]
+)
+
+# Inherited properties that user-agent stylesheets set on specific elements
+UA_STYLED_PROPERTIES: dict[str, frozenset[str]] = {
+    "a": frozenset(["color"]),
+    "h1": frozenset(["font-size", "font-weight"]),
+    "h2": frozenset(["font-size", "font-weight"]),
+    "h3": frozenset(["font-size", "font-weight"]),
+    "h4": frozenset(["font-size", "font-weight"]),
+    "h5": frozenset(["font-size", "font-weight"]),
+    "h6": frozenset(["font-size", "font-weight"]),
+    "b": frozenset(["font-weight"]),
+    "strong": frozenset(["font-weight"]),
+    "i": frozenset(["font-style"]),
+    "em": frozenset(["font-style"]),
+    "cite": frozenset(["font-style"]),
+    "var": frozenset(["font-style"]),
+    "dfn": frozenset(["font-style"]),
+    "address": frozenset(["font-style"]),
+    "small": frozenset(["font-size"]),
+    "big": frozenset(["font-size"]),
+    "sub": frozenset(["font-size"]),
+    "sup": frozenset(["font-size"]),
+    "code": frozenset(["font-family"]),
+    "kbd": frozenset(["font-family"]),
+    "samp": frozenset(["font-family"]),
+    "tt": frozenset(["font-family"]),
+    "pre": frozenset(["font-family", "white-space"]),
+    "listing": frozenset(["font-family", "white-space"]),
+    "xmp": frozenset(["font-family", "white-space"]),
+    "center": frozenset(["text-align"]),
+    "mark": frozenset(["color"]),
+    "font": frozenset(["color", "font-family", "font-size"]),
+}
+
+# Presentational attributes that set inherited properties
+PRESENTATIONAL_ATTRIBUTES: dict[str, str] = {
+    "align": "text-align",
+    "dir": "direction",
+    "color": "color",
+    "face": "font-family",
+}
+
+# Inherited longhands set by shorthand properties
+INHERITED_SHORTHANDS: dict[str, tuple[str, ...]] = {
+    "font": (
+        "font-family",
+        "font-size",
+        "font-style",
+        "font-variant",
+        "font-weight",
+        "line-height",
+    ),
+}
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_DECLARED_PROPERTY_RE = re.compile(r"(-?[a-zA-Z][\w-]*)\s*:")
+
+# Values whose computed result depends on the element's own context
+_RELATIVE_VALUE_RE = re.compile(r"\d(?:em|ex|ch|lh|%)|smaller|larger|var\(|calc\(", re.IGNORECASE)
+
+
+def declared_properties(css: str) -> frozenset[str]:
+    """
+    List the properties a stylesheet may set.
+
+    Inherited shorthands also count as their inherited longhands. Any name
+    followed by a colon counts, so the result errs on the side of too many
+    properties.
+
+    Args:
+        css: Stylesheet text
+
+    Returns:
+        Lowercase properties declared by some rule of the stylesheet
+    """
+    names = {name.lower() for name in _DECLARED_PROPERTY_RE.findall(_CSS_COMMENT_RE.sub("", css))}
+    for shorthand, longhands in INHERITED_SHORTHANDS.items():
+        if shorthand in names:
+            names.update(longhands)
+    return frozenset(names)
+
+
+def stylesheet_properties(css: str) -> frozenset[str]:
+    """
+    List the inherited properties a stylesheet may set.
+
+    Args:
+        css: Stylesheet text
+
+    Returns:
+        Inherited properties declared by some rule of the stylesheet (see
+        declared_properties())
+    """
+    return declared_properties(css) & INHERITED_PROPERTIES
+
+
+def overlaps(prop: str, properties: frozenset[str]) -> bool:
+    """
+    Check whether rules setting some properties may change a property.
+
+    A property overlaps itself, its shorthands ('padding' for
+    'padding-left', 'border' for 'border-top-color') and its longhands.
+
+    Args:
+        prop: Lowercase CSS property name
+        properties: Lowercase property names set elsewhere
+
+    Returns:
+        True if a declaration of one of the properties may override prop
+    """
+    if prop in properties:
+        return True
+    for name in properties:
+        if prop.startswith(name + "-") or name.startswith(prop + "-"):
+            return True
+    return False
+
+
+def prune_inherited(
+    tag_name: str,
+    attributes: dict[str, object],
+    declarations: dict[str, str],
+    inherited: dict[str, str],
+    contested: frozenset[str] = frozenset(),
+) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    Drop inherited-property declarations that equal the parent's computed value.
+
+    ``inherited`` holds the computed values known from ancestors' inline
+    styles. Declarations are only dropped when the parent value is known, the
+    element does not reset the property itself (user-agent styles, tables,
+    presentational attributes) and the value is not relative to the element.
+
+    Properties in ``contested`` may also be set by stylesheet rules (head
+    <style> blocks, variant @media rules), so their inline values are not
+    known to be the computed ones: they are kept and not passed on. The same
+    goes for the longhands of an inherited shorthand ('font') the element
+    declares itself.
+
+    Args:
+        tag_name: Element name
+        attributes: Element attributes
+        declarations: The element's inline declarations
+        inherited: Known computed values of inherited properties on the parent
+        contested: Properties stylesheet rules may set on the element
+
+    Returns:
+        Tuple of (declarations to keep, known computed values for children)
+    """
+    if tag_name in INHERITANCE_BARRIER_TAGS:
+        inherited = {}
+
+    reset = UA_STYLED_PROPERTIES.get(tag_name, frozenset()) | contested
+    for attribute, prop in PRESENTATIONAL_ATTRIBUTES.items():
+        if attribute in attributes:
+            reset = reset | {prop}
+
+    kept: dict[str, str] = {}
+    context = inherited
+    copied = False
+
+    for prop in reset:
+        if prop in context:
+            if not copied:
+                context = dict(context)
+                copied = True
+            del context[prop]
+
+    for prop, value in declarations.items():
+        if prop not in INHERITED_PROPERTIES:
+            kept[prop] = value
+            longhands = INHERITED_SHORTHANDS.get(prop.lower(), ())
+            if any(longhand in context for longhand in longhands):
+                # The shorthand resets its longhands to values not tracked here
+                if not copied:
+                    context = dict(context)
+                    copied = True
+                for longhand in longhands:
+                    context.pop(longhand, None)
+            continue
+
+        prunable = "!important" not in value and not _RELATIVE_VALUE_RE.search(value)
+        if prunable and prop not in reset and inherited.get(prop) == value:
+            continue
+
+        kept[prop] = value
+        if value.strip().lower() == "inherit":
+            continue
+        if not copied:
+            context = dict(context)
+            copied = True
+        if prunable and prop not in contested:
+            context[prop] = value
+        else:
+            context.pop(prop, None)
+
+    return kept, context
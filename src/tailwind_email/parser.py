@@ -3,9 +3,14 @@ HTML parser for extracting and processing Tailwind classes.
 """
 
 from collections.abc import Iterator
+from typing import Optional, Union
 
 from bs4 import BeautifulSoup, Tag
 
+from tailwind_email.charset import DEFAULT_CHARSET
+from tailwind_email.mappings.variants import MEDIA_VARIANTS
+from tailwind_email.theme import DEFAULT_THEME, ThemeTables
+
 
 class TailwindClassParser:
     """Parser for extracting Tailwind classes from HTML elements."""
@@ -397,20 +402,37 @@ class TailwindClassParser:
         ]
     )
 
-    def __init__(self) -> None:
-        """Initialize the parser."""
-        pass
+    def __init__(self, theme: Optional[ThemeTables] = None) -> None:
+        """
+        Initialize the parser.
 
-    def parse_html(self, html: str) -> BeautifulSoup:
+        Args:
+            theme: Compiled theme whose spacing keys (e.g. 'p-gutter') count
+                as Tailwind classes (default: built-in tables)
+        """
+        self.theme = theme or DEFAULT_THEME
+
+    def parse_html(self, html: Union[str, bytes], encoding: Optional[str] = None) -> BeautifulSoup:
         """
         Parse HTML string into BeautifulSoup object.
 
+        Bytes are decoded by the parser itself, without a Python string copy
+        of the document. lxml gives up on some encodings when it meets bytes
+        they do not define; such input is decoded here instead, with
+        undecodable bytes replaced.
+
         Args:
-            html: HTML string to parse
+            html: HTML string or bytes to parse
+            encoding: Encoding of bytes (detected by the parser when not given)
 
         Returns:
             BeautifulSoup object
         """
+        if isinstance(html, bytes):
+            soup = BeautifulSoup(html, "lxml", from_encoding=encoding)
+            if soup.contents or not html.strip():
+                return soup
+            html = html.decode(encoding or DEFAULT_CHARSET, "replace")
         return BeautifulSoup(html, "lxml")
 
     def get_elements_with_classes(self, soup: BeautifulSoup) -> Iterator[Tag]:
@@ -477,6 +499,34 @@ class TailwindClassParser:
 
         return result
 
+    def split_variants(self, cls: str) -> Optional[tuple[tuple[str, ...], str]]:
+        """
+        Split a responsive or dark-mode variant class into variants and base class.
+
+        Args:
+            cls: Class name such as 'md:p-6' or 'md:dark:bg-gray-900'
+
+        Returns:
+            Tuple of (variant names, base class), or None if the class has no
+            media-query variant or also uses a state variant such as hover:
+        """
+        variants: list[str] = []
+        base = cls
+        while not base.startswith("["):
+            prefix, sep, rest = base.partition(":")
+            if not sep or prefix not in MEDIA_VARIANTS:
+                break
+            variants.append(prefix)
+            base = rest
+
+        if not variants or not base:
+            return None
+        if any(base.startswith(prefix) for prefix in self.STATE_PREFIXES):
+            return None
+        if any(base.startswith(prefix) for prefix in self.RESPONSIVE_PREFIXES):
+            return None
+        return tuple(variants), base
+
     def _is_unsupported_pattern(self, cls: str) -> bool:
         """
         Check if a class matches unsupported patterns.
@@ -628,7 +678,7 @@ class TailwindClassParser:
 
                 if re.match(pattern, cls):
                     return True
-                return False
+                return cls[len(prefix) :] in self.theme.spacing
 
         # Other prefixes that are less ambiguous
         safe_prefixes = (
@@ -0,0 +1,218 @@
+"""
+Precompiled conversion plans.
+
+A plan records, for one template structure, the class attribute of every
+element in document order together with the class and style attributes the
+converter produced for it. Applying the plan to HTML rendered from the same
+structure only tokenizes start tags and splices the recorded attributes in:
+nothing is parsed into a tree and no class is resolved again.
+
+Plans only cover element-local conversion. Options whose result depends on
+the rest of the document (see DOCUMENT_OPTIONS) make every apply() fall back
+to a full conversion. HTML whose classed elements differ from the compiled
+structure is converted on its own, with the result spliced into its markup
+the same way, so both paths return the input's markup with converted
+attributes.
+"""
+
+import html as html_module
+import re
+from typing import TYPE_CHECKING, Callable, Optional
+
+from bs4.dammit import EntitySubstitution
+
+from tailwind_email.utils import (
+    MARKUP_PATTERN,
+    find_attributes,
+    replace_class_attribute,
+    unquote_attribute,
+)
+
+if TYPE_CHECKING:
+    from tailwind_email.converter import ConversionOptions
+
+# Options that make conversion depend on more than each element's own attributes
+DOCUMENT_OPTIONS: tuple[str, ...] = (
+    "prune_inherited",
+    "minify",
+    "fit_to_budget",
+    "variant_styles",
+    "inline_style_blocks",
+    "component_css",
+)
+
+# (tag name, class string, style attribute or None) of a classed element
+ElementKey = tuple[str, str, Optional[str]]
+
+
+def is_spliceable(options: "ConversionOptions") -> bool:
+    """
+    Check whether conversions with some options can be replayed by a plan.
+
+    Args:
+        options: Conversion options
+
+    Returns:
+        True if every converted attribute depends only on its own element
+    """
+    if options.compatibility == "modern":
+        return False
+    return not any(getattr(options, name) for name in DOCUMENT_OPTIONS)
+
+
+def element_keys(html: str) -> list[ElementKey]:
+    """
+    List the classed start tags of raw HTML in document order.
+
+    Args:
+        html: HTML source
+
+    Returns:
+        Key of each element with a class attribute
+    """
+    keys: list[ElementKey] = []
+    for match in MARKUP_PATTERN.finditer(html):
+        name = match.group(2)
+        if name is None:
+            continue
+        key = _tag_key(name, find_attributes(match.group(3)))
+        if key is not None:
+            keys.append(key)
+    return keys
+
+
+class ConversionPlan:
+    """
+    Replays a conversion on HTML rendered from the same template structure.
+
+    Created by TailwindEmailConverter.compile().
+    """
+
+    def __init__(
+        self,
+        fallback: Callable[[str], str],
+        keys: Optional[list[ElementKey]],
+        attributes: Optional[list[dict[str, str]]] = None,
+        is_current: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """
+        Initialize the plan.
+
+        Args:
+            fallback: Full conversion used when the plan does not apply
+            keys: Classed elements of the compiled HTML, or None when the
+                conversion cannot be replayed
+            attributes: Converted class/style attributes of each element
+            is_current: Check that the converter has not changed (e.g. by a
+                theme reload) since the plan was compiled
+        """
+        self.fallback = fallback
+        self.keys = keys
+        self.attributes = attributes or []
+        self.is_current = is_current
+        # Number of apply() calls that needed a full conversion
+        self.fallbacks = 0
+
+    @property
+    def spliceable(self) -> bool:
+        """Whether the plan can be applied without a full conversion."""
+        return self.keys is not None
+
+    def matches(self, html: str) -> bool:
+        """
+        Check whether HTML has the compiled structure.
+
+        Args:
+            html: Rendered HTML
+
+        Returns:
+            True if its classed elements are those the plan was compiled from
+        """
+        return self.keys is not None and element_keys(html) == self.keys
+
+    def apply(self, html: str) -> str:
+        """
+        Convert HTML rendered from the compiled template structure.
+
+        Args:
+            html: Rendered HTML
+
+        Returns:
+            HTML with the recorded styles spliced in, or the fallback's
+            conversion when the structure differs
+        """
+        keys = self.keys
+        if keys is not None and (self.is_current is None or self.is_current()):
+            spliced = splice(html, keys, self.attributes)
+            if spliced is not None:
+                return spliced
+        self.fallbacks += 1
+        return self.fallback(html)
+
+
+def splice(html: str, keys: list[ElementKey], attributes: list[dict[str, str]]) -> Optional[str]:
+    """
+    Put converted attributes into the classed start tags of raw HTML.
+
+    Everything but the class and style attributes of classed elements is
+    kept as written.
+
+    Args:
+        html: HTML source
+        keys: Expected key of each classed element, in document order
+        attributes: Converted class/style attributes of each element
+
+    Returns:
+        HTML with the attributes spliced in, or None when its classed
+        elements are not the expected ones
+    """
+    parts: list[str] = []
+    position = 0
+    index = 0
+    for match in MARKUP_PATTERN.finditer(html):
+        name = match.group(2)
+        if name is None:
+            continue
+        found = find_attributes(match.group(3))
+        key = _tag_key(name, found)
+        if key is None:
+            continue
+        if index >= len(keys) or key != keys[index]:
+            return None
+
+        replacement = " ".join(
+            f"{attribute}={_quoted(value)}" for attribute, value in attributes[index].items()
+        )
+        parts.append(html[position : match.start()])
+        parts.append(f"<{name}{replace_class_attribute(match.group(3), found, replacement)}>")
+        position = match.end()
+        index += 1
+
+    if index != len(keys):
+        return None
+    parts.append(html[position:])
+    return "".join(parts)
+
+
+def _tag_key(name: str, found: dict[str, re.Match[str]]) -> Optional[ElementKey]:
+    """Key of a raw start tag, or None when it has no class attribute."""
+    class_attribute = found.get("class")
+    if class_attribute is None:
+        return None
+    style_attribute = found.get("style")
+    return (
+        name.lower(),
+        " ".join(_attribute_value(class_attribute.group(2)).split()),
+        _attribute_value(style_attribute.group(2)) if style_attribute is not None else None,
+    )
+
+
+def _attribute_value(raw: Optional[str]) -> str:
+    """Decoded text of a raw attribute value."""
+    return html_module.unescape(unquote_attribute(raw)[0]) if raw is not None else ""
+
+
+def _quoted(value: str) -> str:
+    """Escape and quote an attribute value like the serializer."""
+    escaped: str = EntitySubstitution.substitute_xml(value)
+    return str(EntitySubstitution.quoted_attribute_value(escaped))
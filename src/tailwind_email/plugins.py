@@ -0,0 +1,239 @@
+"""
+Element handlers run during conversion.
+
+Post-processing steps such as click-tracking link rewrites, role attributes
+on layout tables or image dimensions are often done by parsing the
+converted HTML again with another tool. Registered as handlers, they run in
+the converter's own walk instead: every element is passed to the handlers
+for its tag right after its classes are converted, together with the
+parsed document and the element's final inline styles.
+
+Example:
+    converter = TailwindEmailConverter()
+    converter.plugins.register(presentation_tables, tags=["table"])
+    converter.plugins.register(link_rewriter(track), tags=["a"])
+"""
+
+import re
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Callable, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+from tailwind_email.utils import parse_style_string
+
+if TYPE_CHECKING:
+    from tailwind_email.converter import ConversionOptions
+    from tailwind_email.template import TemplatePlaceholders
+
+# Handler called with an element and the context of its conversion
+ElementHandler = Callable[[Tag, "VisitContext"], None]
+
+# Inline style lengths that can be written as width/height attributes
+_DIMENSION_RE = re.compile(r"^(\d+(?:\.\d+)?)(px|%)$")
+
+
+class VisitContext:
+    """State shared by the element handlers of one conversion."""
+
+    def __init__(
+        self,
+        soup: BeautifulSoup,
+        options: "ConversionOptions",
+        placeholders: Optional["TemplatePlaceholders"] = None,
+    ) -> None:
+        """
+        Initialize the context.
+
+        Args:
+            soup: Document being converted
+            options: Options of the conversion
+            placeholders: Template placeholders, when converting template source
+        """
+        self.soup = soup
+        self.options = options
+        self.placeholders = placeholders
+
+    def style(self, element: Tag) -> dict[str, str]:
+        """
+        Get the inline styles of an element.
+
+        Args:
+            element: Element already visited (or being visited)
+
+        Returns:
+            Dictionary of CSS property -> value, as converted
+        """
+        style = element.get("style")
+        if not style:
+            return {}
+        return parse_style_string(" ".join(style) if isinstance(style, list) else str(style))
+
+    def set_style(self, element: Tag, properties: dict[str, str]) -> None:
+        """
+        Replace the inline styles of an element.
+
+        Args:
+            element: Element to update
+            properties: Dictionary of CSS property -> value (empty removes the
+                style attribute)
+        """
+        if properties:
+            element["style"] = "; ".join(f"{k}: {v}" for k, v in properties.items())
+        elif "style" in element.attrs:
+            del element["style"]
+
+    def is_template(self, value: str) -> bool:
+        """
+        Check whether an attribute value is decided when the template renders.
+
+        Args:
+            value: Attribute value
+
+        Returns:
+            True if the value contains a template region
+        """
+        return self.placeholders is not None and self.placeholders.contains(value)
+
+
+class PluginRegistry:
+    """
+    Element handlers, dispatched by tag name.
+
+    Handlers of an element run in registration order. A handler may change
+    its element's attributes, contents and styles, or remove the element, in
+    which case its descendants are not visited.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        # (handler, tag names or None for every element) in registration order
+        self._registered: list[tuple[ElementHandler, Optional[frozenset[str]]]] = []
+        # Tag name -> handlers for it, built on first use
+        self._dispatch: dict[str, tuple[ElementHandler, ...]] = {}
+
+    def register(self, handler: ElementHandler, tags: Optional[Iterable[str]] = None) -> None:
+        """
+        Register an element handler.
+
+        Args:
+            handler: Callable taking (element, context)
+            tags: Tag names the handler is for (default: every element)
+        """
+        names = frozenset(tag.lower() for tag in tags) if tags is not None else None
+        self._registered.append((handler, names))
+        self._dispatch = {}
+
+    def handlers(self, name: str) -> tuple[ElementHandler, ...]:
+        """
+        Get the handlers for a tag.
+
+        Args:
+            name: Tag name
+
+        Returns:
+            Handlers to run, in registration order
+        """
+        handlers = self._dispatch.get(name)
+        if handlers is None:
+            handlers = tuple(
+                handler for handler, tags in self._registered if tags is None or name in tags
+            )
+            self._dispatch[name] = handlers
+        return handlers
+
+    def visit(self, element: Tag, context: VisitContext) -> bool:
+        """
+        Run the handlers for an element.
+
+        Args:
+            element: Element being converted
+            context: Conversion context
+
+        Returns:
+            False if a handler removed the element, True otherwise
+        """
+        for handler in self.handlers(element.name):
+            handler(element, context)
+            if element.parent is None:
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self._registered)
+
+
+def presentation_tables(element: Tag, context: VisitContext) -> None:
+    """
+    Mark a layout table as presentational for screen readers.
+
+    Register for "table". Tables with a role are left alone.
+
+    Args:
+        element: Table element
+        context: Conversion context
+    """
+    if "role" not in element.attrs:
+        element["role"] = "presentation"
+
+
+def strip_scripts(element: Tag, context: VisitContext) -> None:
+    """
+    Remove an element, e.g. a <script> that email clients would not run.
+
+    Register for "script".
+
+    Args:
+        element: Element to remove
+        context: Conversion context
+    """
+    element.decompose()
+
+
+def image_dimensions(element: Tag, context: VisitContext) -> None:
+    """
+    Copy an image's converted width and height into HTML attributes.
+
+    Outlook sizes images by their attributes and ignores the inline styles.
+    Pixel lengths become bare numbers and percentages are kept; attributes
+    already present are left alone. Register for "img".
+
+    Args:
+        element: Image element
+        context: Conversion context
+    """
+    style = context.style(element)
+    for name in ("width", "height"):
+        value = style.get(name)
+        if value is None or name in element.attrs:
+            continue
+        match = _DIMENSION_RE.match(value)
+        if match is not None:
+            number, unit = match.groups()
+            number = number[:-2] if number.endswith(".0") else number
+            element[name] = number if unit == "px" else number + unit
+
+
+def link_rewriter(rewrite: Callable[[str], Optional[str]]) -> ElementHandler:
+    """
+    Build a handler rewriting link targets, e.g. for click tracking.
+
+    Register the handler for "a" (and "area" if image maps are used).
+
+    Args:
+        rewrite: Called with each href; returns the new href, or None to
+            keep it
+
+    Returns:
+        Element handler
+    """
+
+    def handler(element: Tag, context: VisitContext) -> None:
+        href = element.get("href")
+        if not isinstance(href, str) or not href:
+            return
+        rewritten = rewrite(href)
+        if rewritten is not None:
+            element["href"] = rewritten
+
+    return handler
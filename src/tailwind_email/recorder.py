@@ -0,0 +1,280 @@
+"""
+Slow-conversion flight recorder.
+
+Captures the input HTML, options and phase timings of conversions that exceed
+a configurable threshold into a bounded spool directory, so that slow cases
+seen in production can be replayed and profiled offline. Each case also notes
+how the conversion was entered (method, fragment flag, encoding of bytes
+input) and the key of the theme tables in use, and is replayed the same way.
+
+Replay a spooled case under cProfile with:
+
+    python -m tailwind_email.recorder replay <case.json>
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional, TextIO, Union
+
+# Prefix and suffix for spooled case files
+CASE_PREFIX = "case-"
+CASE_SUFFIX = ".json"
+
+# Converter methods a case can be replayed through
+ENTRY_POINTS = ("convert_with_report", "iter_convert")
+
+
+class SlowConversionRecorder:
+    """Records conversions slower than a threshold into a spool directory."""
+
+    def __init__(
+        self,
+        spool_dir: Union[str, Path],
+        threshold_ms: float = 500.0,
+        max_cases: int = 50,
+    ) -> None:
+        """
+        Initialize the recorder.
+
+        Args:
+            spool_dir: Directory where slow cases are written
+            threshold_ms: Minimum total conversion time (ms) to record (default: 500)
+            max_cases: Maximum number of cases kept in the spool (default: 50)
+        """
+        self.spool_dir = Path(spool_dir)
+        self.threshold_ms = threshold_ms
+        self.max_cases = max_cases
+        self._counter = 0
+
+    def should_record(self, total_ms: float) -> bool:
+        """
+        Check whether a conversion of the given duration should be recorded.
+
+        Args:
+            total_ms: Total conversion time in milliseconds
+
+        Returns:
+            True if the conversion exceeded the threshold
+        """
+        return total_ms >= self.threshold_ms and self.max_cases > 0
+
+    def record(
+        self,
+        html: str,
+        options: dict[str, Any],
+        timings: dict[str, float],
+        entry: str = "convert_with_report",
+        fragment: bool = False,
+        encoding: Optional[str] = None,
+        theme_key: Optional[str] = None,
+    ) -> Optional[Path]:
+        """
+        Write a slow conversion case to the spool directory.
+
+        Recording never raises: filesystem errors are swallowed so that a full
+        or read-only spool cannot break conversion.
+
+        Args:
+            html: Input HTML that was converted
+            options: Conversion options as a dictionary
+            timings: Phase timings in milliseconds
+            entry: Converter method the conversion ran through, one of
+                ENTRY_POINTS (default: 'convert_with_report')
+            fragment: Whether the input was converted as a fragment
+            encoding: Encoding of bytes input, or None for string input
+            theme_key: Key of the ThemeTables the conversion used
+
+        Returns:
+            Path of the written case file, or None if it could not be written
+        """
+        total_ms = sum(timings.values())
+        self._counter += 1
+        name = f"{CASE_PREFIX}{time.time_ns()}-{os.getpid()}-{self._counter}{CASE_SUFFIX}"
+        case = {
+            "recorded_at": time.time(),
+            "total_ms": round(total_ms, 3),
+            "timings": {phase: round(ms, 3) for phase, ms in timings.items()},
+            "entry": entry,
+            "fragment": fragment,
+            "encoding": encoding,
+            "theme_key": theme_key,
+            "options": options,
+            "html": html,
+        }
+
+        try:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            path = self.spool_dir / name
+            # Write to a temporary name first so readers never see partial cases
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(case), encoding="utf-8")
+            tmp_path.replace(path)
+            self._enforce_bound()
+        except OSError:
+            return None
+
+        return path
+
+    def list_cases(self) -> list[Path]:
+        """
+        List spooled case files, oldest first.
+
+        Returns:
+            List of case file paths
+        """
+        if not self.spool_dir.is_dir():
+            return []
+        return sorted(
+            self.spool_dir.glob(f"{CASE_PREFIX}*{CASE_SUFFIX}"),
+            key=lambda p: p.name,
+        )
+
+    def _enforce_bound(self) -> None:
+        """Delete the oldest cases until the spool holds at most max_cases."""
+        cases = self.list_cases()
+        for path in cases[: max(len(cases) - self.max_cases, 0)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def load_case(path: Union[str, Path]) -> dict[str, Any]:
+    """
+    Load a spooled case file.
+
+    Args:
+        path: Path to a case file written by SlowConversionRecorder
+
+    Returns:
+        Case dictionary with 'html', 'options' and 'timings' keys, and the
+        'entry', 'fragment', 'encoding' and 'theme_key' it was recorded with
+    """
+    with open(path, encoding="utf-8") as f:
+        case: dict[str, Any] = json.load(f)
+    return case
+
+
+def replay_case(
+    path: Union[str, Path],
+    limit: int = 20,
+    sort: str = "tottime",
+    repeat: int = 1,
+    stream: Optional[TextIO] = None,
+) -> pstats.Stats:
+    """
+    Replay a spooled case under cProfile and print the hottest functions.
+
+    The case is converted through the method it was recorded from, with the
+    same fragment flag, and bytes input is encoded again with the encoding
+    it was decoded with. Cases recorded before these were stored replay as
+    convert(). The theme is compiled from the recorded options; a warning is
+    printed when its key differs from the recorded one, e.g. because the
+    recording converter was given tables that options.theme does not
+    describe.
+
+    Args:
+        path: Path to a case file
+        limit: Number of functions to print (default: 20)
+        sort: pstats sort key (default: 'tottime')
+        repeat: Number of times to run the conversion (default: 1)
+        stream: Output stream (default: sys.stdout)
+
+    Returns:
+        Collected profile statistics
+
+    Raises:
+        ValueError: If the case names an unknown entry point
+    """
+    # Imported here to avoid a circular import with the converter module
+    from tailwind_email.converter import ConversionOptions, TailwindEmailConverter
+
+    out = stream or sys.stdout
+    case = load_case(path)
+    entry = case.get("entry", "convert_with_report")
+    if entry not in ENTRY_POINTS:
+        raise ValueError(f"Unknown entry point in case: {entry!r}")
+    fragment = bool(case.get("fragment", False))
+    encoding = case.get("encoding")
+    converter = TailwindEmailConverter(ConversionOptions.from_dict(case.get("options", {})))
+    html: Union[str, bytes] = case["html"]
+    if encoding is not None:
+        html = case["html"].encode(encoding, "replace")
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(max(repeat, 1)):
+        if entry == "iter_convert":
+            for _chunk in converter.iter_convert(html, fragment, encoding):
+                pass
+        else:
+            converter.convert_with_report(html, fragment, encoding)
+    profiler.disable()
+
+    recorded = case.get("timings", {})
+    out.write(f"Case: {path}\n")
+    out.write(f"Recorded total: {case.get('total_ms', 0):.1f}ms ")
+    out.write("(" + ", ".join(f"{k}={v:.1f}ms" for k, v in recorded.items()) + ")\n")
+    input_kind = f"bytes ({encoding})" if encoding is not None else "str"
+    out.write(f"Entry: {entry}, fragment={fragment}, input={input_kind}\n")
+    theme_key = case.get("theme_key")
+    if theme_key is not None and theme_key != converter.theme.key:
+        out.write(
+            f"Warning: recorded theme {theme_key[:12]} differs from the replayed "
+            f"theme {converter.theme.key[:12]}\n"
+        )
+
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.sort_stats(sort).print_stats(limit)
+    out.write(buffer.getvalue())
+
+    return stats
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv: Command-line arguments (default: sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m tailwind_email.recorder",
+        description="Inspect and replay slow conversion cases.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    replay = commands.add_parser("replay", help="Replay a case under cProfile")
+    replay.add_argument("path", help="Case file to replay")
+    replay.add_argument("--limit", type=int, default=20, help="Functions to print")
+    replay.add_argument("--sort", default="tottime", help="pstats sort key")
+    replay.add_argument("--repeat", type=int, default=1, help="Conversions to run")
+
+    list_cmd = commands.add_parser("list", help="List spooled cases")
+    list_cmd.add_argument("spool_dir", help="Spool directory")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "replay":
+        replay_case(args.path, limit=args.limit, sort=args.sort, repeat=args.repeat)
+        return 0
+
+    for path in SlowConversionRecorder(args.spool_dir).list_cases():
+        case = load_case(path)
+        print(f"{path.name}\t{case.get('total_ms', 0):.1f}ms\t{len(case.get('html', ''))} chars")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Per-tenant themes.
+
+Senders that convert for many brands register each brand's theme as a small
+overlay over the built-in tables. Overlays are only compiled into lookup
+tables, together with a converter using them, when a tenant is first
+converted for; compiled tenants are evicted least-recently-used once their
+tables and class caches exceed the registry's memory cap and are recompiled
+on next use.
+"""
+
+from collections import OrderedDict
+from typing import Any, Optional
+
+from tailwind_email.converter import ConversionOptions, TailwindEmailConverter
+from tailwind_email.plugins import PluginRegistry
+from tailwind_email.recorder import SlowConversionRecorder
+from tailwind_email.theme import ThemeConfig, ThemeTables, load_theme_config, theme_hash
+
+# Default memory cap for compiled tenant tables, in bytes
+DEFAULT_MAX_THEME_BYTES = 8 * 1024 * 1024
+
+
+class ThemeRegistry:
+    """
+    Tenant themes with lazily compiled, LRU-evicted converters.
+
+    Example:
+        registry = ThemeRegistry(ConversionOptions(minify=True))
+        registry.register("acme", {"colors": {"brand": "#0b5fff"}})
+        html = registry.converter("acme").convert(template)
+    """
+
+    def __init__(
+        self,
+        options: Optional[ConversionOptions] = None,
+        max_bytes: int = DEFAULT_MAX_THEME_BYTES,
+        recorder: Optional[SlowConversionRecorder] = None,
+        plugins: Optional[PluginRegistry] = None,
+    ) -> None:
+        """
+        Initialize the registry.
+
+        Args:
+            options: Conversion options shared by all tenants; each tenant's
+                converter gets a copy with its own theme
+            max_bytes: Memory cap for compiled tenant tables and the class
+                caches of their converters; the most recently used tenant
+                is always kept
+            recorder: Optional recorder passed to every tenant converter
+            plugins: Optional element handlers shared by every tenant converter
+        """
+        self.options = options or ConversionOptions()
+        self.max_bytes = max_bytes
+        self.recorder = recorder
+        self.plugins = plugins
+        # Registered overlays: tenant id -> (theme dictionary, hash)
+        self._overlays: dict[str, tuple[dict[str, Any], str]] = {}
+        # Compiled tenants with their accounted size, least recently used first
+        self._compiled: OrderedDict[str, tuple[TailwindEmailConverter, int]] = OrderedDict()
+        self._compiled_bytes = 0
+
+    def register(self, tenant_id: str, config: Optional[ThemeConfig]) -> None:
+        """
+        Register or replace a tenant's theme.
+
+        The overlay is stored as given and compiled on first use. When the
+        tenant already has a compiled converter, a changed theme is compiled
+        now and hot-swapped into it, keeping the converter's warm caches.
+
+        Args:
+            tenant_id: Tenant identifier
+            config: Theme dictionary or JSON string (None for the defaults)
+
+        Raises:
+            ValueError: If the theme is malformed
+        """
+        overlay = load_theme_config(config)
+        key = theme_hash(overlay)
+        entry = self._compiled.get(tenant_id)
+        if entry is not None and entry[0].theme.key != key:
+            entry[0].reload_theme(overlay, ThemeTables.from_config(overlay, key))
+            self._account(tenant_id)
+        self._overlays[tenant_id] = (overlay, key)
+
+    def unregister(self, tenant_id: str) -> None:
+        """
+        Remove a tenant and its compiled converter.
+
+        Args:
+            tenant_id: Tenant identifier
+
+        Raises:
+            KeyError: If the tenant is not registered
+        """
+        del self._overlays[tenant_id]
+        self._evict(tenant_id)
+
+    def converter(self, tenant_id: str) -> TailwindEmailConverter:
+        """
+        Get the converter for a tenant, compiling its theme on first use.
+
+        Args:
+            tenant_id: Tenant identifier
+
+        Returns:
+            TailwindEmailConverter using the tenant's theme
+
+        Raises:
+            KeyError: If the tenant is not registered
+            ValueError: If the tenant's theme is malformed
+        """
+        self._account_recent()
+        entry = self._compiled.get(tenant_id)
+        if entry is not None:
+            self._compiled.move_to_end(tenant_id)
+            self._evict_over_cap()
+            return entry[0]
+
+        if tenant_id not in self._overlays:
+            raise KeyError(f"Unknown tenant: {tenant_id!r}")
+        overlay, key = self._overlays[tenant_id]
+        tables = ThemeTables.from_config(overlay, key)
+
+        options = self.options.copy()
+        options.theme = overlay
+        converter = TailwindEmailConverter(
+            options, recorder=self.recorder, theme=tables, plugins=self.plugins
+        )
+
+        size = _nbytes(converter)
+        self._compiled[tenant_id] = (converter, size)
+        self._compiled_bytes += size
+        self._evict_over_cap()
+        return converter
+
+    def tables(self, tenant_id: str) -> ThemeTables:
+        """
+        Get the compiled lookup tables of a tenant.
+
+        Args:
+            tenant_id: Tenant identifier
+
+        Returns:
+            ThemeTables of the tenant's converter
+        """
+        return self.converter(tenant_id).theme
+
+    def convert(self, tenant_id: str, html: str) -> str:
+        """
+        Convert HTML with a tenant's theme.
+
+        Args:
+            tenant_id: Tenant identifier
+            html: Input HTML string with Tailwind classes
+
+        Returns:
+            Output HTML string with inline styles
+        """
+        return self.converter(tenant_id).convert(html)
+
+    @property
+    def compiled_bytes(self) -> int:
+        """Approximate memory held by compiled tenant tables and class caches."""
+        self._account_recent()
+        return self._compiled_bytes
+
+    def is_compiled(self, tenant_id: str) -> bool:
+        """
+        Check whether a tenant currently has a compiled converter.
+
+        Args:
+            tenant_id: Tenant identifier
+
+        Returns:
+            True if the tenant's converter is cached
+        """
+        return tenant_id in self._compiled
+
+    def __contains__(self, tenant_id: object) -> bool:
+        return tenant_id in self._overlays
+
+    def __len__(self) -> int:
+        return len(self._overlays)
+
+    def _evict(self, tenant_id: str) -> None:
+        """Drop a tenant's compiled converter, if any."""
+        entry = self._compiled.pop(tenant_id, None)
+        if entry is not None:
+            self._compiled_bytes -= entry[1]
+
+    def _evict_over_cap(self) -> None:
+        """Drop least recently used converters until the rest fit the cap."""
+        while self._compiled_bytes > self.max_bytes and len(self._compiled) > 1:
+            _, (_, evicted) = self._compiled.popitem(last=False)
+            self._compiled_bytes -= evicted
+
+    def _account(self, tenant_id: str) -> None:
+        """Update the accounted size of a compiled tenant."""
+        converter, size = self._compiled[tenant_id]
+        current = _nbytes(converter)
+        self._compiled[tenant_id] = (converter, current)
+        self._compiled_bytes += current - size
+
+    def _account_recent(self) -> None:
+        """Account for class results the most recently used converter cached since."""
+        if self._compiled:
+            self._account(next(reversed(self._compiled)))
+
+
+def _nbytes(converter: TailwindEmailConverter) -> int:
+    """Approximate memory held by a tenant converter's tables and class cache."""
+    return converter.theme.nbytes + converter.transformer.cache_nbytes
@@ -0,0 +1,390 @@
+"""
+HTML serializer for converted documents.
+
+Produces the same markup as ``str(soup)`` and can optionally minify the output
+while it is being written: insignificant whitespace is collapsed outside
+preformatted content, inline styles use compact syntax and empty attributes
+are dropped. No second parse of the output is needed.
+"""
+
+import re
+from collections.abc import Iterator
+from typing import Optional, Union
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.dammit import EntitySubstitution
+from bs4.element import (
+    CharsetMetaAttributeValue,
+    ContentMetaAttributeValue,
+    PageElement,
+    PreformattedString,
+)
+from bs4.formatter import Formatter, HTMLFormatter
+
+from tailwind_email.analysis import (
+    CONTENT,
+    DOCUMENT_SECTION,
+    HEAD_SECTION,
+    MARKUP,
+    STYLE,
+    SizeReport,
+    find_sections,
+)
+from tailwind_email.optimizer import minify_style
+from tailwind_email.text import PlainTextRenderer
+
+# Output encoding assumed for <meta charset> substitution (matches str(soup))
+DEFAULT_OUTPUT_ENCODING = "utf-8"
+
+# Elements whose text content is whitespace-sensitive
+PREFORMATTED_TAGS = frozenset(["pre", "textarea", "listing", "plaintext", "xmp"])
+
+# Elements around which whitespace-only text is insignificant
+BLOCK_LEVEL_TAGS = frozenset(
+    [
+        "address",
+        "article",
+        "aside",
+        "base",
+        "blockquote",
+        "body",
+        "caption",
+        "center",
+        "col",
+        "colgroup",
+        "dd",
+        "div",
+        "dl",
+        "dt",
+        "fieldset",
+        "figcaption",
+        "figure",
+        "footer",
+        "form",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "head",
+        "header",
+        "hr",
+        "html",
+        "li",
+        "link",
+        "main",
+        "meta",
+        "nav",
+        "ol",
+        "p",
+        "section",
+        "style",
+        "table",
+        "tbody",
+        "td",
+        "tfoot",
+        "th",
+        "thead",
+        "title",
+        "tr",
+        "ul",
+    ]
+)
+
+# Elements the parser wraps around fragments
+SCAFFOLDING_TAGS = frozenset(["html", "head", "body"])
+
+# Attributes that carry no meaning when empty
+DROPPABLE_EMPTY_ATTRIBUTES = frozenset(["class", "style", "id"])
+
+# HTML whitespace (deliberately excludes non-breaking spaces)
+_HTML_WHITESPACE_RE = re.compile(r"[ \t\n\r\f]+")
+_HTML_WHITESPACE = " \t\n\r\f"
+
+# Inline white-space values that preserve whitespace
+_PRESERVING_WHITE_SPACE_RE = re.compile(r"white-space\s*:\s*(pre|break-spaces)", re.IGNORECASE)
+
+
+class HTMLSerializer:
+    """Serializes a parsed document, optionally minifying it."""
+
+    def __init__(
+        self,
+        minify: bool = False,
+        size_report: Optional[SizeReport] = None,
+        repeated: Optional[dict[int, int]] = None,
+        text_renderer: Optional[PlainTextRenderer] = None,
+    ) -> None:
+        """
+        Initialize the serializer.
+
+        Args:
+            minify: Collapse whitespace, compact styles and drop empty attributes
+            size_report: Optional report that accounts for every emitted byte
+            repeated: id(element) -> content id of subtrees known to repeat;
+                each distinct one is rendered once (ignored with a size report
+                or text renderer)
+            text_renderer: Optional renderer fed every node as it is written,
+                producing a plain-text version of the document
+        """
+        self.minify = minify
+        self.size_report = size_report
+        self.text_renderer = text_renderer
+        self.repeated = repeated if size_report is None and text_renderer is None else None
+        self.formatter: Formatter = HTMLFormatter.REGISTRY["minimal"]
+        self.bytes_saved = 0
+        # (content id, preformatted) -> (rendered subtree, bytes saved rendering it)
+        self._fragments: dict[tuple[int, bool], tuple[str, int]] = {}
+
+    def serialize(self, node: Union[BeautifulSoup, Tag]) -> str:
+        """
+        Serialize a document or element to a string.
+
+        Args:
+            node: BeautifulSoup document or Tag
+
+        Returns:
+            Serialized HTML
+        """
+        return "".join(self.iter_chunks(node))
+
+    def serialize_fragment(self, soup: Union[BeautifulSoup, Tag]) -> str:
+        """
+        Serialize a parsed fragment without the scaffolding the parser added.
+
+        Args:
+            soup: Document parsed from a fragment
+
+        Returns:
+            Serialized HTML of the fragment's nodes
+        """
+        return "".join(self.iter_fragment_chunks(soup))
+
+    def iter_fragment_chunks(self, soup: Union[BeautifulSoup, Tag]) -> Iterator[str]:
+        """
+        Serialize a parsed fragment as a stream of string chunks.
+
+        The <html>, <head> and <body> elements are left out and their
+        contents written in document order, so head content the parser moved
+        (leading <style> or <meta> elements, stylesheets the conversion
+        added) comes first.
+
+        Args:
+            soup: Document parsed from a fragment
+
+        Yields:
+            Consecutive pieces of the serialized HTML
+        """
+        stack: list[PageElement] = list(reversed(soup.contents))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Tag) and node.name in SCAFFOLDING_TAGS:
+                stack.extend(reversed(node.contents))
+            else:
+                yield from self.iter_chunks(node)
+
+    def iter_chunks(self, node: PageElement) -> Iterator[str]:
+        """
+        Serialize a node as a stream of string chunks.
+
+        Args:
+            node: Document, Tag or string to serialize
+
+        Yields:
+            Consecutive pieces of the serialized HTML
+        """
+        preformatted = self._inherits_preformatted(node)
+        content = self.repeated.get(id(node)) if self.repeated is not None else None
+        if content is not None:
+            yield self._repeated_fragment(node, content, preformatted)
+        else:
+            yield from self._walk(node, preformatted)
+
+    def _walk(self, node: PageElement, preformatted: bool) -> Iterator[str]:
+        """Serialize a node and its descendants."""
+        report = self.size_report
+        repeated = self.repeated
+        text_renderer = self.text_renderer
+        sections = find_sections(node) if report is not None and isinstance(node, Tag) else {}
+
+        # Explicit stack instead of recursion so deep documents are safe
+        stack: list[tuple[PageElement, bool, bool, str]] = [
+            (node, False, preformatted, DOCUMENT_SECTION)
+        ]
+
+        while stack:
+            item, closing, preformatted, section = stack.pop()
+
+            if isinstance(item, Tag):
+                if closing:
+                    if not item.hidden:
+                        end_tag = self._end_tag(item)
+                        if report is not None:
+                            report.add(section, end_tag, MARKUP)
+                        if text_renderer is not None:
+                            text_renderer.end(item)
+                        yield end_tag
+                    continue
+
+                content = repeated.get(id(item)) if repeated is not None else None
+                if content is not None and item is not node:
+                    yield self._repeated_fragment(item, content, preformatted)
+                    continue
+
+                if report is not None:
+                    section = sections.get(id(item), section)
+                    if item.name == "head":
+                        section = HEAD_SECTION
+
+                if not item.hidden:
+                    start_tag, style_attr = self._start_tag(item)
+                    if report is not None:
+                        style_bytes = report.add(section, style_attr, STYLE)
+                        report.add(section, start_tag, MARKUP, exclude=style_bytes)
+                    if text_renderer is not None:
+                        text_renderer.start(item)
+                    yield start_tag
+                if item.is_empty_element:
+                    continue
+
+                stack.append((item, True, preformatted, section))
+                child_preformatted = preformatted or self._is_preformatted(item)
+                for child in reversed(item.contents):
+                    stack.append((child, False, child_preformatted, section))
+            elif isinstance(item, NavigableString):
+                if text_renderer is not None:
+                    text_renderer.text(item)
+                text = self._format_string(item, preformatted)
+                if text:
+                    if report is not None:
+                        report.add(section, text, self._string_category(item))
+                    yield text
+
+    def _repeated_fragment(self, tag: PageElement, content: int, preformatted: bool) -> str:
+        """Render a repeated subtree, reusing the markup of an earlier instance."""
+        key = (content, preformatted)
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            saved = self.bytes_saved
+            markup = "".join(self._walk(tag, preformatted))
+            fragment = self._fragments[key] = (markup, self.bytes_saved - saved)
+        else:
+            self.bytes_saved += fragment[1]
+        return fragment[0]
+
+    def _start_tag(self, tag: Tag) -> tuple[str, str]:
+        """
+        Format the opening tag of an element.
+
+        Returns:
+            Tuple of (opening tag, its rendered style attribute or '')
+        """
+        attrs = []
+        style_attr = ""
+        for key, val in self.formatter.attributes(tag):
+            if val is None:
+                attrs.append(key)
+                continue
+
+            if isinstance(val, (list, tuple)):
+                val = " ".join(val)
+            elif isinstance(val, (CharsetMetaAttributeValue, ContentMetaAttributeValue)):
+                val = val.substitute_encoding(DEFAULT_OUTPUT_ENCODING)  # type: ignore[union-attr]
+            elif not isinstance(val, str):
+                val = str(val)
+
+            if self.minify:
+                if not val.strip() and key in DROPPABLE_EMPTY_ATTRIBUTES:
+                    self.bytes_saved += len(key) + len(val) + 4
+                    continue
+                if key == "style":
+                    minified = minify_style(val)
+                    self.bytes_saved += len(val) - len(minified)
+                    val = minified
+
+            text = self.formatter.attribute_value(val)
+            rendered = f"{key}={EntitySubstitution.quoted_attribute_value(text)}"
+            if key == "style":
+                style_attr = rendered
+            attrs.append(rendered)
+
+        prefix = f"{tag.prefix}:" if tag.prefix else ""
+        attribute_string = " " + " ".join(attrs) if attrs else ""
+        void_close = (
+            (self.formatter.void_element_close_prefix or "") if tag.is_empty_element else ""
+        )
+        return f"<{prefix}{tag.name}{attribute_string}{void_close}>", style_attr
+
+    def _end_tag(self, tag: Tag) -> str:
+        """Format the closing tag of an element."""
+        prefix = f"{tag.prefix}:" if tag.prefix else ""
+        return f"</{prefix}{tag.name}>"
+
+    def _format_string(self, string: NavigableString, preformatted: bool) -> str:
+        """Format a text node, collapsing whitespace when minifying."""
+        if not self.minify or preformatted or type(string) is not NavigableString:
+            return string.output_ready(self.formatter)
+
+        if not string.strip(_HTML_WHITESPACE):
+            if self._is_removable_whitespace(string):
+                self.bytes_saved += len(string)
+                return ""
+            collapsed = " "
+        else:
+            collapsed = _HTML_WHITESPACE_RE.sub(" ", string)
+
+        self.bytes_saved += len(string) - len(collapsed)
+        return self.formatter.substitute(collapsed)
+
+    def _string_category(self, string: NavigableString) -> str:
+        """Classify a string for size accounting."""
+        if type(string) is NavigableString:
+            return CONTENT
+        parent = string.parent
+        if parent is not None and parent.name == "style":
+            return STYLE
+        return MARKUP
+
+    def _is_removable_whitespace(self, string: NavigableString) -> bool:
+        """Check whether whitespace-only text sits between block boundaries."""
+        parent = string.parent
+        parent_is_block = (
+            parent is None or isinstance(parent, BeautifulSoup) or parent.name in BLOCK_LEVEL_TAGS
+        )
+        return self._sibling_is_block(
+            string.previous_sibling, "previous_sibling", parent_is_block
+        ) and self._sibling_is_block(string.next_sibling, "next_sibling", parent_is_block)
+
+    def _sibling_is_block(self, sibling: object, direction: str, parent_is_block: bool) -> bool:
+        """Check whether the nearest rendered sibling in a direction is block-level."""
+        # Comments, doctypes and other whitespace do not render anything
+        while sibling is not None and (
+            isinstance(sibling, PreformattedString)
+            or (
+                type(sibling) is NavigableString and not sibling.strip(_HTML_WHITESPACE)  # type: ignore[attr-defined]
+            )
+        ):
+            sibling = getattr(sibling, direction)
+
+        if sibling is None:
+            return parent_is_block
+        return isinstance(sibling, Tag) and sibling.name in BLOCK_LEVEL_TAGS
+
+    def _is_preformatted(self, tag: Tag) -> bool:
+        """Check whether an element preserves whitespace in its content."""
+        if tag.name in PREFORMATTED_TAGS:
+            return True
+        style = tag.get("style")
+        return isinstance(style, str) and bool(_PRESERVING_WHITE_SPACE_RE.search(style))
+
+    def _inherits_preformatted(self, node: object) -> bool:
+        """Check whether a node sits inside preformatted content."""
+        if not self.minify or not isinstance(node, (Tag, NavigableString)):
+            return False
+        parent = node.parent
+        while parent is not None:
+            if self._is_preformatted(parent):
+                return True
+            parent = parent.parent
+        return False
@@ -0,0 +1,496 @@
+"""
+Head stylesheets generated during conversion.
+
+Clients such as Gmail, Apple Mail and Outlook.com honour class rules in a
+head ``<style>`` block. In the 'modern' compatibility mode, declaration sets
+repeated on many elements are written once as a rule with a short generated
+class name instead of being inlined on every element; properties that hold
+the layout together in clients that strip ``<style>`` blocks stay inline.
+
+Responsive and dark-mode variant classes cannot be inlined at all, so they
+are collected into @media rules, one rule per distinct variant declaration
+set per document.
+"""
+
+from collections.abc import Container, Iterable
+from typing import Optional, Union
+
+from bs4 import BeautifulSoup, Tag
+from bs4.element import Stylesheet
+
+from tailwind_email.mappings.variants import (
+    BREAKPOINTS,
+    DARK_MODE_QUERY,
+    DARK_VARIANT,
+    MAX_BREAKPOINT_PREFIX,
+)
+from tailwind_email.optimizer import minify_style, overlaps
+from tailwind_email.utils import scan_declarations
+
+# Properties always kept inline so the layout survives clients that strip <style>
+INLINE_CRITICAL_PROPERTIES = frozenset(
+    [
+        "border-collapse",
+        "border-spacing",
+        "display",
+        "height",
+        "max-width",
+        "min-width",
+        "table-layout",
+        "vertical-align",
+        "width",
+    ]
+)
+
+# Generated class names are the prefix followed by a base-36 counter
+DEFAULT_CLASS_PREFIX = "t"
+VARIANT_CLASS_PREFIX = "v"
+
+_BASE36_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def is_inline_critical(prop: str, value: str) -> bool:
+    """
+    Check whether a declaration must stay in the inline style.
+
+    Args:
+        prop: CSS property name
+        value: CSS value
+
+    Returns:
+        True for layout-critical, Outlook-specific and !important declarations
+    """
+    return prop in INLINE_CRITICAL_PROPERTIES or prop.startswith("mso-") or "!important" in value
+
+
+def short_class_name(index: int, prefix: str = DEFAULT_CLASS_PREFIX) -> str:
+    """
+    Generate a short class name from a counter.
+
+    Args:
+        index: Non-negative counter value
+        prefix: Leading letters (class names must not start with a digit)
+
+    Returns:
+        Class name such as 't0', 't9', 'ta', 't10'
+    """
+    digits = ""
+    while True:
+        index, remainder = divmod(index, 36)
+        digits = _BASE36_DIGITS[remainder] + digits
+        if not index:
+            return prefix + digits
+
+
+def media_query(variants: Iterable[str]) -> tuple[tuple[int, int, int], str]:
+    """
+    Build the media query for a combination of variants.
+
+    Args:
+        variants: Variant names such as ('md', 'dark')
+
+    Returns:
+        Tuple of (sort key, media query). The sort key orders queries so
+        narrower max-width and wider min-width rules come later and win:
+        max-width queries from widest to narrowest, then ascending min-width,
+        with dark-mode queries after their width-only counterpart.
+    """
+    min_width = 0
+    max_width = 0
+    dark = False
+    for variant in variants:
+        if variant == DARK_VARIANT:
+            dark = True
+        elif variant.startswith(MAX_BREAKPOINT_PREFIX):
+            width = BREAKPOINTS[variant[len(MAX_BREAKPOINT_PREFIX) :]] - 1
+            max_width = min(max_width, width) if max_width else width
+        else:
+            min_width = max(min_width, BREAKPOINTS[variant])
+
+    conditions = []
+    if min_width:
+        conditions.append(f"(min-width: {min_width}px)")
+    if max_width:
+        conditions.append(f"(max-width: {max_width}px)")
+    if dark:
+        conditions.append(DARK_MODE_QUERY)
+    sort_key = (min_width, -max_width, int(dark))
+    return sort_key, " and ".join(conditions)
+
+
+def minify_media_query(query: str) -> str:
+    """
+    Remove optional whitespace from a media query.
+
+    Args:
+        query: Media query such as '(min-width: 768px) and (prefers-color-scheme: dark)'
+
+    Returns:
+        Compact query such as '(min-width:768px) and (prefers-color-scheme:dark)'
+    """
+    return query.replace(": ", ":")
+
+
+def add_class(element: Tag, name: str) -> None:
+    """
+    Append a class name to an element's class attribute.
+
+    Args:
+        element: BeautifulSoup Tag element
+        name: Class name to add
+    """
+    classes = element.get("class")
+    if isinstance(classes, list):
+        element["class"] = [*classes, name]
+    else:
+        element["class"] = f"{classes} {name}" if classes else name
+
+
+def insert_head_style(soup: Union[BeautifulSoup, Tag], css: str, first: bool = False) -> Tag:
+    """
+    Append a <style> element to the document head, creating the head if needed.
+
+    Fragments without an <html> element get the <style> as their first node.
+
+    Args:
+        soup: Parsed document
+        css: Stylesheet text
+        first: Insert before the head's existing content instead of after it
+
+    Returns:
+        The inserted <style> element
+    """
+    factory = soup if isinstance(soup, BeautifulSoup) else BeautifulSoup("", "html.parser")
+    style = factory.new_tag("style")
+    style.append(Stylesheet(css))
+
+    if soup.head is not None:
+        if first:
+            soup.head.insert(0, style)
+        else:
+            soup.head.append(style)
+    elif soup.html is not None:
+        head = factory.new_tag("head")
+        head.append(style)
+        soup.html.insert(0, head)
+    else:
+        soup.insert(0, style)
+    return style
+
+
+class SharedStyleExtractor:
+    """
+    Moves repeated inline declaration sets into a deduplicated head stylesheet.
+
+    Elements are registered during the converter's traversal with add(); once
+    the whole document has been seen, apply() rewrites the elements whose
+    movable declarations repeat often enough to make a class rule smaller.
+    """
+
+    def __init__(
+        self,
+        min_repeats: int = 2,
+        prefix: str = DEFAULT_CLASS_PREFIX,
+        minify: bool = False,
+        reserved: frozenset[str] = frozenset(),
+    ) -> None:
+        """
+        Initialize the extractor.
+
+        Args:
+            min_repeats: Minimum number of elements sharing a declaration set
+            prefix: Prefix for generated class names
+            minify: Write the stylesheet in compact syntax
+            reserved: Properties other stylesheet rules in the document may
+                set; declarations they may override stay inline, where they
+                win over any selector
+        """
+        self.min_repeats = min_repeats
+        self.prefix = prefix
+        self.minify = minify
+        self.reserved = reserved
+        self._groups: dict[str, list[tuple[Tag, str, str]]] = {}
+        self._used_classes: set[str] = set()
+        # Bytes the compact rule syntax saved over the formatted stylesheet
+        self.minified_bytes = 0
+
+    def add(self, element: Tag) -> None:
+        """
+        Register an element after its inline style is final.
+
+        Args:
+            element: BeautifulSoup Tag element
+        """
+        classes = element.get("class")
+        if classes:
+            self._used_classes.update(classes if isinstance(classes, list) else classes.split())
+
+        style = element.get("style")
+        if not isinstance(style, str) or not style:
+            return
+
+        critical: list[str] = []
+        movable: list[str] = []
+        declarations, clean = scan_declarations(style)
+        if not clean:
+            return
+        for prop, value in declarations:
+            name = prop.lower()
+            if is_inline_critical(name, value) or overlaps(name, self.reserved):
+                critical.append(f"{prop}: {value}")
+            else:
+                movable.append(f"{prop}: {value}")
+
+        if movable:
+            key = "; ".join(movable)
+            self._groups.setdefault(key, []).append((element, "; ".join(critical), style))
+
+    def apply(
+        self, soup: Union[BeautifulSoup, Tag], classed: Optional[Container[Tag]] = None
+    ) -> int:
+        """
+        Rewrite repeated declaration sets as class rules in a head <style>.
+
+        A set only moves when the rule plus the added class names is smaller
+        than the inline copies it replaces, and nothing moves unless the sets
+        together also pay for the <style> element around the rules.
+
+        Savings are measured against the output without minification, like
+        the stages before this one; what writing the rules in compact syntax
+        saves on top is left in minified_bytes for the minify stage.
+
+        Args:
+            soup: Parsed document the registered elements belong to
+            classed: Elements that get a class attribute after this stage
+
+        Returns:
+            Bytes removed from the serialized output (0 if nothing moved)
+        """
+        classed = classed if classed is not None else ()
+        moved: list[tuple[str, str, list[tuple[Tag, str, str]]]] = []
+        counter = 0
+
+        for declarations, members in self._groups.items():
+            if len(members) < self.min_repeats:
+                continue
+
+            name = short_class_name(counter, self.prefix)
+            while name in self._used_classes:
+                counter += 1
+                name = short_class_name(counter, self.prefix)
+
+            if self._gain(name, declarations, members, classed, self.minify) <= 0:
+                continue
+            counter += 1
+            moved.append((name, declarations, members))
+
+        wrapper = len("<style></style>")
+        if soup.head is None and soup.html is not None:
+            wrapper += len("<head></head>")
+        if not moved or self._net_gain(moved, classed, wrapper, self.minify) <= 0:
+            return 0
+        saved = self._net_gain(moved, classed, wrapper, False)
+
+        for name, _, members in moved:
+            for element, critical, _ in members:
+                if critical:
+                    element["style"] = critical
+                else:
+                    del element["style"]
+                add_class(element, name)
+
+        css = self._stylesheet(moved, self.minify)
+        insert_head_style(soup, css)
+        if self.minify:
+            self.minified_bytes = len(self._stylesheet(moved, False)) - len(css)
+        return saved
+
+    def _gain(
+        self,
+        name: str,
+        declarations: str,
+        members: list[tuple[Tag, str, str]],
+        classed: Container[Tag],
+        minify: bool,
+    ) -> int:
+        """Bytes saved by moving one declaration set into a class rule."""
+        gain = -len(self._format_rule(name, declarations, minify))
+        for element, critical, style in members:
+            gain += self._measure(style, minify) - self._measure(critical, minify)
+            if not critical:
+                gain += len(' style=""')
+            has_class = element.get("class") or element in classed
+            gain -= len(name) + (1 if has_class else len(' class=""'))
+        return gain
+
+    def _net_gain(
+        self,
+        moved: list[tuple[str, str, list[tuple[Tag, str, str]]]],
+        classed: Container[Tag],
+        wrapper: int,
+        minify: bool,
+    ) -> int:
+        """Bytes saved by moving the given sets, including the stylesheet around them."""
+        separator = 0 if minify else len("\n")
+        gain = sum(
+            self._gain(name, declarations, members, classed, minify)
+            for name, declarations, members in moved
+        )
+        return gain - separator * (len(moved) - 1) - wrapper
+
+    def _stylesheet(
+        self, moved: list[tuple[str, str, list[tuple[Tag, str, str]]]], minify: bool
+    ) -> str:
+        """Stylesheet text for the moved sets."""
+        separator = "" if minify else "\n"
+        return separator.join(
+            self._format_rule(name, declarations, minify) for name, declarations, _ in moved
+        )
+
+    @staticmethod
+    def _measure(style: str, minify: bool) -> int:
+        """Serialized length of an inline style value."""
+        return len(minify_style(style)) if minify else len(style)
+
+    @staticmethod
+    def _format_rule(name: str, declarations: str, minify: bool) -> str:
+        """Format a class rule for the stylesheet."""
+        if minify:
+            return f".{name}{{{minify_style(declarations)}}}"
+        return f".{name} {{ {declarations} }}"
+
+
+class VariantStylesheet:
+    """
+    Collects responsive and dark-mode variant rules into @media blocks.
+
+    Variant declarations are marked !important so they override the inlined
+    base styles. Each distinct (media query, declarations) pair becomes one
+    rule with a short generated class name, shared by every element using it.
+    """
+
+    def __init__(self, prefix: str = VARIANT_CLASS_PREFIX, minify: bool = False) -> None:
+        """
+        Initialize the stylesheet.
+
+        Args:
+            prefix: Prefix for generated class names
+            minify: Write the stylesheet in compact syntax
+        """
+        self.prefix = prefix
+        self.minify = minify
+        self._rules: dict[tuple[str, str], int] = {}
+        self._queries: dict[str, tuple[int, int, int]] = {}
+        # id(element) -> (element, indexes of its rules)
+        self._members: dict[int, tuple[Tag, list[int]]] = {}
+        # Bytes the compact rule syntax saved over the formatted stylesheet
+        self.minified_bytes = 0
+        # id(element) -> properties its variant rules set
+        self._overridden: dict[int, frozenset[str]] = {}
+
+    def add(self, element: Tag, rules: list[tuple[tuple[str, ...], dict[str, str]]]) -> None:
+        """
+        Register the variant declarations of an element.
+
+        Args:
+            element: BeautifulSoup Tag element
+            rules: List of (variant names, CSS properties)
+        """
+        indexes: list[int] = []
+        overridden: set[str] = set()
+        for variants, properties in rules:
+            overridden.update(properties)
+            sort_key, query = media_query(variants)
+            self._queries[query] = sort_key
+            declarations = "; ".join(
+                f"{prop}: {value}" if "!important" in value else f"{prop}: {value} !important"
+                for prop, value in properties.items()
+            )
+            index = self._rules.setdefault((query, declarations), len(self._rules))
+            if index not in indexes:
+                indexes.append(index)
+        if indexes:
+            self._members[id(element)] = (element, indexes)
+            self._overridden[id(element)] = frozenset(overridden)
+
+    def add_copy(self, source: Tag, element: Tag) -> None:
+        """
+        Register an element with the same variant rules as one already added.
+
+        Args:
+            source: Registered element
+            element: Element converted by copying the source's result
+        """
+        member = self._members.get(id(source))
+        if member is not None:
+            self._members[id(element)] = (element, member[1])
+            self._overridden[id(element)] = self._overridden[id(source)]
+
+    def __contains__(self, element: object) -> bool:
+        """Check whether an element was registered with variant rules."""
+        return id(element) in self._members
+
+    def overridden(self, element: Tag) -> frozenset[str]:
+        """
+        Get the properties an element's variant rules may override.
+
+        Args:
+            element: BeautifulSoup Tag element
+
+        Returns:
+            CSS properties set by the element's @media rules
+        """
+        return self._overridden.get(id(element), frozenset())
+
+    def apply(self, soup: Union[BeautifulSoup, Tag], reserved: Optional[set[str]] = None) -> None:
+        """
+        Assign generated classes and append the @media stylesheet to the head.
+
+        Args:
+            soup: Parsed document the registered elements belong to
+            reserved: Class names already used in the document
+        """
+        if not self._rules:
+            return
+
+        reserved = reserved or set()
+        names: list[str] = []
+        counter = 0
+        for _ in self._rules:
+            name = short_class_name(counter, self.prefix)
+            while name in reserved:
+                counter += 1
+                name = short_class_name(counter, self.prefix)
+            names.append(name)
+            counter += 1
+
+        for element, indexes in self._members.values():
+            for index in indexes:
+                add_class(element, names[index])
+
+        css = self._stylesheet(names, self.minify)
+        insert_head_style(soup, css)
+        if self.minify:
+            self.minified_bytes = len(self._stylesheet(names, False)) - len(css)
+
+    def _stylesheet(self, names: list[str], minify: bool) -> str:
+        """Stylesheet text for the collected rules, given their class names."""
+        blocks: dict[str, list[str]] = {}
+        for (query, declarations), index in self._rules.items():
+            blocks.setdefault(query, []).append(
+                self._format_rule(names[index], declarations, minify)
+            )
+
+        ordered = sorted(blocks, key=lambda query: self._queries[query])
+        if minify:
+            return "".join(
+                f"@media {minify_media_query(q)}{{{''.join(blocks[q])}}}" for q in ordered
+            )
+        return "\n".join(f"@media {q} {{\n" + "\n".join(blocks[q]) + "\n}" for q in ordered)
+
+    @staticmethod
+    def _format_rule(name: str, declarations: str, minify: bool) -> str:
+        """Format a class rule for the stylesheet."""
+        if minify:
+            return f".{name}{{{minify_style(declarations)}}}"
+        return f".{name} {{ {declarations} }}"
@@ -0,0 +1,108 @@
+"""
+Detection of repeated subtrees within a document.
+
+Catalog and digest emails repeat the same component markup many times. Every
+element gets two ids in a single bottom-up pass: a shape id covering its tag,
+attributes and the shapes of its child elements, and a content id that also
+covers the text and comments inside it. Equal ids mean equal subtrees, found
+in linear time because each key only refers to the ids of direct children.
+
+Elements with the same shape convert to the same attributes, so the
+converter processes the first instance and copies the result onto the rest.
+Subtrees with the same content also serialize to the same markup, which the
+serializer renders once. Content ids are only assigned once an element with
+classes is found to repeat, so documents without repeats pay for one pass.
+"""
+
+from collections.abc import Iterator
+from typing import Any
+
+from bs4 import Tag
+
+
+class SubtreeIndex:
+    """Shape and content ids of every element below a root."""
+
+    def __init__(self, root: Tag) -> None:
+        """
+        Index the elements below a root.
+
+        Content ids are only assigned when an element with classes repeats;
+        otherwise ``contents`` stays empty and ``repeats`` is False.
+
+        Args:
+            root: Document or element to index (not included itself)
+        """
+        # id(element) -> shape id / content id
+        self.shapes: dict[int, int] = {}
+        self.contents: dict[int, int] = {}
+        # Content ids shared by more than one element
+        self.repeated_contents: set[int] = set()
+        shape_ids: dict[tuple[Any, ...], int] = {}
+        classed: set[int] = set()
+        # Whether an element with classes shares its shape with another
+        self.repeats = False
+
+        # Reversed document order numbers every child before its parent
+        elements = [element for element in root.descendants if isinstance(element, Tag)]
+        elements.reverse()
+        for element in elements:
+            attributes = (
+                tuple(
+                    [
+                        (name, tuple(value) if isinstance(value, list) else value)
+                        for name, value in element.attrs.items()
+                    ]
+                )
+                if element.attrs
+                else ()
+            )
+            children = tuple(
+                [self.shapes[id(child)] for child in element.contents if isinstance(child, Tag)]
+            )
+            shape = shape_ids.setdefault((element.name, attributes, children), len(shape_ids))
+            self.shapes[id(element)] = shape
+            if "class" in element.attrs and not self.repeats:
+                self.repeats = shape in classed
+                classed.add(shape)
+
+        if not self.repeats:
+            return
+        content_ids: dict[tuple[Any, ...], int] = {}
+        for element in elements:
+            content_children = tuple(
+                self.contents[id(child)] if isinstance(child, Tag) else (type(child), child)
+                for child in element.contents
+            )
+            known = len(content_ids)
+            content = content_ids.setdefault((self.shapes[id(element)], content_children), known)
+            if content < known:
+                self.repeated_contents.add(content)
+            self.contents[id(element)] = content
+
+
+def copy_converted(source: Tag, target: Tag) -> Iterator[tuple[Tag, Tag]]:
+    """
+    Copy the attributes of a converted subtree onto one with the same shape.
+
+    Args:
+        source: Converted first instance
+        target: Unconverted subtree with the same shape id
+
+    Yields:
+        Tuples of (converted element, target element it was copied onto)
+    """
+    for converted, element in zip(_elements(source), _elements(target)):
+        element.attrs = {
+            name: list(value) if isinstance(value, list) else value
+            for name, value in converted.attrs.items()
+        }
+        yield converted, element
+
+
+def _elements(root: Tag) -> Iterator[Tag]:
+    """An element followed by its descendant elements in document order."""
+    yield root
+    for descendant in root.descendants:
+        if isinstance(descendant, Tag):
+            yield descendant
@@ -0,0 +1,237 @@
+"""
+Template-aware conversion.
+
+Email templates are usually converted after rendering, once per recipient.
+Converting the template source instead lets one conversion serve every
+recipient, provided the template language survives the HTML round trip.
+
+Jinja (``{{ ... }}``, ``{% ... %}``, ``{# ... #}``) and Handlebars
+(``{{{ ... }}}``, ``{{#each}}``, ``{{!-- ... --}}``) regions are replaced by
+opaque placeholders before parsing and put back after serialization. The
+placeholder form depends on where the region sits, so that the HTML parser
+leaves it where it was:
+
+- in text, a comment (text between table rows would otherwise be moved
+  out of the table)
+- between attributes, an empty attribute; everything from the first to
+  the last region inside one tag becomes a single placeholder, so that
+  conditional attributes stay between their delimiters
+- in style attributes, a declaration whose property and value are both
+  the token, so that style rewriting keeps it in place
+- in other attribute values and raw-text elements (<style>, <script>, ...),
+  a plain token
+"""
+
+import re
+
+# Template regions, longest delimiters first
+TEMPLATE_PATTERN = re.compile(
+    r"\{\{!--.*?--\}\}|\{\{\{.*?\}\}\}|\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\}", re.DOTALL
+)
+
+# Elements whose content the HTML parser does not treat as markup
+RAW_TEXT_ELEMENTS = frozenset(["script", "style", "title", "textarea"])
+
+_PLACEHOLDER_PREFIX = "__tpl"
+
+# Scanner states
+_TEXT = "text"
+_TAG = "tag"
+_VALUE = "value"
+_COMMENT = "comment"
+_RAW = "raw"
+
+_TAG_NAME = re.compile(r"</?([a-zA-Z][^\s/>]*)")
+_TAG_DELIMITER = re.compile(r"[\"'>]")
+_ATTRIBUTE_NAME = re.compile(r"([^\s\"'=<>/]+)\s*=\s*$")
+_UNQUOTED_VALUE = re.compile(r"([^\s\"'=<>/]+)\s*=\s*[^\s\"'=<>`]*$")
+
+
+class TemplatePlaceholders:
+    """
+    Swaps template regions for placeholders and back.
+
+    One instance protects one template source; the placeholder prefix is
+    chosen so that it does not occur in that source.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty placeholder table."""
+        self.prefix = _PLACEHOLDER_PREFIX
+        self.regions: list[str] = []
+        self._restore_pattern: re.Pattern[str] = re.compile(self.prefix)
+
+    def protect(self, source: str) -> str:
+        """
+        Replace the template regions of a source with placeholders.
+
+        Args:
+            source: Template source
+
+        Returns:
+            HTML that parses with every region kept in place
+        """
+        while self.prefix in source:
+            self.prefix += "x"
+        prefix = re.escape(self.prefix)
+        self._restore_pattern = re.compile(
+            rf"<!--({prefix}\d+__)-->|({prefix}\d+__)(?:=\"\"|\s*:\s*\2)?"
+        )
+
+        parts: list[str] = []
+        scanner = _ContextScanner()
+        position = 0
+        matches = list(TEMPLATE_PATTERN.finditer(source))
+        index = 0
+        while index < len(matches):
+            match = matches[index]
+            markup = source[position : match.start()]
+            scanner.advance(markup)
+            parts.append(markup)
+            end = match.end()
+            index += 1
+
+            state = scanner.state
+            unquoted = _UNQUOTED_VALUE.search(markup) if state == _TAG else None
+            standalone = state == _TAG and unquoted is None
+            if standalone:
+                # Extend over later regions that sit between attributes of the same tag
+                tag = scanner.tags
+                while index < len(matches):
+                    following = matches[index]
+                    probe = scanner.copy()
+                    probe.advance(source[end : following.start()])
+                    if probe.state != _TAG or probe.tags != tag:
+                        break
+                    scanner = probe
+                    end = following.end()
+                    index += 1
+
+            token = f"{self.prefix}{len(self.regions)}__"
+            self.regions.append(source[match.start() : end])
+            if state == _TEXT:
+                token = f"<!--{token}-->"
+            elif standalone:
+                # Stand-alone attribute, spaced off its neighbours where needed
+                if not markup[-1:].isspace():
+                    token = f" {token}"
+                if source[end : end + 1] not in ("", ">", "/") and not source[end].isspace():
+                    token = f"{token} "
+            elif (unquoted.group(1).lower() if unquoted else scanner.attribute) == "style" and (
+                unquoted or state == _VALUE
+            ):
+                token = f"{token}:{token}"
+            parts.append(token)
+            position = end
+
+        parts.append(source[position:])
+        return "".join(parts)
+
+    def restore(self, html: str) -> str:
+        """
+        Put the template regions back into converted HTML.
+
+        Args:
+            html: Serialized output of a protected source
+
+        Returns:
+            HTML with the original template regions
+        """
+        if not self.regions:
+            return html
+        regions = self.regions
+        prefix_length = len(self.prefix)
+
+        def replace(match: re.Match[str]) -> str:
+            token = match.group(1) or match.group(2)
+            return regions[int(token[prefix_length:-2])]
+
+        return self._restore_pattern.sub(replace, html)
+
+    def contains(self, value: str) -> bool:
+        """
+        Check whether a value contains a placeholder.
+
+        Args:
+            value: Attribute value or class name
+
+        Returns:
+            True if part of the value is decided when the template renders
+        """
+        return bool(self.regions) and self.prefix in value
+
+
+class _ContextScanner:
+    """Tracks the HTML context at the end of the markup seen so far."""
+
+    def __init__(self) -> None:
+        self.state = _TEXT
+        self.quote = ""
+        self.tag_name = ""
+        # Name of the attribute whose value is being scanned
+        self.attribute = ""
+        self.closing = False
+        # Number of tags opened so far
+        self.tags = 0
+
+    def copy(self) -> "_ContextScanner":
+        """Copy the scanner, to look ahead without moving it."""
+        scanner = _ContextScanner()
+        scanner.__dict__.update(self.__dict__)
+        return scanner
+
+    def advance(self, markup: str) -> None:
+        """Move the scanner past a stretch of markup."""
+        position = 0
+        length = len(markup)
+        while position < length:
+            state = self.state
+            if state == _TEXT:
+                start = markup.find("<", position)
+                if start == -1:
+                    return
+                if markup.startswith("<!--", start):
+                    self.state = _COMMENT
+                    position = start + 4
+                    continue
+                name = _TAG_NAME.match(markup, start)
+                if name is None:
+                    position = start + 1
+                    continue
+                self.state = _TAG
+                self.tags += 1
+                self.tag_name = name.group(1).lower()
+                self.closing = markup[start + 1] == "/"
+                position = name.end()
+            elif state == _TAG:
+                delimiter = _TAG_DELIMITER.search(markup, position)
+                if delimiter is None:
+                    return
+                char = delimiter.group()
+                position = delimiter.end()
+                if char == ">":
+                    raw = self.tag_name in RAW_TEXT_ELEMENTS and not self.closing
+                    self.state = _RAW if raw else _TEXT
+                else:
+                    self.state = _VALUE
+                    self.quote = char
+                name = _ATTRIBUTE_NAME.search(markup, 0, delimiter.start())
+                self.attribute = name.group(1).lower() if name else ""
+            elif state == _VALUE:
+                end = markup.find(self.quote, position)
+                if end == -1:
+                    return
+                self.state = _TAG
+                position = end + 1
+            elif state == _COMMENT:
+                end = markup.find("-->", position)
+                if end == -1:
+                    return
+                self.state = _TEXT
+                position = end + 3
+            else:
+                end = markup.lower().find(f"</{self.tag_name}", position)
+                if end == -1:
+                    return
+                self.state = _TEXT
+                position = end
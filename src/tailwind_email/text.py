@@ -0,0 +1,317 @@
+"""
+Plain-text rendering of converted documents.
+
+The text/plain alternative of a message is written while the serializer
+walks the converted tree, so the document is neither parsed nor traversed a
+second time. Because styles are final by then, elements hidden with
+display: none (such as preheaders) are left out.
+
+Formatting follows common plain-text email conventions: blank lines between
+paragraphs, headings underlined, "- " and "1. " list markers, table cells
+separated by " | ", blockquotes prefixed with "> " and links followed by
+their URL in parentheses.
+"""
+
+import re
+from typing import TYPE_CHECKING, Optional
+
+from bs4 import Comment, NavigableString, Tag
+
+if TYPE_CHECKING:
+    from tailwind_email.template import TemplatePlaceholders
+
+# Elements whose content is not part of the text
+SKIPPED_TAGS = frozenset(["head", "script", "style", "template", "title"])
+
+# Elements separated from their surroundings by a blank line
+PARAGRAPH_TAGS = frozenset(
+    ["blockquote", "h1", "h2", "h3", "h4", "h5", "h6", "ol", "p", "pre", "table", "ul"]
+)
+
+# Elements that start and end a line
+LINE_TAGS = frozenset(
+    [
+        "address",
+        "article",
+        "aside",
+        "caption",
+        "center",
+        "dd",
+        "div",
+        "dl",
+        "dt",
+        "figcaption",
+        "figure",
+        "footer",
+        "form",
+        "header",
+        "li",
+        "main",
+        "nav",
+        "section",
+        "tr",
+    ]
+)
+
+# Headings underlined with a character
+HEADING_UNDERLINES = {"h1": "=", "h2": "-"}
+
+# Text written for <hr>
+HORIZONTAL_RULE = "-" * 40
+
+# Separator between the cells of a table row
+CELL_SEPARATOR = " | "
+
+_WHITESPACE_RE = re.compile(r"[ \t\n\r\f\xa0]+")
+_DISPLAY_NONE_RE = re.compile(r"display\s*:\s*none", re.IGNORECASE)
+
+
+class PlainTextRenderer:
+    """
+    Builds a plain-text rendering from document events.
+
+    The serializer reports each element when it opens (start()) and, unless
+    it is a void element, when it closes (end()), and each text node
+    (text()), in document order.
+    """
+
+    def __init__(self, placeholders: Optional["TemplatePlaceholders"] = None) -> None:
+        """
+        Initialize the renderer.
+
+        Args:
+            placeholders: Template placeholders of the document, whose text
+                regions are kept in the rendering
+        """
+        self.placeholders = placeholders
+        # Finished lines and the pieces of the current one
+        self._lines: list[str] = []
+        self._line: list[str] = []
+        # Line breaks requested before the next text (2 leaves a blank line)
+        self._breaks = 0
+        # Whitespace pending between the current line and the next text
+        self._space = False
+        # Next text starts a new table cell on the same line
+        self._cell = False
+        # Depth inside skipped or hidden elements, <pre> and <blockquote>
+        self._skip = 0
+        self._pre = 0
+        self._quote = 0
+        # Blockquote depth of the current (or last) line
+        self._line_quote = 0
+        # Open lists (next number, or None for bullets) and a marker to write
+        self._lists: list[Optional[int]] = []
+        self._marker: Optional[str] = None
+        # Open links: (href, text written inside)
+        self._links: list[tuple[str, list[str]]] = []
+
+    def start(self, tag: Tag) -> None:
+        """
+        Handle an opening tag.
+
+        Args:
+            tag: Element being opened
+        """
+        if self._skip or tag.name in SKIPPED_TAGS or _is_hidden(tag):
+            if not tag.is_empty_element:
+                self._skip += 1
+            return
+
+        name = tag.name
+        if name == "br":
+            self._line_break()
+            return
+        if name == "hr":
+            self._request(2)
+            self._write(HORIZONTAL_RULE)
+            self._request(2)
+            return
+        if name == "img":
+            alt = tag.get("alt")
+            if isinstance(alt, str) and alt.strip():
+                self._words(alt)
+            return
+
+        if name in PARAGRAPH_TAGS:
+            self._request(2 if name not in ("ul", "ol") or not self._lists else 1)
+        elif name in LINE_TAGS:
+            self._request(1)
+
+        if name in ("td", "th"):
+            self._cell = bool(tag.find_previous_sibling(("td", "th")))
+        elif name == "pre":
+            self._pre += 1
+        elif name == "blockquote":
+            self._quote += 1
+        elif name == "ul":
+            self._lists.append(None)
+        elif name == "ol":
+            start = tag.get("start")
+            self._lists.append(int(start) if isinstance(start, str) and start.isdigit() else 1)
+        elif name == "li" and self._lists:
+            number = self._lists[-1]
+            if number is None:
+                self._marker = "- "
+            else:
+                self._marker = f"{number}. "
+                self._lists[-1] = number + 1
+        elif name == "a":
+            href = tag.get("href")
+            self._links.append((href.strip() if isinstance(href, str) else "", []))
+
+    def end(self, tag: Tag) -> None:
+        """
+        Handle a closing tag.
+
+        Args:
+            tag: Element being closed
+        """
+        if self._skip:
+            self._skip -= 1
+            return
+
+        name = tag.name
+        if name == "a" and self._links:
+            self._end_link(*self._links.pop())
+        elif name == "pre":
+            self._pre -= 1
+        elif name == "blockquote":
+            self._quote -= 1
+        elif name in ("ul", "ol") and self._lists:
+            self._lists.pop()
+        elif name == "li":
+            self._marker = None
+        elif name in HEADING_UNDERLINES and self._line and not self._breaks:
+            heading = "".join(self._line)
+            self._end_line()
+            self._lines.append(HEADING_UNDERLINES[name] * len(heading.strip()))
+
+        if name in PARAGRAPH_TAGS:
+            self._request(2 if name not in ("ul", "ol") or not self._lists else 1)
+        elif name in LINE_TAGS:
+            self._request(1)
+
+    def text(self, string: NavigableString) -> None:
+        """
+        Handle a text node.
+
+        Args:
+            string: Text, comment or other string node
+        """
+        if self._skip:
+            return
+        if type(string) is not NavigableString:
+            # Template regions in text stand in comments; keep them for restoring
+            placeholders = self.placeholders
+            if isinstance(string, Comment) and placeholders and placeholders.contains(string):
+                self._write(f"<!--{string}-->")
+            return
+
+        if self._pre:
+            for index, line in enumerate(str(string).split("\n")):
+                if index:
+                    self._line_break()
+                if line:
+                    self._write(line)
+            return
+        self._words(str(string))
+
+    def render(self) -> str:
+        """
+        Finish the rendering.
+
+        Returns:
+            Plain text, without leading or trailing blank lines
+        """
+        self._end_line()
+        text = "\n".join(line.rstrip() for line in self._lines).strip("\n")
+        if self.placeholders is not None:
+            text = self.placeholders.restore(text)
+        return text
+
+    def _words(self, text: str) -> None:
+        """Write text with its whitespace collapsed."""
+        collapsed = _WHITESPACE_RE.sub(" ", text)
+        if collapsed.startswith(" "):
+            self._space = True
+        words = collapsed.strip()
+        if words:
+            self._write(words)
+            if collapsed.endswith(" "):
+                self._space = True
+
+    def _write(self, text: str) -> None:
+        """Append text to the current line, starting a new line if requested."""
+        if self._breaks:
+            if self._line or self._lines:
+                self._end_line()
+                # Blank lines stay quoted only inside a blockquote
+                blank = ("> " * min(self._quote, self._line_quote)).rstrip()
+                self._lines.extend([blank] * (self._breaks - 1))
+            self._breaks = 0
+            self._space = self._cell = False
+
+        line = self._line
+        if not line:
+            line.append(self._prefix())
+            self._line_quote = self._quote
+            self._marker = None
+        elif self._cell:
+            line.append(CELL_SEPARATOR)
+        elif self._space:
+            line.append(" ")
+        self._space = self._cell = False
+
+        line.append(text)
+        for _, written in self._links:
+            written.append(text)
+
+    def _end_link(self, href: str, written: list[str]) -> None:
+        """Follow link text with its URL unless the text already shows it."""
+        if not href or href.startswith(("#", "javascript:")):
+            return
+        shown = href[len("mailto:") :] if href.startswith("mailto:") else href
+        text = "".join(written).strip()
+        if text == shown or text == href:
+            return
+        if text:
+            self._space = True
+            self._write(f"({shown})")
+        else:
+            self._write(shown)
+
+    def _prefix(self) -> str:
+        """Quote markers, list indentation and any pending list marker."""
+        prefix = "> " * self._quote
+        if self._lists:
+            prefix += "  " * (len(self._lists) - 1)
+            prefix += self._marker or "  "
+        return prefix
+
+    def _request(self, breaks: int) -> None:
+        """Ask for line breaks before the next text."""
+        self._breaks = max(self._breaks, breaks)
+
+    def _end_line(self) -> None:
+        """Move the current line to the finished lines."""
+        if self._line:
+            self._lines.append("".join(self._line))
+            self._line = []
+        self._space = False
+
+    def _line_break(self) -> None:
+        """End the current line, or add an empty one if nothing was written."""
+        if self._breaks:
+            return
+        if self._line:
+            self._end_line()
+        else:
+            self._lines.append(self._prefix().rstrip())
+
+
+def _is_hidden(tag: Tag) -> bool:
+    """Check whether an element is hidden from readers."""
+    if tag.has_attr("hidden"):
+        return True
+    style = tag.get("style")
+    return isinstance(style, str) and bool(_DISPLAY_NONE_RE.search(style))
@@ -0,0 +1,297 @@
+"""
+Theme configuration.
+
+A theme extends or overrides the built-in color palette, spacing scale and
+email-safe font stacks, in the shape of a Tailwind ``theme`` section::
+
+    {
+        "colors": {"brand": {"DEFAULT": "#0b5fff", "50": "#eef4ff"}},
+        "spacing": {"gutter": "18px"},
+        "fonts": {"brand": ["Inter", "Arial", "sans-serif"]},
+    }
+
+The configuration is compiled once into flat lookup tables of the same shape
+as the defaults, so 'bg-brand-50', 'p-gutter' and 'font-brand' resolve with
+the same mapping lookups as built-in classes. A compiled table holds only the
+theme's own entries, chained over the built-in table it extends. Compiled
+tables are cached by a hash of the canonical configuration.
+"""
+
+import hashlib
+import json
+import sys
+from collections import ChainMap
+from collections.abc import Mapping
+from typing import Any, Optional, Union
+
+from tailwind_email.mappings.colors import COLOR_PALETTE
+from tailwind_email.mappings.spacing import SPACING_SCALE
+from tailwind_email.mappings.typography import EMAIL_SAFE_FONTS
+
+# Sections a theme configuration may contain
+THEME_SECTIONS = ("colors", "spacing", "fonts")
+
+# Nested color key that names the unsuffixed color ('brand' rather than 'brand-500')
+DEFAULT_COLOR_KEY = "DEFAULT"
+
+# Maximum number of compiled themes kept in the process-wide cache
+THEME_CACHE_SIZE = 128
+
+ThemeConfig = Union[dict[str, Any], str]
+
+
+def load_theme_config(config: Optional[ThemeConfig]) -> dict[str, Any]:
+    """
+    Parse a theme given as a dictionary or JSON string.
+
+    Args:
+        config: Theme dictionary, JSON string, or None for the defaults
+
+    Returns:
+        Theme dictionary
+
+    Raises:
+        ValueError: If the JSON is invalid or not an object
+    """
+    if config is None:
+        return {}
+    if isinstance(config, str):
+        try:
+            config = json.loads(config)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid theme JSON: {e}") from e
+    if not isinstance(config, dict):
+        raise ValueError("Theme configuration must be a JSON object")
+    return config
+
+
+def theme_hash(config: Optional[ThemeConfig]) -> str:
+    """
+    Hash a theme configuration.
+
+    Args:
+        config: Theme dictionary, JSON string, or None for the defaults
+
+    Returns:
+        SHA-256 hex digest of the canonical JSON form; equal configurations
+        hash equally regardless of key order or formatting
+    """
+    canonical = json.dumps(load_theme_config(config), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def compile_theme(config: Optional[ThemeConfig] = None) -> "ThemeTables":
+    """
+    Compile a theme configuration into lookup tables, reusing cached results.
+
+    Args:
+        config: Theme dictionary, JSON string, or None for the defaults
+
+    Returns:
+        ThemeTables for the configuration
+
+    Raises:
+        ValueError: If the configuration is malformed
+    """
+    data = load_theme_config(config)
+    key = theme_hash(data)
+    tables = _THEME_CACHE.get(key)
+    if tables is None:
+        tables = ThemeTables.from_config(data, key)
+        if len(_THEME_CACHE) >= THEME_CACHE_SIZE:
+            del _THEME_CACHE[next(iter(_THEME_CACHE))]
+        _THEME_CACHE[key] = tables
+    return tables
+
+
+def theme_changes(old: "ThemeTables", new: "ThemeTables") -> frozenset[str]:
+    """
+    Find the table entries that differ between two themes.
+
+    Args:
+        old: Tables before a reload
+        new: Tables after a reload
+
+    Returns:
+        Color names, spacing keys and font classes that were added, removed
+        or changed
+    """
+    changed: set[str] = set()
+    for before, after in (
+        (old.colors, new.colors),
+        (old.spacing, new.spacing),
+        (old.fonts, new.fonts),
+    ):
+        if before is after:
+            continue
+        for name in before.keys() | after.keys():
+            if before.get(name) != after.get(name):
+                changed.add(name)
+    return frozenset(changed)
+
+
+def is_affected(cls: str, changes: frozenset[str]) -> bool:
+    """
+    Check whether a class may resolve differently after a theme change.
+
+    Theme-dependent classes are a font class ('font-brand') or a prefix
+    followed by a color name or spacing key ('bg-brand-50/75', 'p-gutter').
+    The check is conservative: a class that merely looks themed counts too.
+
+    Args:
+        cls: Class name without variants
+        changes: Result of theme_changes()
+
+    Returns:
+        True if cached results for the class must be discarded
+    """
+    if not changes:
+        return False
+    if cls in changes:
+        return True
+    return cls.split("/", 1)[0].partition("-")[2] in changes
+
+
+class ThemeTables:
+    """
+    Compiled lookup tables for a theme.
+
+    Tables are shared between converters and must not be modified. Two tables
+    compare equal when they were compiled from the same configuration.
+    """
+
+    def __init__(
+        self,
+        colors: Mapping[str, str],
+        spacing: Mapping[str, str],
+        fonts: Mapping[str, str],
+        key: str,
+    ) -> None:
+        """
+        Initialize the tables.
+
+        Args:
+            colors: Color name -> CSS color ('blue-500' -> '#3b82f6')
+            spacing: Spacing key -> CSS length ('4' -> '16px')
+            fonts: Font class -> font stack ('font-sans' -> 'Arial, ...')
+            key: Hash of the configuration the tables were compiled from
+        """
+        self.colors = colors
+        self.spacing = spacing
+        self.fonts = fonts
+        self.key = key
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by tables not shared with the built-in ones."""
+        size = 0
+        for table in (self.colors, self.spacing, self.fonts):
+            if isinstance(table, ChainMap):
+                overlay = table.maps[0]
+                size += sys.getsizeof(table) + sys.getsizeof(overlay)
+                size += sum(sys.getsizeof(name) + sys.getsizeof(v) for name, v in overlay.items())
+        return size
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any], key: str) -> "ThemeTables":
+        """
+        Layer a parsed configuration over the built-in tables.
+
+        Each section the configuration sets becomes a ChainMap of its own
+        entries over the built-in dictionary, which is shared rather than
+        copied; sections it does not mention are the built-in dictionaries.
+
+        Args:
+            config: Parsed theme dictionary
+            key: Hash of the configuration
+
+        Returns:
+            ThemeTables instance
+
+        Raises:
+            ValueError: If the configuration is malformed
+        """
+        unknown = set(config) - set(THEME_SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown theme sections: {', '.join(sorted(unknown))}")
+
+        colors: Mapping[str, str] = COLOR_PALETTE
+        if config.get("colors"):
+            colors = ChainMap(_flatten_colors(_section(config, "colors")), COLOR_PALETTE)
+
+        spacing: Mapping[str, str] = SPACING_SCALE
+        if config.get("spacing"):
+            overlay = {
+                str(name): _spacing_value(name, value)
+                for name, value in _section(config, "spacing").items()
+            }
+            spacing = ChainMap(overlay, SPACING_SCALE)
+
+        fonts: Mapping[str, str] = EMAIL_SAFE_FONTS
+        if config.get("fonts"):
+            overlay = {}
+            for name, value in _section(config, "fonts").items():
+                cls_name = name if name.startswith("font-") else f"font-{name}"
+                overlay[cls_name] = _font_stack(name, value)
+            fonts = ChainMap(overlay, EMAIL_SAFE_FONTS)
+
+        return cls(colors, spacing, fonts, key)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ThemeTables) and other.key == self.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"ThemeTables({self.key[:12]})"
+
+
+def _section(config: dict[str, Any], name: str) -> dict[str, Any]:
+    """Get a theme section, checking that it is a mapping."""
+    section = config[name]
+    if not isinstance(section, dict):
+        raise ValueError(f"Theme section '{name}' must be an object")
+    return section
+
+
+def _flatten_colors(colors: dict[str, Any], prefix: str = "") -> dict[str, str]:
+    """Flatten nested color scales into 'name-shade' keys."""
+    flat: dict[str, str] = {}
+    for name, value in colors.items():
+        if name == DEFAULT_COLOR_KEY and prefix:
+            full_name = prefix
+        else:
+            full_name = f"{prefix}-{name}" if prefix else str(name)
+        if isinstance(value, dict):
+            flat.update(_flatten_colors(value, full_name))
+        elif isinstance(value, str) and value:
+            flat[full_name] = value
+        else:
+            raise ValueError(f"Theme color '{full_name}' must be a string or an object")
+    return flat
+
+
+def _spacing_value(name: str, value: Any) -> str:
+    """Normalize a spacing value; bare numbers are pixels."""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"Theme spacing '{name}' must be a string or a number")
+    if isinstance(value, str):
+        return value
+    return f"{value:g}px"
+
+
+def _font_stack(name: str, value: Any) -> str:
+    """Normalize a font stack given as a string or a list of families."""
+    if isinstance(value, list) and all(isinstance(family, str) for family in value):
+        return ", ".join(value)
+    if isinstance(value, str) and value:
+        return value
+    raise ValueError(f"Theme font '{name}' must be a string or a list of strings")
+
+
+# Compiled themes by configuration hash, oldest first
+_THEME_CACHE: dict[str, ThemeTables] = {}
+
+# Built-in tables, used when no theme is configured
+DEFAULT_THEME = compile_theme()
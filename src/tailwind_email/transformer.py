@@ -3,8 +3,12 @@ CSS transformer that converts Tailwind classes to inline CSS.
 """
 
 import re
-from typing import Optional
+import sys
+from collections.abc import Sequence
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
 
+from tailwind_email.clients import ClientProfile
 from tailwind_email.mappings.borders import (
     BORDER_RADIUS_CLASSES,
     BORDER_STYLE_CLASSES,
@@ -37,7 +41,6 @@ from tailwind_email.mappings.spacing import (
     get_spacing_value,
 )
 from tailwind_email.mappings.typography import (
-    EMAIL_SAFE_FONTS,
     FONT_SIZE_CLASSES,
     FONT_STYLE_CLASSES,
     FONT_WEIGHT_CLASSES,
@@ -50,22 +53,76 @@ from tailwind_email.mappings.typography import (
     WHITE_SPACE_CLASSES,
     WORD_BREAK_CLASSES,
 )
+from tailwind_email.theme import DEFAULT_THEME, ThemeTables, is_affected, theme_changes
 from tailwind_email.utils import convert_to_px, hex_to_rgba
 
+# Maximum number of class results remembered per transformer
+CLASS_CACHE_SIZE = 4096
+
+# Maximum number of resolved utility lists remembered per theme
+UTILITY_CACHE_SIZE = 1024
+
 
 class CSSTransformer:
     """Transforms Tailwind classes into inline CSS properties."""
 
-    def __init__(self, base_font_size: int = 16, include_mso: bool = True) -> None:
+    def __init__(
+        self,
+        base_font_size: int = 16,
+        include_mso: bool = True,
+        theme: Optional[ThemeTables] = None,
+        profile: Optional[ClientProfile] = None,
+    ) -> None:
         """
         Initialize the transformer.
 
         Args:
             base_font_size: Base font size for rem/em conversion
             include_mso: Include MSO-specific properties for Outlook
+            theme: Compiled color, spacing and font tables (default: built-in)
+            profile: Target client profile applied to every class result
+                (default: None, no filtering)
         """
         self.base_font_size = base_font_size
         self.include_mso = include_mso
+        self.theme = theme or DEFAULT_THEME
+        self.profile = profile
+        # Class -> properties (or None), shared read-only by all callers
+        self._cache: dict[str, Optional[dict[str, str]]] = {}
+        self._cache_bytes = 0
+
+    def with_theme(
+        self, theme: ThemeTables, changes: Optional[frozenset[str]] = None
+    ) -> "CSSTransformer":
+        """
+        Create a transformer for new theme tables, keeping warm cache entries.
+
+        Cached results for classes the theme change cannot affect are carried
+        over; the rest are resolved again on first use.
+
+        Args:
+            theme: New compiled theme tables
+            changes: Changed table entries (computed when not given)
+
+        Returns:
+            New CSSTransformer with the same settings
+        """
+        if changes is None:
+            changes = theme_changes(self.theme, theme)
+        transformer = CSSTransformer(self.base_font_size, self.include_mso, theme, self.profile)
+        cached = self._cache.copy()
+        transformer._cache = {
+            cls: properties for cls, properties in cached.items() if not is_affected(cls, changes)
+        }
+        transformer._cache_bytes = sum(
+            _entry_nbytes(cls, properties) for cls, properties in transformer._cache.items()
+        )
+        return transformer
+
+    @property
+    def cache_nbytes(self) -> int:
+        """Approximate memory held by remembered class results."""
+        return self._cache_bytes
 
     def transform_class(self, cls: str) -> Optional[dict[str, str]]:
         """
@@ -77,6 +134,16 @@ class CSSTransformer:
         Returns:
             Dictionary of CSS property -> value, or None if not recognized
         """
+        properties = self._transform_cached(cls)
+        return dict(properties) if properties is not None else None
+
+    def _transform_cached(self, cls: str) -> Optional[dict[str, str]]:
+        """Transform a class, remembering the result for this transformer."""
+        try:
+            return self._cache[cls]
+        except KeyError:
+            pass
+
         # Try each transformer in order
         result = (
             self._transform_spacing(cls)
@@ -89,7 +156,12 @@ class CSSTransformer:
             or self._transform_background(cls)
             or self._transform_arbitrary(cls)
         )
+        if result and self.profile is not None:
+            result = self.profile.apply(result) or None
 
+        if len(self._cache) < CLASS_CACHE_SIZE:
+            self._cache[cls] = result
+            self._cache_bytes += _entry_nbytes(cls, result)
         return result
 
     def transform_classes(self, classes: list[str]) -> dict[str, str]:
@@ -105,12 +177,37 @@ class CSSTransformer:
         result: dict[str, str] = {}
 
         for cls in classes:
-            props = self.transform_class(cls)
+            props = self._transform_cached(cls)
             if props:
                 result.update(props)
 
         return result
 
+    def resolve_utilities(self, classes: Sequence[str]) -> dict[str, str]:
+        """
+        Resolve a utility list, such as the classes of an @apply rule.
+
+        Results are cached for the whole process, keyed by the theme tables,
+        the transformer settings and the class list, so each component is
+        resolved once. The cache of a theme goes away with its tables.
+
+        Args:
+            classes: Tailwind class names in order
+
+        Returns:
+            Combined dictionary of CSS properties
+        """
+        cache = _UTILITY_CACHE.get(self.theme)
+        if cache is None:
+            cache = _UTILITY_CACHE.setdefault(self.theme, {})
+        key = (self.base_font_size, self.include_mso, self.profile, tuple(classes))
+        resolved = cache.get(key)
+        if resolved is None:
+            resolved = tuple(self.transform_classes(list(classes)).items())
+            if len(cache) < UTILITY_CACHE_SIZE:
+                cache[key] = resolved
+        return dict(resolved)
+
     def to_style_string(self, properties: dict[str, str]) -> str:
         """
         Convert CSS properties dict to inline style string.
@@ -129,7 +226,7 @@ class CSSTransformer:
         for prefix, prop in PADDING_CLASSES.items():
             if cls.startswith(f"{prefix}-"):
                 value_part = cls[len(prefix) + 1 :]
-                px_value = get_spacing_value(value_part, self.base_font_size)
+                px_value = get_spacing_value(value_part, self.base_font_size, self.theme.spacing)
                 if px_value:
                     if ";" in prop:
                         # px or py - need to set both properties
@@ -141,7 +238,7 @@ class CSSTransformer:
         for prefix, prop in MARGIN_CLASSES.items():
             if cls.startswith(f"{prefix}-"):
                 value_part = cls[len(prefix) + 1 :]
-                px_value = get_spacing_value(value_part, self.base_font_size)
+                px_value = get_spacing_value(value_part, self.base_font_size, self.theme.spacing)
                 if px_value:
                     if ";" in prop:
                         props = prop.split(";")
@@ -267,8 +364,8 @@ class CSSTransformer:
             return {"word-break": WORD_BREAK_CLASSES[cls]}
 
         # Font family classes (email-safe versions)
-        if cls in EMAIL_SAFE_FONTS:
-            return {"font-family": EMAIL_SAFE_FONTS[cls]}
+        if cls in self.theme.fonts:
+            return {"font-family": self.theme.fonts[cls]}
 
         # Truncate utility
         if cls == "truncate":
@@ -320,7 +417,7 @@ class CSSTransformer:
             )
         ):
             color_part = cls[5:]  # Remove 'text-'
-            color, opacity = parse_color_with_opacity(color_part)
+            color, opacity = parse_color_with_opacity(color_part, self.theme.colors)
             if color:
                 if opacity is not None and color.startswith("#"):
                     return {"color": hex_to_rgba(color, opacity)}
@@ -351,7 +448,7 @@ class CSSTransformer:
             )
         ):
             color_part = cls[3:]  # Remove 'bg-'
-            color, opacity = parse_color_with_opacity(color_part)
+            color, opacity = parse_color_with_opacity(color_part, self.theme.colors)
             if color:
                 if opacity is not None and color.startswith("#"):
                     return {"background-color": hex_to_rgba(color, opacity)}
@@ -410,7 +507,7 @@ class CSSTransformer:
 
             if not is_non_color:
                 color_part = cls[7:]  # Remove 'border-'
-                color, opacity = parse_color_with_opacity(color_part)
+                color, opacity = parse_color_with_opacity(color_part, self.theme.colors)
                 if color:
                     if opacity is not None and color.startswith("#"):
                         return {"border-color": hex_to_rgba(color, opacity)}
@@ -433,7 +530,7 @@ class CSSTransformer:
             )
         ):
             color_part = cls[8:]  # Remove 'outline-'
-            color, opacity = parse_color_with_opacity(color_part)
+            color, opacity = parse_color_with_opacity(color_part, self.theme.colors)
             if color:
                 if opacity is not None and color.startswith("#"):
                     return {"outline-color": hex_to_rgba(color, opacity)}
@@ -594,3 +691,19 @@ class CSSTransformer:
                 return {prop: value}
 
         return None
+
+
+def _entry_nbytes(cls: str, properties: Optional[dict[str, str]]) -> int:
+    """Approximate memory held by one remembered class result."""
+    size = sys.getsizeof(cls)
+    if properties is not None:
+        size += sys.getsizeof(properties)
+        size += sum(sys.getsizeof(prop) + sys.getsizeof(v) for prop, v in properties.items())
+    return size
+
+
+# Resolved utility lists by theme tables, then by (base font size,
+# include_mso, profile, classes); entries go away with their tables
+_UTILITY_CACHE: WeakKeyDictionary[
+    ThemeTables, dict[tuple[Any, ...], tuple[tuple[str, str], ...]]
+] = WeakKeyDictionary()
@@ -5,6 +5,17 @@ Utility functions for the tailwind-email converter.
 import re
 from typing import Optional
 
+# Start tags of raw markup; comments and raw-text elements are matched so
+# callers can skip them (group 2 is the tag name, group 3 its attributes)
+MARKUP_PATTERN = re.compile(
+    r"<!--.*?-->|<(script|style)\b.*?</\1\s*>"
+    r"|<([a-zA-Z][^\s/>]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>",
+    re.DOTALL | re.IGNORECASE,
+)
+
+# One attribute of a start tag: name and optional (possibly quoted) value
+ATTRIBUTE_PATTERN = re.compile(r"([^\s\"'>/=]+)(?:\s*=\s*(\"[^\"]*\"|'[^']*'|[^\s\"'>]+))?")
+
 
 def convert_to_px(value: str, base_font_size: int = 16) -> str:
     """
@@ -118,25 +129,135 @@ def merge_styles(existing: str, new: str) -> str:
         return existing
 
     # Parse existing styles into dict
-    styles: dict[str, str] = {}
-
-    for style in existing.split(";"):
-        style = style.strip()
-        if ":" in style:
-            prop, val = style.split(":", 1)
-            styles[prop.strip()] = val.strip()
+    styles = parse_style_string(existing)
 
     # Add new styles (overwriting existing)
-    for style in new.split(";"):
-        style = style.strip()
-        if ":" in style:
-            prop, val = style.split(":", 1)
-            styles[prop.strip()] = val.strip()
+    styles.update(parse_style_string(new))
 
     # Reconstruct style string
     return "; ".join(f"{k}: {v}" for k, v in styles.items())
 
 
+def scan_declarations(body: str) -> tuple[list[tuple[str, str]], bool]:
+    """
+    Split a declaration block or inline style into (property, value) pairs.
+
+    Semicolons inside strings and parentheses (e.g. data URIs or quoted font
+    names) do not split. Declarations without a property or value are
+    skipped.
+
+    Args:
+        body: Declarations like "color: red; background: url(a;b)"
+
+    Returns:
+        Tuple of (pairs in source order, True if every declaration was
+        well-formed and no string or parenthesis was left open)
+    """
+    pairs: list[tuple[str, str]] = []
+    clean = True
+    depth = 0
+    quote = ""
+    start = 0
+    for index, char in enumerate(body + ";"):
+        if quote:
+            if char == quote:
+                quote = ""
+        elif char in "\"'":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            clean = clean and depth > 0
+            depth = max(depth - 1, 0)
+        elif char == ";" and not depth:
+            declaration = body[start:index]
+            prop, sep, value = declaration.partition(":")
+            if sep and prop.strip() and value.strip():
+                pairs.append((prop.strip(), value.strip()))
+            elif declaration.strip():
+                clean = False
+            start = index + 1
+    if quote or depth or body[start:].strip():
+        # The closing ';' was swallowed by an open string or parenthesis
+        clean = False
+        prop, sep, value = body[start:].partition(":")
+        if sep and prop.strip() and value.strip():
+            pairs.append((prop.strip(), value.strip()))
+    return pairs, clean
+
+
+def parse_style_string(style: str) -> dict[str, str]:
+    """
+    Parse an inline style string into an ordered dict of properties.
+
+    Args:
+        style: Inline style string like 'color: red; padding: 4px'
+
+    Returns:
+        Dictionary of CSS property -> value
+    """
+    return dict(scan_declarations(style)[0])
+
+
+def find_attributes(attributes: str) -> dict[str, re.Match[str]]:
+    """
+    Locate the attributes of a raw start tag.
+
+    Args:
+        attributes: Attribute string of a tag, as matched by MARKUP_PATTERN
+
+    Returns:
+        Lowercased attribute name -> match of its first occurrence
+    """
+    found: dict[str, re.Match[str]] = {}
+    for attribute in ATTRIBUTE_PATTERN.finditer(attributes):
+        found.setdefault(attribute.group(1).lower(), attribute)
+    return found
+
+
+def unquote_attribute(value: str) -> tuple[str, str]:
+    """
+    Split a raw attribute value into its text and quote character.
+
+    Args:
+        value: Raw value, quoted or not
+
+    Returns:
+        Tuple of (text, quote character; '"' for unquoted values)
+    """
+    if value[:1] in "\"'" and len(value) > 1 and value[-1] == value[0]:
+        return value[1:-1], value[0]
+    return value, '"'
+
+
+def replace_class_attribute(
+    attributes: str, found: dict[str, re.Match[str]], replacement: str
+) -> str:
+    """
+    Swap the class attribute of a raw start tag for new markup, dropping its style attribute.
+
+    Args:
+        attributes: Attribute string of the tag
+        found: Attribute matches from find_attributes()
+        replacement: Markup put where the class attribute was (e.g. 'style="..."')
+
+    Returns:
+        New attribute string
+    """
+    edits = [(found["class"], replacement)]
+    if "style" in found:
+        edits.append((found["style"], ""))
+
+    result = attributes
+    for attribute, text in sorted(edits, key=lambda edit: edit[0].start(), reverse=True):
+        start = attribute.start()
+        if not text:
+            # Drop the whitespace before a removed attribute
+            start = len(result[:start].rstrip())
+        result = result[:start] + text + result[attribute.end() :]
+    return result
+
+
 def is_valid_hex_color(value: str) -> bool:
     """
     Check if a string is a valid hex color.
@@ -0,0 +1,169 @@
+"""Tests for email size analysis."""
+
+import re
+
+from bs4 import BeautifulSoup
+
+from tailwind_email import TailwindEmailConverter
+from tailwind_email.analysis import GMAIL_CLIP_BYTES, SizeReport, find_sections
+from tailwind_email.converter import ConversionOptions, ConversionResult
+
+SECTIONED_EMAIL = """<html><head><style>p { margin: 0 }</style></head><body>
+<table class="w-full"><tr><td>
+<table class="max-w-xl mx-auto">
+<tr id="header"><td class="p-4 bg-white">Logo</td></tr>
+<tr><td class="p-4 text-gray-700 font-sans">Body text</td></tr>
+<tr id="footer"><td class="p-2 text-xs">Footer</td></tr>
+</table>
+</td></tr></table>
+</body></html>"""
+
+
+def _analyze(html: str, **options: object) -> tuple[str, SizeReport]:
+    converter = TailwindEmailConverter(ConversionOptions(analyze_size=True, **options))  # type: ignore[arg-type]
+    result = converter.convert_with_report(html)
+    assert result.size_report is not None
+    return result.html, result.size_report
+
+
+class TestFindSections:
+    """Tests for find_sections()."""
+
+    def test_descends_wrappers(self) -> None:
+        """Test single-child wrapper tables are skipped."""
+        soup = BeautifulSoup(SECTIONED_EMAIL, "lxml")
+        labels = sorted(find_sections(soup).values())
+        assert labels == ["1:tr#header", "2:tr", "3:tr#footer"]
+
+    def test_without_body(self) -> None:
+        """Test fragments without a body use the top-level elements."""
+        soup = BeautifulSoup("<div>a</div><div>b</div>", "html.parser")
+        assert sorted(find_sections(soup).values()) == ["1:div", "2:div"]
+
+
+class TestSizeReport:
+    """Tests for SizeReport accounting."""
+
+    def test_add_counts_utf8_bytes(self) -> None:
+        """Test non-ASCII text is measured in encoded bytes."""
+        report = SizeReport()
+        assert report.add("1:p", "café", "content") == 5
+        assert report.total_bytes == 5
+        assert report.sections == {"1:p": 5}
+
+    def test_budget_warning(self) -> None:
+        """Test a warning is produced only above the budget."""
+        report = SizeReport(budget=10)
+        report.add("1:p", "x" * 10, "content")
+        assert report.warnings == []
+        report.add("1:p", "x", "content")
+        assert report.over_budget
+        assert "Gmail clips" in report.warnings[0]
+
+    def test_default_budget(self) -> None:
+        """Test the default budget is Gmail's clipping limit."""
+        assert SizeReport().budget == GMAIL_CLIP_BYTES
+
+
+class TestConverterAnalysis:
+    """Tests for the analyze_size conversion option."""
+
+    def test_disabled_by_default(self) -> None:
+        """Test no report is produced without the option."""
+        result = TailwindEmailConverter().convert_with_report(SECTIONED_EMAIL)
+        assert result.size_report is None
+
+    def test_totals_match_output(self) -> None:
+        """Test section and category totals add up to the output size."""
+        html, report = _analyze(SECTIONED_EMAIL)
+        assert report.total_bytes == len(html.encode("utf-8"))
+        assert sum(report.categories.values()) == report.total_bytes
+        assert sum(report.sections.values()) == report.total_bytes
+
+    def test_totals_match_minified_output(self) -> None:
+        """Test the report measures the minified output when minifying."""
+        html, report = _analyze(SECTIONED_EMAIL, minify=True)
+        assert report.total_bytes == len(html.encode("utf-8"))
+
+    def test_sections_and_categories(self) -> None:
+        """Test bytes are attributed to sections, head and inline styles."""
+        html, report = _analyze(SECTIONED_EMAIL)
+        assert set(report.sections) >= {"head", "1:tr#header", "2:tr", "3:tr#footer"}
+        assert report.sections["head"] == len("<head><style>p { margin: 0 }</style></head>")
+        inline = sum(len(match) for match in re.findall(r'style="[^"]*"', html))
+        assert report.style_bytes == inline + len("p { margin: 0 }")
+        assert report.content_bytes > 0
+
+    def test_class_attribution(self) -> None:
+        """Test classes are charged for the declarations they produced."""
+        _, report = _analyze('<div class="p-4 text-white">x</div>')
+        assert report.classes["text-white"] == len("color: #ffffff; ")
+        assert report.classes["p-4"] == len("padding: 16px; ")
+
+    def test_overridden_class_not_charged(self) -> None:
+        """Test a class whose property is overridden by a later class gets nothing."""
+        _, report = _analyze('<div class="text-white text-black">x</div>')
+        assert "text-white" not in report.classes
+        assert "text-black" in report.classes
+
+    def test_budget_option(self) -> None:
+        """Test the size_budget option flags large output."""
+        _, report = _analyze(SECTIONED_EMAIL, size_budget=100)
+        assert report.over_budget
+        assert "Sections:" in report.summary()
+
+
+class TestFitToBudget:
+    """Tests for the fit_to_budget conversion option."""
+
+    CARD = (
+        '<div class="font-sans text-gray-700 px-4 py-2">\n'
+        '  <p class="font-sans text-gray-700 mt-0 mb-0 ml-0 mr-0">Item</p>\n'
+        "</div>\n"
+    )
+
+    def _convert(self, html: str, **options: object) -> ConversionResult:
+        converter = TailwindEmailConverter(ConversionOptions(fit_to_budget=True, **options))  # type: ignore[arg-type]
+        return converter.convert_with_report(html)
+
+    def test_within_budget_untouched(self) -> None:
+        """Test output under the budget is produced by a single pass."""
+        result = self._convert(self.CARD)
+        assert result.fallback_stages == []
+        assert result.html == TailwindEmailConverter().convert(self.CARD)
+
+    def test_stages_applied_in_order_until_fit(self) -> None:
+        """Test only as many stages as needed are enabled, cheapest first."""
+        html = self.CARD * 20
+        plain = TailwindEmailConverter().convert(html)
+        compacted = TailwindEmailConverter(ConversionOptions(collapse_shorthands=True)).convert(
+            html
+        )
+        assert len(compacted) < len(plain)
+
+        result = self._convert(html, size_budget=len(compacted))
+        assert result.fallback_stages == ["collapse_shorthands"]
+        assert result.html == compacted
+
+    def test_all_stages_when_budget_unreachable(self) -> None:
+        """Test every stage runs when the output never fits."""
+        result = self._convert(self.CARD * 20, size_budget=10)
+        assert result.fallback_stages == [
+            "collapse_shorthands",
+            "prune_inherited",
+            "hybrid_styles",
+            "minify",
+        ]
+        assert set(result.bytes_saved) == {"prune_inherited", "hybrid_styles", "minify"}
+        assert result.size > 10
+
+    def test_enabled_stages_skipped(self) -> None:
+        """Test stages already enabled in the options are not reported."""
+        result = self._convert(self.CARD * 20, size_budget=10, minify=True)
+        assert "minify" not in result.fallback_stages
+
+    def test_timings_cover_all_passes(self) -> None:
+        """Test timings accumulate across passes."""
+        result = self._convert(self.CARD * 20, size_budget=10)
+        assert set(result.timings) == {"parse", "process", "serialize"}
+        assert all(value > 0 for value in result.timings.values())
@@ -0,0 +1,34 @@
+"""Tests for input encoding detection."""
+
+import codecs
+
+from tailwind_email.charset import DEFAULT_CHARSET, detect_charset
+
+
+class TestDetectCharset:
+    """Tests for detect_charset()."""
+
+    def test_given_encoding_wins(self) -> None:
+        """Test an encoding passed by the caller is used as is."""
+        assert detect_charset(b'<meta charset="utf-8">', "cp1252") == "cp1252"
+
+    def test_byte_order_mark(self) -> None:
+        """Test byte order marks take precedence over declarations."""
+        assert detect_charset(codecs.BOM_UTF8 + b'<meta charset="latin-1">') == "utf-8-sig"
+        assert detect_charset("<p>x</p>".encode("utf-16")) == "utf-16"
+
+    def test_meta_declarations(self) -> None:
+        """Test <meta charset> and http-equiv declarations are found."""
+        assert detect_charset(b'<html><head><meta charset="ISO-8859-1">') == "iso-8859-1"
+        html = b'<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">'
+        assert detect_charset(html) == "windows-1252"
+
+    def test_fallback(self) -> None:
+        """Test undeclared, unknown and impossible declarations fall back to UTF-8."""
+        assert detect_charset(b"<p>x</p>") == DEFAULT_CHARSET
+        assert detect_charset(b'<meta charset="no-such-codec">') == DEFAULT_CHARSET
+        assert detect_charset(b'<meta charset="utf-16">') == DEFAULT_CHARSET
+
+    def test_declaration_window(self) -> None:
+        """Test declarations far into the document are ignored."""
+        assert detect_charset(b" " * 5000 + b'<meta charset="latin-1">') == DEFAULT_CHARSET
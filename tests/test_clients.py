@@ -0,0 +1,182 @@
+"""Tests for target email client profiles."""
+
+import pytest
+
+from tailwind_email import TailwindEmailConverter, convert
+from tailwind_email.clients import (
+    ClientProfile,
+    SupportReport,
+    client_mask,
+    compile_profile,
+    support_mask,
+)
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.mappings.clients import ALL_CLIENTS, CLIENT_BITS
+from tailwind_email.transformer import CSSTransformer
+
+CARD = '<div class="rounded-lg shadow-md p-4 text-sm antialiased">x</div>'
+
+
+class TestSupportMatrix:
+    """Tests for the support lookups."""
+
+    def test_client_mask(self) -> None:
+        """Test client names map to their bits."""
+        assert client_mask(["gmail", "outlook"]) == CLIENT_BITS["gmail"] | CLIENT_BITS["outlook"]
+        with pytest.raises(ValueError, match="Unknown email client"):
+            client_mask(["lotus_notes"])
+
+    def test_support_mask(self) -> None:
+        """Test property, value and vendor-prefix support lookups."""
+        outlook = CLIENT_BITS["outlook"]
+        assert support_mask("color", "red") == ALL_CLIENTS
+        assert not support_mask("border-radius", "8px") & outlook
+        assert support_mask("display", "block") == ALL_CLIENTS
+        assert not support_mask("display", "grid") & CLIENT_BITS["gmail"]
+        assert support_mask("mso-line-height-rule", "exactly") == outlook
+        assert not support_mask("-webkit-font-smoothing", "auto") & outlook
+
+
+class TestClientProfile:
+    """Tests for ClientProfile."""
+
+    def test_profiles_are_shared(self) -> None:
+        """Test a profile is compiled once per audience."""
+        assert compile_profile(["gmail", "outlook"]) is compile_profile(["outlook", "gmail"])
+        assert compile_profile(None) is None
+        with pytest.raises(ValueError, match="At least one"):
+            compile_profile([])
+
+    def test_apply_drops_and_adds(self) -> None:
+        """Test dead declarations are dropped and additions follow their trigger."""
+        profile = ClientProfile(client_mask(["outlook"]))
+        assert profile.apply({"border-radius": "4px", "line-height": "20px", "color": "red"}) == {
+            "line-height": "20px",
+            "mso-line-height-rule": "exactly",
+            "color": "red",
+        }
+
+    def test_value_level_support(self) -> None:
+        """Test values nobody in the audience renders are dropped."""
+        profile = ClientProfile(client_mask(["gmail"]))
+        assert profile.apply({"display": "grid"}) == {}
+        assert profile.apply({"display": "block"}) == {"display": "block"}
+
+
+class TestTargetClients:
+    """Tests for the target_clients conversion option."""
+
+    def test_no_filtering_by_default(self) -> None:
+        """Test output is unchanged without target clients."""
+        output = convert(CARD)
+        assert "border-radius" in output
+        assert "-moz-osx-font-smoothing" in output
+
+    def test_outlook_only(self) -> None:
+        """Test an Outlook audience loses styles Outlook ignores."""
+        output = convert(CARD, {"target_clients": ["outlook"]})
+        assert (
+            'style="padding: 16px; font-size: 14px; line-height: 20px; '
+            'mso-line-height-rule: exactly">' in output
+        )
+
+    def test_webmail_drops_mso(self) -> None:
+        """Test mso-* declarations are dropped when Outlook is not targeted."""
+        output = convert(CARD, {"target_clients": ["gmail"]})
+        assert "mso-" not in output
+        assert "-webkit-" not in output
+        assert "border-radius: 8px" in output
+
+    def test_mixed_audience_keeps_union(self) -> None:
+        """Test declarations are kept when any targeted client renders them."""
+        output = convert(CARD, {"target_clients": ["apple_mail", "outlook"]})
+        assert "box-shadow" in output
+        assert "mso-line-height-rule: exactly" in output
+        assert "font-size: 14px; -webkit-text-size-adjust: 100%" in output
+        assert "-moz-osx-font-smoothing" not in output
+
+    def test_variants_and_apply_filtered(self) -> None:
+        """Test variant and @apply declarations use the same profile."""
+        html = '<a class="btn md:rounded-lg">x</a>'
+        output = convert(
+            html,
+            {
+                "target_clients": ["outlook"],
+                "variant_styles": True,
+                "component_css": ".btn { @apply rounded p-2; }",
+            },
+        )
+        assert "radius" not in output
+        assert "padding: 8px" in output
+
+    def test_profile_survives_reload(self) -> None:
+        """Test reloading the theme keeps the target clients."""
+        converter = TailwindEmailConverter(ConversionOptions(target_clients=["outlook"]))
+        converter.reload_theme({"colors": {"brand": "#123456"}})
+        assert converter.transformer.profile == compile_profile(["outlook"])
+        assert "radius" not in converter.convert('<p class="rounded bg-brand">x</p>')
+
+    def test_apply_cache_keyed_by_profile(self) -> None:
+        """Test @apply results are not shared between audiences."""
+        outlook = CSSTransformer(profile=compile_profile(["outlook"]))
+        assert outlook.resolve_utilities(["rounded"]) == {}
+        assert CSSTransformer().resolve_utilities(["rounded"]) == {"border-radius": "4px"}
+
+
+class TestSupportReport:
+    """Tests for SupportReport and the analyze_support option."""
+
+    def test_and_of_declaration_masks(self) -> None:
+        """Test the supported mask is the AND of every distinct declaration."""
+        report = SupportReport()
+        report.add({"color": "red", "padding": "4px"})
+        assert report.supported == ALL_CLIENTS
+        assert report.affected_clients == []
+        report.add({"border-radius": "4px", "color": "red"})
+        assert report.affected_clients == ["outlook"]
+        assert report.issues == {"outlook": ["border-radius"]}
+        assert len(report.declarations) == 3
+
+    def test_value_and_important(self) -> None:
+        """Test value-level entries are labelled and !important is ignored."""
+        report = SupportReport(client_mask(["gmail", "apple_mail"]))
+        report.add({"display": "grid !important"})
+        assert report.issues == {"gmail": ["display: grid"]}
+        assert report.supported_clients == ["apple_mail"]
+
+    def test_disabled_by_default(self) -> None:
+        """Test no report is collected without the option."""
+        converter = TailwindEmailConverter()
+        assert converter.convert_with_report(CARD).support_report is None
+
+    def test_conversion_report(self) -> None:
+        """Test the report covers inline styles and @media variants."""
+        options = ConversionOptions(analyze_support=True, variant_styles=True)
+        result = TailwindEmailConverter(options).convert_with_report(
+            '<div class="shadow p-4 md:p-6 dark:bg-black">x</div>'
+        )
+        report = result.support_report
+        assert report is not None
+        assert report.issues["outlook"] == ["@media", "box-shadow", "prefers-color-scheme"]
+        assert report.issues["gmail"] == ["box-shadow", "prefers-color-scheme"]
+        assert "apple_mail" in report.supported_clients
+        assert "outlook: ignores @media, box-shadow" in report.summary()
+
+    def test_report_limited_to_target_clients(self) -> None:
+        """Test only targeted clients are reported on."""
+        options = ConversionOptions(analyze_support=True, target_clients=["gmail", "outlook"])
+        report = TailwindEmailConverter(options).convert_with_report(CARD).support_report
+        assert report is not None
+        assert report.affected_clients == ["outlook"]
+        assert report.issues == {"outlook": ["border-radius"]}
+
+    def test_clean_document(self) -> None:
+        """Test a document every client renders reports no issues."""
+        options = ConversionOptions(analyze_support=True)
+        report = (
+            TailwindEmailConverter(options)
+            .convert_with_report('<p class="p-4 text-red-500">x</p>')
+            .support_report
+        )
+        assert report is not None
+        assert report.summary() == "All clients render every declaration"
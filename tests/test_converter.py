@@ -1,7 +1,13 @@
 """Tests for the main converter module."""
 
-from tailwind_email import TailwindEmailConverter, convert
+from pathlib import Path
+
+import pytest
+from bs4 import Tag
+
+from tailwind_email import TailwindEmailConverter, convert, convert_fragment
 from tailwind_email.converter import ConversionOptions
+from tailwind_email.plugins import VisitContext
 
 
 class TestConvertFunction:
@@ -338,6 +344,110 @@ class TestTailwindEmailConverter:
         assert "margin: 16px" in result2
 
 
+class TestConvertFragment:
+    """Tests for fragment conversion."""
+
+    def test_no_document_scaffolding(self) -> None:
+        """Test the converted fragment is returned without html/body elements."""
+        assert convert_fragment('<td class="p-4">Hi</td>') == '<td style="padding: 16px">Hi</td>'
+        assert convert_fragment("text <b>bold</b>") == "text <b>bold</b>"
+        assert convert_fragment("") == ""
+
+    def test_node_order_kept(self) -> None:
+        """Test comments, table rows and leading head elements stay in order."""
+        html = '<!-- a --><style>p { }</style><tr><td class="m-1">x</td></tr><!-- b -->'
+        assert convert_fragment(html) == (
+            '<!-- a --><style>p { }</style><tr><td style="margin: 4px">x</td></tr><!-- b -->'
+        )
+
+    def test_generated_styles_first(self) -> None:
+        """Test head styles generated by the conversion lead the fragment."""
+        converter = TailwindEmailConverter(ConversionOptions(variant_styles=True, minify=True))
+        assert converter.convert_fragment('<p class="p-2 md:p-4">x</p>') == (
+            "<style>@media (min-width:768px){.v0{padding:16px !important}}</style>"
+            '<p class="v0" style="padding:8px">x</p>'
+        )
+
+    def test_report(self) -> None:
+        """Test diagnostics are available for fragments."""
+        converter = TailwindEmailConverter(ConversionOptions(minify=True))
+        result = converter.convert_with_report("<p>  a  </p>", fragment=True)
+        assert result.html == "<p> a </p>"
+        assert result.bytes_saved["minify"] == 2
+
+
+class TestBytesAndFiles:
+    """Tests for bytes input, file conversion and streamed output."""
+
+    def test_convert_bytes(self) -> None:
+        """Test bytes are decoded with their declared charset and output as UTF-8."""
+        data = '<meta charset="iso-8859-1"><p class="p-4">Café</p>'.encode("latin-1")
+        output = TailwindEmailConverter().convert_bytes(data)
+        assert '<meta charset="utf-8"/>' in output.decode("utf-8")
+        assert '<p style="padding: 16px">Café</p>' in output.decode("utf-8")
+
+    def test_explicit_encoding(self) -> None:
+        """Test a given encoding overrides detection."""
+        data = '<p class="m-1">Ωmega</p>'.encode("iso-8859-7")
+        output = TailwindEmailConverter().convert_bytes(data, encoding="iso-8859-7")
+        assert "Ωmega" in output.decode("utf-8")
+
+    def test_bytes_with_templates(self) -> None:
+        """Test template preservation works on bytes input."""
+        converter = TailwindEmailConverter(ConversionOptions(preserve_templates=True))
+        output = converter.convert_bytes('<p class="p-1 {{ c }}">é</p>'.encode())
+        assert '<p class="{{ c }}" style="padding: 4px">é</p>' in output.decode()
+
+    def test_iter_convert_matches_convert(self) -> None:
+        """Test streamed chunks join to the regular output."""
+        converter = TailwindEmailConverter(ConversionOptions(minify=True, variant_styles=True))
+        html = '<table class="w-full"><tr><td class="p-2 md:p-4">  x  </td></tr></table>'
+        assert "".join(converter.iter_convert(html)) == converter.convert(html)
+        assert "".join(converter.iter_convert(html, fragment=True)) == (
+            converter.convert_fragment(html)
+        )
+
+    def test_iter_convert_fit_to_budget(self) -> None:
+        """Test budget fitting yields the complete fitted output."""
+        converter = TailwindEmailConverter(ConversionOptions(fit_to_budget=True, size_budget=10))
+        html = '<p class="p-4 text-sm">x</p>'
+        assert list(converter.iter_convert(html)) == [converter.convert(html)]
+
+    def test_convert_file(self, tmp_path: Path) -> None:
+        """Test files are decoded and written like convert_bytes() input and output."""
+        source = tmp_path / "in.html"
+        data = '<meta charset="cp1252"><td class="p-1">€</td>'.encode("cp1252") + b"\x81"
+        source.write_bytes(data)
+        converter = TailwindEmailConverter()
+        written = converter.convert_file(source, tmp_path / "out.html")
+        output = (tmp_path / "out.html").read_bytes()
+        assert written == len(output)
+        assert output == converter.convert_bytes(data)
+        assert '<td style="padding: 4px">€' in output.decode("utf-8")
+
+    def test_convert_file_in_place(self, tmp_path: Path) -> None:
+        """Test a file can be converted onto itself."""
+        path = tmp_path / "page.html"
+        path.write_text('<p class="m-2">x</p>', encoding="utf-8")
+        TailwindEmailConverter().convert_file(path, path)
+        assert '<p style="margin: 8px">x</p>' in path.read_text(encoding="utf-8")
+
+    def test_convert_file_failure_keeps_input(self, tmp_path: Path) -> None:
+        """Test a failed in-place conversion leaves the file and directory as they were."""
+
+        def fail(element: Tag, context: VisitContext) -> None:
+            raise RuntimeError("handler failed")
+
+        path = tmp_path / "page.html"
+        path.write_text('<p class="m-2">x</p>', encoding="utf-8")
+        converter = TailwindEmailConverter()
+        converter.plugins.register(fail, tags=["p"])
+        with pytest.raises(RuntimeError):
+            converter.convert_file(path, path)
+        assert path.read_text(encoding="utf-8") == '<p class="m-2">x</p>'
+        assert list(tmp_path.iterdir()) == [path]
+
+
 class TestEdgeCases:
     """Tests for edge cases and special scenarios."""
 
@@ -0,0 +1,273 @@
+"""Tests for the <style> block inliner."""
+
+from bs4 import BeautifulSoup
+
+from tailwind_email import TailwindEmailConverter, convert
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.inliner import (
+    StylesheetIndex,
+    build_index,
+    expand_apply,
+    parse_selector,
+    specificity,
+    split_declarations,
+)
+from tailwind_email.theme import DEFAULT_THEME
+from tailwind_email.transformer import _UTILITY_CACHE, CSSTransformer
+
+
+def _inline(css: str, body: str, **options: object) -> str:
+    html = f"<html><head><style>{css}</style></head><body>{body}</body></html>"
+    return convert(html, {"inline_style_blocks": True, **options})
+
+
+class TestSelectorParsing:
+    """Tests for parse_selector() and specificity()."""
+
+    def test_compound_selector(self) -> None:
+        """Test type, id, class and attribute parts are parsed."""
+        compounds = parse_selector('td#main.cell[data-x="1"]')
+        assert compounds is not None
+        assert len(compounds) == 1
+        compound = compounds[0]
+        assert compound.tag == "td"
+        assert compound.element_id == "main"
+        assert compound.classes == ["cell"]
+        assert compound.attributes[0].name == "data-x"
+        assert compound.attributes[0].value == "1"
+
+    def test_descendant_selector(self) -> None:
+        """Test whitespace separates compound selectors."""
+        compounds = parse_selector("table.card  td a[href]")
+        assert compounds is not None
+        assert [compound.tag for compound in compounds] == ["table", "td", "a"]
+
+    def test_unsupported_selectors(self) -> None:
+        """Test pseudo-classes and other combinators are rejected."""
+        assert parse_selector("a:hover") is None
+        assert parse_selector("tr > td") is None
+        assert parse_selector("h1 + p") is None
+        assert parse_selector("p::first-line") is None
+
+    def test_specificity(self) -> None:
+        """Test specificity counts ids, classes/attributes and types."""
+        assert specificity(parse_selector("p") or []) == (0, 0, 1)
+        assert specificity(parse_selector(".a .b[href]") or []) == (0, 3, 0)
+        assert specificity(parse_selector("#x td.y") or []) == (1, 1, 1)
+        assert specificity(parse_selector("*") or []) == (0, 0, 0)
+
+    def test_split_declarations(self) -> None:
+        """Test semicolons inside strings and url() do not split."""
+        body = "background: url(data:image/png;base64,AA); font-family: 'a;b'; COLOR: red"
+        assert split_declarations(body) == [
+            ("background", "url(data:image/png;base64,AA)"),
+            ("font-family", "'a;b'"),
+            ("color", "red"),
+        ]
+
+
+class TestStylesheetIndex:
+    """Tests for StylesheetIndex."""
+
+    def test_rules_indexed_by_rightmost_compound(self) -> None:
+        """Test rules land in the bucket of their most selective key."""
+        index = StylesheetIndex()
+        index.add_stylesheet(
+            ".a p { color: red } #x { color: blue } .a.b { color: green } * { margin: 0 }"
+        )
+        assert set(index.by_tag) == {"p"}
+        assert set(index.by_id) == {"x"}
+        assert set(index.by_class) == {"a"}
+        assert len(index.universal) == 1
+        assert len(index) == 4
+
+    def test_unsupported_rules_remain(self) -> None:
+        """Test at-rules and unsupported selectors are returned untouched."""
+        index = StylesheetIndex()
+        remaining = index.add_stylesheet(
+            "@media (max-width: 600px) { .a { color: red } } a, a:hover { color: blue }"
+        )
+        assert (
+            remaining == "@media (max-width: 600px) { .a { color: red } }\na:hover { color: blue }"
+        )
+        assert len(index) == 1
+
+    def test_build_index_removes_empty_blocks(self) -> None:
+        """Test fully inlined <style> blocks are removed."""
+        soup = BeautifulSoup("<html><head><style>p { color: red }</style></head></html>", "lxml")
+        index = build_index(soup)
+        assert len(index) == 1
+        assert soup.find("style") is None
+
+
+class TestConverterInlining:
+    """Tests for the inline_style_blocks conversion option."""
+
+    def test_disabled_by_default(self) -> None:
+        """Test <style> blocks are left alone without the option."""
+        html = "<html><head><style>p { color: red }</style></head><body><p>x</p></body></html>"
+        output = convert(html)
+        assert "<style>p { color: red }</style>" in output
+        assert "<p>x</p>" in output
+
+    def test_type_class_id_and_attribute(self) -> None:
+        """Test the supported simple selectors are inlined."""
+        css = 'p { color: red } .note { margin: 0 } #top { padding: 4px } a[href^="https"] { color: blue }'
+        body = '<p>a</p><div class="note">b</div><div id="top">c</div><a href="https://x">d</a>'
+        output = _inline(css, body)
+        assert '<p style="color: red">a</p>' in output
+        assert '<div class="note" style="margin: 0">b</div>' in output
+        assert '<div id="top" style="padding: 4px">c</div>' in output
+        assert '<a href="https://x" style="color: blue">d</a>' in output
+        assert "<style>" not in output
+
+    def test_descendant_selector(self) -> None:
+        """Test descendant rules only match inside their ancestors."""
+        output = _inline(
+            ".card a { color: red }", '<div class="card"><p><a>in</a></p></div><a>out</a>'
+        )
+        assert '<a style="color: red">in</a>' in output
+        assert "<a>out</a>" in output
+
+    def test_descendant_uses_original_classes(self) -> None:
+        """Test ancestors match on classes removed by the conversion."""
+        output = _inline(
+            ".wrapper a { color: red }",
+            '<div class="wrapper p-4"><a>in</a></div>',
+            preserve_unsupported_classes=False,
+        )
+        assert '<a style="color: red">in</a>' in output
+
+    def test_specificity_order(self) -> None:
+        """Test more specific rules win regardless of source order."""
+        output = _inline(
+            "#x { color: blue } p.a { color: green } p { color: red }", '<p class="a" id="x">t</p>'
+        )
+        assert 'style="color: blue"' in output
+
+    def test_source_order_breaks_ties(self) -> None:
+        """Test later rules win at equal specificity."""
+        output = _inline(".a { color: red } .b { color: blue }", '<p class="b a">t</p>')
+        assert 'style="color: blue"' in output
+
+    def test_utilities_beat_simple_rules(self) -> None:
+        """Test utility classes override rules no more specific than a class."""
+        output = _inline(".card { padding: 4px; color: red }", '<td class="card p-2">t</td>')
+        assert 'style="padding: 8px; color: red"' in output
+
+    def test_specific_rules_beat_utilities(self) -> None:
+        """Test rules more specific than a class selector override utilities."""
+        output = _inline(
+            "td.card { padding: 4px }", '<table><tr><td class="card p-2">t</td></tr></table>'
+        )
+        assert 'style="padding: 4px"' in output
+
+    def test_important_beats_inline_and_utilities(self) -> None:
+        """Test !important rules override the style attribute and utilities."""
+        output = _inline(
+            "p { color: red !important }",
+            '<p class="text-white" style="color: green">t</p>',
+        )
+        assert 'style="color: red !important"' in output
+
+    def test_inline_style_beats_rules(self) -> None:
+        """Test the existing style attribute overrides normal rules."""
+        output = _inline("#x { color: red }", '<p id="x" style="color: green">t</p>')
+        assert 'style="color: green"' in output
+
+    def test_unsupported_rules_kept_in_head(self) -> None:
+        """Test rules that cannot be inlined stay in the <style> block."""
+        output = _inline("a:hover { color: red } p { margin: 0 }", "<p><a>x</a></p>")
+        assert "<style>a:hover { color: red }</style>" in output
+        assert '<p style="margin: 0">' in output
+
+    def test_media_blocks_kept(self) -> None:
+        """Test <style> blocks limited to some media or not CSS are left alone."""
+        html = (
+            '<html><head><style media="screen and (max-width:600px)">.col{width:100%}</style>'
+            '<style type="text/x-template">.col{color:red}</style>'
+            '<style media="all">p { margin: 0 }</style></head>'
+            '<body><p class="col">x</p></body></html>'
+        )
+        output = convert(html, {"inline_style_blocks": True})
+        assert '<style media="screen and (max-width:600px)">.col{width:100%}</style>' in output
+        assert '<style type="text/x-template">.col{color:red}</style>' in output
+        assert '<p class="col" style="margin: 0">x</p>' in output
+
+    def test_media_rules_kept(self) -> None:
+        """Test rules inside @media and @supports are not inlined."""
+        output = _inline(
+            "@media (max-width: 600px) { .col { width: 100% } } "
+            "@supports (display: grid) { .col { display: grid } }",
+            '<td class="col">x</td>',
+        )
+        assert '<td class="col">x</td>' in output
+        assert "@media (max-width: 600px) { .col { width: 100% } }" in output
+        assert "@supports (display: grid) { .col { display: grid } }" in output
+
+    def test_head_elements_not_styled(self) -> None:
+        """Test universal rules do not add styles to head elements."""
+        html = "<html><head><title>t</title><style>* { margin: 0 }</style></head><body><p>x</p></body></html>"
+        output = convert(html, {"inline_style_blocks": True})
+        assert "<title>t</title>" in output
+        assert '<p style="margin: 0">x</p>' in output
+
+
+class TestApply:
+    """Tests for @apply support."""
+
+    BUTTON_CSS = ".btn { @apply px-6 py-3 rounded-lg bg-blue-600 text-white; }"
+
+    def test_expand_apply(self) -> None:
+        """Test @apply directives are replaced by resolved declarations."""
+        css = expand_apply(
+            ".a { @apply p-4 text-white; margin: 0 }", CSSTransformer().resolve_utilities
+        )
+        assert css == ".a { padding: 16px; color: #ffffff; margin: 0 }"
+
+    def test_expand_apply_important(self) -> None:
+        """Test a trailing !important applies to every declaration."""
+        css = expand_apply(".a { @apply p-4 !important }", CSSTransformer().resolve_utilities)
+        assert css == ".a { padding: 16px !important;}"
+
+    def test_resolution_is_cached(self) -> None:
+        """Test a utility list is resolved once per transformer configuration."""
+        first = CSSTransformer().resolve_utilities(["px-6", "py-3"])
+        first["padding-left"] = "0px"
+        assert CSSTransformer().resolve_utilities(["px-6", "py-3"])["padding-left"] == "24px"
+        cached = _UTILITY_CACHE[DEFAULT_THEME]
+        count = len(cached)
+        CSSTransformer().resolve_utilities(["px-6", "py-3"])
+        assert len(cached) == count
+        assert (16, True, None, ("px-6", "py-3")) in cached
+
+    def test_apply_in_style_block(self) -> None:
+        """Test @apply rules in head styles are inlined."""
+        output = _inline(".card { @apply p-4 bg-white; }", '<div class="card">x</div>')
+        assert (
+            '<div class="card" style="padding: 16px; background-color: #ffffff">x</div>' in output
+        )
+
+    def test_component_css(self) -> None:
+        """Test component rules are inlined wherever the class appears."""
+        html = '<a class="btn" href="#">A</a><a class="btn mt-2" href="#">B</a>'
+        output = convert(html, {"component_css": self.BUTTON_CSS})
+        assert output.count("padding-left: 24px") == 2
+        assert output.count("background-color: #2563eb; color: #ffffff") == 2
+        assert "margin-top: 8px" in output
+        assert "<style>" not in output
+
+    def test_component_leftovers_added_to_head(self) -> None:
+        """Test component rules that cannot be inlined go to the head."""
+        css = self.BUTTON_CSS + " .btn:hover { @apply bg-blue-700; }"
+        html = '<html><head><style>p { color: red }</style></head><body><a class="btn">A</a></body></html>'
+        output = convert(html, {"component_css": css})
+        assert "<head><style>.btn:hover { background-color: #1d4ed8; }</style><style>p" in output
+
+    def test_component_index_reused(self) -> None:
+        """Test component CSS is parsed once per converter."""
+        converter = TailwindEmailConverter(ConversionOptions(component_css=self.BUTTON_CSS))
+        converter.convert('<a class="btn">A</a>')
+        index = converter._components
+        converter.convert('<a class="btn">B</a>')
+        assert converter._components is index
@@ -0,0 +1,112 @@
+"""Tests for the Jinja2 extension."""
+
+from typing import Optional
+
+import pytest
+
+jinja2 = pytest.importorskip("jinja2")
+
+from tailwind_email.converter import ConversionOptions  # noqa: E402
+from tailwind_email.jinja import ClassResolver, TailwindExtension  # noqa: E402
+
+
+def _environment(
+    options: Optional[ConversionOptions] = None, **kwargs: object
+) -> "jinja2.Environment":
+    env = jinja2.Environment(extensions=[TailwindExtension], **kwargs)
+    env.tailwind_options = options
+    return env
+
+
+class TestClassResolver:
+    """Tests for ClassResolver."""
+
+    def test_resolve(self) -> None:
+        """Test class strings resolve to a style and the classes to keep."""
+        resolver = ClassResolver()
+        assert resolver.resolve("p-4 card bg-red-500") == (
+            "padding: 16px; background-color: #ef4444",
+            "card",
+        )
+        assert resolver.resolve("") == ("", "")
+
+    def test_memoized(self) -> None:
+        """Test each class string is resolved once."""
+        resolver = ClassResolver()
+        first = resolver.resolve("p-4 text-sm")
+        assert resolver.resolve("p-4 text-sm") is first
+
+    def test_options(self) -> None:
+        """Test the theme, target clients and preservation options apply."""
+        options = ConversionOptions(
+            theme={"colors": {"brand": "#123456"}},
+            target_clients=["outlook"],
+            preserve_unsupported_classes=False,
+            minify=True,
+        )
+        resolver = ClassResolver(options)
+        assert resolver.resolve("rounded bg-brand card") == ("background-color:#123456", "")
+
+
+class TestTailwindExtension:
+    """Tests for TailwindExtension."""
+
+    def test_static_classes_inlined_at_compile_time(self) -> None:
+        """Test static class attributes become styles in the compiled source."""
+        env = _environment()
+        source = '<td class="p-4 card" style="color: red">{{ name }}</td>'
+        assert env.preprocess(source) == (
+            '<td class="card" style="color: red; padding: 16px">{{ name }}</td>'
+        )
+
+    def test_dynamic_classes_resolved_at_render_time(self) -> None:
+        """Test expressions in class attributes go through the filters."""
+        env = _environment()
+        template = env.from_string(
+            "<p class=\"p-4 {{ 'bg-red-500' if overdue else 'bg-green-500' }} note\">x</p>"
+        )
+        assert template.render(overdue=True) == (
+            '<p class="note " style="padding: 16px; background-color: #ef4444">x</p>'
+        )
+        assert "background-color: #22c55e" in template.render(overdue=False)
+
+    def test_render_cache_shared(self) -> None:
+        """Test renders reuse the resolver's cached results."""
+        env = _environment()
+        template = env.from_string('<p class="{{ cls }}">x</p>')
+        template.render(cls="mt-2 extra")
+        extension = env.extensions[TailwindExtension.identifier]
+        assert isinstance(extension, TailwindExtension)
+        assert "mt-2 extra" in extension.resolver._cache
+        assert template.render(cls="mt-2 extra") == (
+            '<p class="extra" style="margin-top: 8px">x</p>'
+        )
+
+    def test_control_blocks_in_class(self) -> None:
+        """Test class attributes with control blocks are resolved whole at render time."""
+        env = _environment()
+        template = env.from_string('<p class="text-sm {% if big %}text-lg{% endif %}">x</p>')
+        assert "font-size: 18px" in template.render(big=True)
+        assert "font-size: 14px" in template.render(big=False)
+
+    def test_template_syntax_untouched(self) -> None:
+        """Test the rest of the template, comments and raw-text elements are kept."""
+        env = _environment()
+        source = (
+            "{% for row in rows %}<tr {% if row.hidden %}hidden{% endif %}>"
+            '<td class="p-2" title="{{ row.title }}">{{ row.name }}</td></tr>{% endfor %}'
+            '<!-- <p class="p-4"> --><style>.p-4 { color: red }</style>'
+        )
+        assert env.preprocess(source) == source.replace('class="p-2"', 'style="padding: 8px"')
+
+    def test_autoescape(self) -> None:
+        """Test dynamic class values are escaped when autoescaping."""
+        env = _environment(autoescape=True)
+        template = env.from_string('<p class="{{ cls }}">x</p>')
+        assert 'class="a&#34;b"' in template.render(cls='a"b')
+
+    def test_environment_options(self) -> None:
+        """Test the environment's options configure the extension."""
+        env = _environment(ConversionOptions(theme={"colors": {"brand": "#0b5fff"}}))
+        template = env.from_string('<p class="text-brand {{ extra }}">x</p>')
+        assert 'style="color: #0b5fff; ' in template.render(extra="")
@@ -0,0 +1,104 @@
+"""Tests for layout composition."""
+
+import pytest
+
+from tailwind_email import TailwindEmailConverter
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.layout import ConvertedLayout, LayoutRegistry
+
+LAYOUT = (
+    "<html><head><title>News</title></head><body>"
+    '<table class="w-full"><tr><td class="p-6">Logo</td></tr>'
+    "<!-- slot:body -->"
+    '<tr><td class="text-xs">Footer <!--slot:note--></td></tr></table></body></html>'
+)
+
+
+class TestConvertedLayout:
+    """Tests for ConvertedLayout."""
+
+    def test_split_at_slots_and_head(self) -> None:
+        """Test the converted layout is split into static chunks."""
+        layout = ConvertedLayout(
+            "<html><head></head><body><!-- slot:a -->x<!-- slot:b --><!-- slot:a --></body></html>",
+            TailwindEmailConverter().theme,
+        )
+        assert layout.slots == ["a", "b"]
+        assert layout.chunks == ["<html><head>", "</head><body>", "x", "", "</body></html>"]
+        assert layout.join("<style></style>", {"a": "A"}) == (
+            "<html><head><style></style></head><body>AxA</body></html>"
+        )
+
+    def test_head_created_when_missing(self) -> None:
+        """Test head markup gets its own head element if the layout has none."""
+        layout = ConvertedLayout(
+            "<html><body><!-- slot:a --></body></html>", TailwindEmailConverter().theme
+        )
+        assert layout.join("", {"a": "A"}) == "<html><body>A</body></html>"
+        assert layout.join("<style></style>", {}) == (
+            "<html><head><style></style></head><body></body></html>"
+        )
+
+
+class TestLayoutRegistry:
+    """Tests for LayoutRegistry."""
+
+    def test_compose(self) -> None:
+        """Test slot contents are converted and stitched into the layout."""
+        layouts = LayoutRegistry()
+        layouts.register("news", LAYOUT)
+        output = layouts.compose(
+            "news", {"body": '<tr><td class="p-4">Hi</td></tr>', "note": "<b class='m-1'>!</b>"}
+        )
+        assert output == (
+            "<html><head><title>News</title></head><body>"
+            '<table style="width: 100%"><tr><td style="padding: 24px">Logo</td></tr>'
+            '<tr><td style="padding: 16px">Hi</td></tr>'
+            '<tr><td style="font-size: 12px; line-height: 16px; mso-line-height-rule: exactly">'
+            'Footer <b style="margin: 4px">!</b></td></tr></table></body></html>'
+        )
+
+    def test_slot_leading_comment_kept(self) -> None:
+        """Test slot contents starting with a comment keep it."""
+        layouts = LayoutRegistry()
+        layouts.register("plain", "<div><!-- slot:body --></div>")
+        assert layouts.compose("plain", {"body": '<!--x--><p class="m-1">a</p>'}) == (
+            '<html><body><div><!--x--><p style="margin: 4px">a</p></div></body></html>'
+        )
+
+    def test_layout_converted_once(self) -> None:
+        """Test composing reuses the converted layout."""
+        layouts = LayoutRegistry()
+        layouts.register("news", LAYOUT)
+        layout = layouts.layout("news")
+        layouts.compose("news", {"body": "<tr><td>a</td></tr>"})
+        assert layouts.layout("news") is layout
+        assert "news" in layouts
+        assert len(layouts) == 1
+
+    def test_missing_and_unknown_slots(self) -> None:
+        """Test missing slots stay empty and unknown ones are rejected."""
+        layouts = LayoutRegistry()
+        layouts.register("news", LAYOUT)
+        assert "slot:" not in layouts.compose("news", {})
+        with pytest.raises(ValueError, match="no slots named sidebar"):
+            layouts.compose("news", {"sidebar": "x"})
+        with pytest.raises(KeyError):
+            layouts.compose("other", {})
+
+    def test_slot_head_styles(self) -> None:
+        """Test head styles of slot contents join the layout's head with prefixed names."""
+        layouts = LayoutRegistry(ConversionOptions(variant_styles=True))
+        layouts.register("news", LAYOUT)
+        output = layouts.compose("news", {"body": '<tr><td class="p-4 md:p-8">Hi</td></tr>'})
+        assert ".body-v0 { padding: 32px !important }\n}</style></head>" in output
+        assert '<td class="body-v0" style="padding: 16px">Hi</td>' in output
+
+    def test_theme_reload_reconverts(self) -> None:
+        """Test layouts are converted again after the converter's theme changes."""
+        converter = TailwindEmailConverter(ConversionOptions(theme={"colors": {"brand": "#111"}}))
+        layouts = LayoutRegistry(converter=converter)
+        layouts.register("plain", '<div class="text-brand"><!-- slot:body --></div>')
+        assert "color: #111" in layouts.compose("plain", {})
+        converter.reload_theme({"colors": {"brand": "#222"}})
+        assert "color: #222" in layouts.compose("plain", {"body": '<p class="bg-brand">x</p>'})
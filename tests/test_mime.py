@@ -0,0 +1,93 @@
+"""Tests for quoted-printable MIME output."""
+
+import quopri
+from email import policy
+from email.message import EmailMessage
+
+from tailwind_email import TailwindEmailConverter
+from tailwind_email.mime import (
+    MAX_LINE_LENGTH,
+    QuotedPrintableEncoder,
+    html_part,
+    iter_quoted_printable,
+)
+
+
+def _encode(*chunks: str) -> bytes:
+    return b"".join(iter_quoted_printable(chunks))
+
+
+class TestQuotedPrintableEncoder:
+    """Tests for QuotedPrintableEncoder."""
+
+    def test_escapes(self) -> None:
+        """Test non-ASCII bytes and equals signs are escaped."""
+        assert _encode('<p class="a">Café</p>') == b'<p class=3D"a">Caf=C3=A9</p>'
+
+    def test_line_breaks(self) -> None:
+        """Test LF and CRLF become line breaks and lone CRs are escaped."""
+        assert _encode("a\nb\r\nc\rd") == b"a\r\nb\r\nc=0Dd"
+        assert _encode("a\r", "\nb") == b"a\r\nb"
+
+    def test_trailing_whitespace(self) -> None:
+        """Test spaces and tabs ending a line are escaped."""
+        assert _encode("a \nb\t") == b"a=20\r\nb=09"
+
+    def test_soft_line_breaks(self) -> None:
+        """Test long lines are wrapped without splitting escape sequences."""
+        text = "x" * 74 + "é" + "y" * 200
+        encoded = _encode(text)
+        lines = encoded.split(b"\r\n")
+        assert all(len(line) <= MAX_LINE_LENGTH for line in lines)
+        assert lines[0] == b"x" * 74 + b"="
+        assert lines[1].startswith(b"=C3=A9y")
+        assert quopri.decodestring(encoded.replace(b"\r\n", b"\n")) == text.encode()
+
+    def test_chunking_does_not_matter(self) -> None:
+        """Test the output is the same however the text is split."""
+        text = "Über " * 40 + "\r\n" + "a = b \n" * 3
+        whole = _encode(text)
+        assert _encode(*text) == whole
+        assert _encode(text[:77], text[77:150], text[150:]) == whole
+
+    def test_incremental_use(self) -> None:
+        """Test complete lines are returned as soon as they are known."""
+        encoder = QuotedPrintableEncoder(linesep=b"\n")
+        assert encoder.encode("one\ntw") == b"one\n"
+        assert encoder.encode("o") == b""
+        assert encoder.finish() == b"two"
+
+
+class TestHTMLPart:
+    """Tests for html_part() and TailwindEmailConverter.convert_to_part()."""
+
+    def test_part_headers_and_content(self) -> None:
+        """Test the part declares its encoding and decodes to the HTML."""
+        part = html_part(["<p>Café</p>\n", "<p>=</p>"])
+        assert part.get_content_type() == "text/html"
+        assert part.get_content_charset() == "utf-8"
+        assert part["Content-Transfer-Encoding"] == "quoted-printable"
+        assert part.get_content() == "<p>Café</p>\n<p>=</p>"
+
+    def test_written_as_encoded(self) -> None:
+        """Test the email package writes the payload without encoding it again."""
+        part = html_part(["<p>Café</p>"])
+        assert part.as_bytes(policy=policy.SMTP).endswith(b"\r\n\r\n<p>Caf=C3=A9</p>")
+
+    def test_convert_to_part(self) -> None:
+        """Test the converter output goes straight into the part."""
+        converter = TailwindEmailConverter()
+        html = '<td class="p-4 text-sm">Grüße</td>'
+        part = converter.convert_to_part(html, fragment=True)
+        assert part.get_content() == converter.convert_fragment(html)
+
+    def test_attach_as_alternative(self) -> None:
+        """Test the part joins a plain-text message as its HTML alternative."""
+        message = EmailMessage()
+        message.set_content("Hello")
+        message.make_alternative()
+        message.attach(html_part(["<p>Hello</p>"]))
+        assert [part.get_content_type() for part in message.iter_parts()] == [
+            "text/plain",
+            "text/html",
+        ]
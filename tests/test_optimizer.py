@@ -0,0 +1,310 @@
+"""Tests for output size optimizations."""
+
+from tailwind_email import TailwindEmailConverter, convert
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.optimizer import (
+    collapse_shorthands,
+    compress_box_value,
+    expand_box_value,
+    prune_inherited,
+    split_css_values,
+    stylesheet_properties,
+)
+
+
+class TestBoxValues:
+    """Tests for box shorthand helpers."""
+
+    def test_split_keeps_parentheses_together(self) -> None:
+        """Test splitting keeps function arguments in one token."""
+        assert split_css_values("1px solid rgba(0, 0, 0, 0.5)") == [
+            "1px",
+            "solid",
+            "rgba(0, 0, 0, 0.5)",
+        ]
+
+    def test_expand_box_values(self) -> None:
+        """Test 1-4 value box expansion."""
+        assert expand_box_value("4px") == ["4px"] * 4
+        assert expand_box_value("4px 8px") == ["4px", "8px", "4px", "8px"]
+        assert expand_box_value("1px 2px 3px") == ["1px", "2px", "3px", "2px"]
+        assert expand_box_value("1px 2px 3px 4px") == ["1px", "2px", "3px", "4px"]
+
+    def test_expand_rejects_unsafe_values(self) -> None:
+        """Test values that cannot be expanded safely."""
+        assert expand_box_value("4px !important") is None
+        assert expand_box_value("var(--space)") is None
+        assert expand_box_value("inherit") is None
+        assert expand_box_value("8px / 4px") is None
+
+    def test_compress_box_values(self) -> None:
+        """Test box values compress to the fewest tokens."""
+        assert compress_box_value(["4px", "4px", "4px", "4px"]) == "4px"
+        assert compress_box_value(["4px", "8px", "4px", "8px"]) == "4px 8px"
+        assert compress_box_value(["1px", "2px", "3px", "2px"]) == "1px 2px 3px"
+        assert compress_box_value(["1px", "2px", "3px", "4px"]) == "1px 2px 3px 4px"
+
+
+class TestCollapseShorthands:
+    """Tests for collapse_shorthands()."""
+
+    def test_padding_longhands(self) -> None:
+        """Test four padding longhands fold into padding."""
+        result = collapse_shorthands(
+            {
+                "padding-left": "16px",
+                "padding-right": "16px",
+                "padding-top": "8px",
+                "padding-bottom": "8px",
+            }
+        )
+        assert result == {"padding": "8px 16px"}
+
+    def test_incomplete_set_is_kept(self) -> None:
+        """Test incomplete longhand sets are left untouched."""
+        props = {"margin-left": "auto", "margin-right": "auto"}
+        assert collapse_shorthands(props) == props
+
+    def test_shorthand_then_longhand_override(self) -> None:
+        """Test a longhand after the shorthand keeps overriding one side."""
+        result = collapse_shorthands({"padding": "16px", "padding-left": "32px"})
+        assert result == {"padding": "16px 16px 16px 32px"}
+
+    def test_longhand_then_shorthand_override(self) -> None:
+        """Test a shorthand after a longhand wins for every side."""
+        result = collapse_shorthands({"padding-left": "32px", "padding": "16px"})
+        assert result == {"padding": "16px"}
+
+    def test_border_radius_corners(self) -> None:
+        """Test four corner radii fold into border-radius."""
+        result = collapse_shorthands(
+            {
+                "border-top-left-radius": "8px",
+                "border-top-right-radius": "8px",
+                "border-bottom-left-radius": "8px",
+                "border-bottom-right-radius": "8px",
+            }
+        )
+        assert result == {"border-radius": "8px"}
+
+    def test_full_border(self) -> None:
+        """Test uniform width, style and color fold into border."""
+        result = collapse_shorthands(
+            {"border-width": "1px", "border-style": "solid", "border-color": "#e5e7eb"}
+        )
+        assert result == {"border": "1px solid #e5e7eb"}
+
+    def test_border_without_color_is_kept(self) -> None:
+        """Test border is not folded when the color would be reset."""
+        props = {"border-width": "1px", "border-style": "solid"}
+        assert collapse_shorthands(props) == props
+
+    def test_position_of_other_properties(self) -> None:
+        """Test the shorthand takes the place of the first longhand."""
+        result = collapse_shorthands(
+            {
+                "color": "red",
+                "margin-top": "0px",
+                "width": "100%",
+                "margin-right": "0px",
+                "margin-bottom": "0px",
+                "margin-left": "0px",
+            }
+        )
+        assert list(result.items()) == [
+            ("color", "red"),
+            ("margin", "0px"),
+            ("width", "100%"),
+        ]
+
+    def test_important_blocks_compaction(self) -> None:
+        """Test !important declarations are never folded."""
+        props = {
+            "padding-top": "4px !important",
+            "padding-right": "4px",
+            "padding-bottom": "4px",
+            "padding-left": "4px",
+        }
+        assert collapse_shorthands(props) == props
+
+    def test_logical_properties_block_compaction(self) -> None:
+        """Test logical properties keep their physical counterparts."""
+        props = {
+            "margin-inline-start": "2px",
+            "margin-top": "0px",
+            "margin-right": "0px",
+            "margin-bottom": "0px",
+            "margin-left": "0px",
+        }
+        assert collapse_shorthands(props) == props
+
+
+class TestConverterCompaction:
+    """Tests for the collapse_shorthands conversion option."""
+
+    def test_disabled_by_default(self) -> None:
+        """Test longhands are emitted without the option."""
+        output = convert('<div class="px-4 py-2">Content</div>')
+        assert "padding-left: 16px" in output
+
+    def test_spacing_classes(self) -> None:
+        """Test px/py classes produce a single padding declaration."""
+        output = convert('<div class="px-4 py-2">Content</div>', {"collapse_shorthands": True})
+        assert 'style="padding: 8px 16px"' in output
+
+    def test_border_classes(self) -> None:
+        """Test border + color + corner radii classes compact."""
+        html = '<div class="border border-gray-200 rounded-t-lg rounded-b-lg">Content</div>'
+        output = convert(html, {"collapse_shorthands": True})
+        assert 'style="border: 1px solid #e5e7eb; border-radius: 8px"' in output
+
+    def test_existing_style_participates(self) -> None:
+        """Test existing inline longhands are folded with converted ones."""
+        html = '<div class="px-4" style="padding-top: 2px; padding-bottom: 2px">Content</div>'
+        output = convert(html, {"collapse_shorthands": True})
+        assert 'style="padding: 2px 16px"' in output
+
+
+class TestPruneInherited:
+    """Tests for prune_inherited()."""
+
+    def test_drops_value_equal_to_parent(self) -> None:
+        """Test a repeated inherited value is dropped."""
+        kept, context = prune_inherited(
+            "p",
+            {},
+            {"color": "#374151", "margin-top": "8px"},
+            {"color": "#374151"},
+        )
+        assert kept == {"margin-top": "8px"}
+        assert context == {"color": "#374151"}
+
+    def test_keeps_different_value(self) -> None:
+        """Test a differing value is kept and becomes the children's context."""
+        kept, context = prune_inherited("p", {}, {"color": "#111827"}, {"color": "#374151"})
+        assert kept == {"color": "#111827"}
+        assert context == {"color": "#111827"}
+
+    def test_non_inherited_properties_kept(self) -> None:
+        """Test non-inherited properties are never pruned."""
+        kept, _ = prune_inherited("div", {}, {"padding": "4px"}, {"padding": "4px"})
+        assert kept == {"padding": "4px"}
+
+    def test_user_agent_styled_elements(self) -> None:
+        """Test properties styled by the user agent are kept on links and headings."""
+        kept, context = prune_inherited("a", {}, {"color": "#374151"}, {"color": "#374151"})
+        assert kept == {"color": "#374151"}
+
+        kept, context = prune_inherited("h1", {}, {}, {"font-size": "16px", "color": "red"})
+        assert context == {"color": "red"}
+
+    def test_table_cells_are_barriers(self) -> None:
+        """Test table elements never inherit from outside the table."""
+        kept, context = prune_inherited(
+            "td", {}, {"font-family": "Arial"}, {"font-family": "Arial"}
+        )
+        assert kept == {"font-family": "Arial"}
+        assert context == {"font-family": "Arial"}
+
+    def test_relative_values_kept(self) -> None:
+        """Test values relative to the element itself are kept."""
+        kept, context = prune_inherited("span", {}, {"font-size": "1.2em"}, {"font-size": "1.2em"})
+        assert kept == {"font-size": "1.2em"}
+        assert "font-size" not in context
+
+    def test_presentational_attribute_resets(self) -> None:
+        """Test align attributes reset the known text-align."""
+        kept, _ = prune_inherited(
+            "div", {"align": "center"}, {"text-align": "left"}, {"text-align": "left"}
+        )
+        assert kept == {"text-align": "left"}
+
+    def test_contested_properties_kept(self) -> None:
+        """Test properties stylesheet rules may set are kept and not passed on."""
+        kept, context = prune_inherited(
+            "p", {}, {"color": "red", "font-size": "14px"}, {"color": "red"}, frozenset(["color"])
+        )
+        assert kept == {"color": "red", "font-size": "14px"}
+        assert context == {"font-size": "14px"}
+
+    def test_own_shorthand_resets_longhands(self) -> None:
+        """Test an element's font shorthand is not mistaken for the inherited longhands."""
+        kept, context = prune_inherited(
+            "p",
+            {},
+            {"font": "12px Arial", "color": "red"},
+            {"font-size": "14px", "line-height": "20px", "color": "blue"},
+        )
+        assert kept == {"font": "12px Arial", "color": "red"}
+        assert context == {"color": "red"}
+
+    def test_stylesheet_properties(self) -> None:
+        """Test inherited properties declared by a stylesheet are found."""
+        css = ".a { color: red; padding: 4px } /* b { text-align: left } */ .c { font: 12px Arial }"
+        assert stylesheet_properties(css) == {
+            "color",
+            "font-family",
+            "font-size",
+            "font-style",
+            "font-variant",
+            "font-weight",
+            "line-height",
+        }
+
+
+class TestConverterPruning:
+    """Tests for the prune_inherited conversion option."""
+
+    def test_nested_repetition_removed(self) -> None:
+        """Test nested elements drop styles repeated from their parent."""
+        html = '<div class="font-sans text-gray-700"><p class="font-sans text-gray-700 mb-4">Hi</p></div>'
+        output = convert(html, {"prune_inherited": True})
+        assert '<p style="margin-bottom: 16px">' in output
+
+    def test_empty_style_removed(self) -> None:
+        """Test the style attribute is removed when everything is pruned."""
+        html = '<div class="text-gray-700"><span class="text-gray-700">Hi</span></div>'
+        output = convert(html, {"prune_inherited": True})
+        assert "<span>Hi</span>" in output
+
+    def test_links_keep_color(self) -> None:
+        """Test links keep their color so the user agent blue is overridden."""
+        html = '<div class="text-gray-700"><a href="#" class="text-gray-700">Hi</a></div>'
+        output = convert(html, {"prune_inherited": True})
+        assert 'style="color: #374151">Hi</a>' in output
+
+    def test_head_rules_keep_overridden_values(self) -> None:
+        """Test values a remaining head rule would override are not pruned."""
+        html = (
+            "<html><head><style>.note { color: red }</style></head><body>"
+            '<div class="text-black"><p class="note text-black">Hi</p></div></body></html>'
+        )
+        for options in ({}, {"inline_style_blocks": True}):
+            output = convert(
+                html.replace(".note", ".note:hover, .note"), {"prune_inherited": True, **options}
+            )
+            assert '<p class="note" style="color: #000000">Hi</p>' in output
+
+    def test_external_stylesheet_disables_pruning(self) -> None:
+        """Test nothing is pruned when a linked stylesheet could set any property."""
+        html = (
+            '<html><head><link rel="stylesheet" href="a.css"></head><body>'
+            '<div class="text-black"><p class="text-black">Hi</p></div></body></html>'
+        )
+        output = convert(html, {"prune_inherited": True})
+        assert '<p style="color: #000000">Hi</p>' in output
+
+    def test_font_shorthand_in_between(self) -> None:
+        """Test a font shorthand between equal values keeps the inner element's values."""
+        html = '<div class="text-sm"><p style="font: 12px Arial"><span class="text-sm">x</span></p></div>'
+        output = convert(html, {"prune_inherited": True})
+        assert '<span style="font-size: 14px; line-height: 20px">x</span>' in output
+
+    def test_bytes_saved_reported(self) -> None:
+        """Test savings equal the size difference of the output."""
+        html = '<div class="font-sans leading-6"><p class="font-sans leading-6">a</p><p class="font-sans">b</p></div>'
+        plain = TailwindEmailConverter().convert(html)
+        result = TailwindEmailConverter(
+            ConversionOptions(prune_inherited=True)
+        ).convert_with_report(html)
+        assert result.bytes_saved["prune_inherited"] == len(plain) - len(result.html)
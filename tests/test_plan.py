@@ -0,0 +1,114 @@
+"""Tests for precompiled conversion plans."""
+
+from tailwind_email import TailwindEmailConverter
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.plan import element_keys, is_spliceable
+
+LAYOUT = (
+    '<table class="w-full"><tr><td class="p-4 text-sm card" style="color: red">'
+    "Hello {name}</td></tr></table>"
+    '<img class="block" src="{image}"/><p class="mt-2">{body}</p>'
+)
+
+
+def _render(**values: str) -> str:
+    defaults = {"name": "Ada", "image": "a.png", "body": "Welcome"}
+    return LAYOUT.format(**{**defaults, **values})
+
+
+class TestElementKeys:
+    """Tests for element_keys()."""
+
+    def test_classed_tags_in_order(self) -> None:
+        """Test only elements with a class attribute are listed."""
+        assert element_keys(_render()) == [
+            ("table", "w-full", None),
+            ("td", "p-4 text-sm card", "color: red"),
+            ("img", "block", None),
+            ("p", "mt-2", None),
+        ]
+
+    def test_comments_and_raw_text_skipped(self) -> None:
+        """Test tags inside comments and <style> blocks are ignored."""
+        html = '<!-- <p class="x"> --><style>p { } <p class="y"></style><P CLASS="a  b">'
+        assert element_keys(html) == [("p", "a b", None)]
+
+
+class TestConversionPlan:
+    """Tests for TailwindEmailConverter.compile() and ConversionPlan."""
+
+    def test_apply_splices_styles(self) -> None:
+        """Test rendered HTML gets the compiled styles without a full conversion."""
+        converter = TailwindEmailConverter()
+        plan = converter.compile(_render())
+        output = plan.apply(_render(name="Grace", image="g.png", body="R&amp;D"))
+        assert output == (
+            '<table style="width: 100%"><tr><td class="card" style="color: red; padding: 16px; '
+            'font-size: 14px; line-height: 20px; mso-line-height-rule: exactly">Hello Grace'
+            '</td></tr></table><img style="display: block" src="g.png"/>'
+            '<p style="margin-top: 8px">R&amp;D</p>'
+        )
+        assert plan.fallbacks == 0
+
+    def test_styles_match_full_conversion(self) -> None:
+        """Test spliced attributes are the ones a full conversion produces."""
+        options = ConversionOptions(
+            preserve_classes=True, collapse_shorthands=True, target_clients=["outlook"]
+        )
+        converter = TailwindEmailConverter(options)
+        plan = converter.compile(_render())
+        html = _render(name="Grace")
+        applied = converter.parser.parse_html(plan.apply(html))
+        converted = converter.parser.parse_html(converter.convert(html))
+        for ours, theirs in zip(applied.find_all(True), converted.find_all(True)):
+            assert ours.attrs == theirs.attrs
+
+    def test_structure_change_falls_back(self) -> None:
+        """Test HTML with other classed elements is converted on its own."""
+        converter = TailwindEmailConverter()
+        plan = converter.compile(_render())
+        changed = _render().replace("mt-2", "mt-4")
+        assert not plan.matches(changed)
+        assert plan.apply(changed) == converter.compile(changed).apply(changed)
+        assert '<p style="margin-top: 16px">Welcome</p>' in plan.apply(changed)
+        extra = _render() + '<p class="p-1">extra</p>'
+        assert plan.apply(extra).endswith('<p style="padding: 4px">extra</p>')
+        assert plan.fallbacks == 3
+
+    def test_fallback_matches_fast_path(self) -> None:
+        """Test results have the same markup whether the plan matched or not."""
+        converter = TailwindEmailConverter()
+        html = _render(name="&copy; Ada", body="<br>R&amp;D")
+        matching = converter.compile(_render())
+        other = converter.compile('<div class="p-1">other</div>')
+        fast = matching.apply(html)
+        assert matching.fallbacks == 0
+        assert other.apply(html) == fast
+        assert other.fallbacks == 1
+        assert fast.startswith('<table style="width: 100%">')
+        assert "Hello &copy; Ada" in fast
+
+    def test_document_options_not_spliceable(self) -> None:
+        """Test options that look beyond one element always convert in full."""
+        assert is_spliceable(ConversionOptions(collapse_shorthands=True))
+        assert not is_spliceable(ConversionOptions(prune_inherited=True))
+        assert not is_spliceable(ConversionOptions(compatibility="modern"))
+        converter = TailwindEmailConverter(ConversionOptions(minify=True))
+        plan = converter.compile(_render())
+        assert not plan.spliceable
+        assert plan.apply(_render()) == converter.convert(_render())
+
+    def test_parser_repairs_not_spliceable(self) -> None:
+        """Test HTML the parser restructures is not replayed."""
+        converter = TailwindEmailConverter()
+        assert not converter.compile('<body class="p-1"><body class="p-2">x').spliceable
+        assert not converter.compile('<textarea><b class="p-1"></b></textarea>').spliceable
+
+    def test_theme_reload_invalidates(self) -> None:
+        """Test a plan falls back once the converter's theme changes."""
+        converter = TailwindEmailConverter(ConversionOptions(theme={"colors": {"brand": "#111"}}))
+        html = '<p class="text-brand">x</p>'
+        plan = converter.compile(html)
+        converter.reload_theme({"colors": {"brand": "#222"}})
+        assert "color: #222" in plan.apply(html)
+        assert plan.fallbacks == 1
@@ -0,0 +1,185 @@
+"""Tests for element handler plugins."""
+
+from typing import Optional
+
+from bs4 import Tag
+
+from tailwind_email import TailwindEmailConverter
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.plugins import (
+    PluginRegistry,
+    VisitContext,
+    image_dimensions,
+    link_rewriter,
+    presentation_tables,
+    strip_scripts,
+)
+from tailwind_email.registry import ThemeRegistry
+
+
+def _converter(
+    *handlers: tuple[object, Optional[list[str]]], **options: object
+) -> TailwindEmailConverter:
+    converter = TailwindEmailConverter(ConversionOptions(**options))  # type: ignore[arg-type]
+    for handler, tags in handlers:
+        converter.plugins.register(handler, tags)  # type: ignore[arg-type]
+    return converter
+
+
+class TestPluginRegistry:
+    """Tests for PluginRegistry dispatch."""
+
+    def test_dispatch_by_tag(self) -> None:
+        """Test handlers are selected by tag and run in registration order."""
+        registry = PluginRegistry()
+
+        def first(element: Tag, context: VisitContext) -> None:
+            pass
+
+        def second(element: Tag, context: VisitContext) -> None:
+            pass
+
+        registry.register(first, tags=["A", "img"])
+        registry.register(second)
+        assert registry.handlers("a") == (first, second)
+        assert registry.handlers("p") == (second,)
+        assert len(registry) == 2
+
+    def test_register_after_use(self) -> None:
+        """Test handlers registered later are picked up."""
+        registry = PluginRegistry()
+        assert registry.handlers("a") == ()
+        registry.register(presentation_tables, tags=["a"])
+        assert registry.handlers("a") == (presentation_tables,)
+
+    def test_empty_registry_changes_nothing(self) -> None:
+        """Test a converter without handlers keeps its output."""
+        html = '<table class="w-full"><tr><td class="p-4">x</td></tr></table>'
+        assert TailwindEmailConverter().convert(html) == _converter().convert(html)
+
+
+class TestTraversal:
+    """Tests for handlers in the conversion walk."""
+
+    def test_handlers_see_converted_styles(self) -> None:
+        """Test each element is visited once, in order, after conversion."""
+        seen: list[tuple[str, dict[str, str]]] = []
+
+        def record(element: Tag, context: VisitContext) -> None:
+            seen.append((element.name, context.style(element)))
+
+        html = '<div class="p-4"><p class="text-center">a</p><p class="text-center">a</p></div>'
+        _converter((record, None)).convert(html)
+        assert [name for name, _ in seen] == ["html", "body", "div", "p", "p"]
+        assert seen[2][1] == {"padding": "16px"}
+        assert seen[3][1] == seen[4][1] == {"text-align": "center"}
+
+    def test_set_style(self) -> None:
+        """Test handlers can change inline styles."""
+
+        def no_padding(element: Tag, context: VisitContext) -> None:
+            style = context.style(element)
+            style.pop("padding", None)
+            context.set_style(element, style)
+
+        converter = _converter((no_padding, ["td"]))
+        output = converter.convert('<td class="p-4 text-center">x</td><td class="p-4">y</td>')
+        assert '<td style="text-align: center">x</td><td>y</td>' in output
+
+    def test_removed_element_not_descended(self) -> None:
+        """Test descendants of removed elements are not visited."""
+        seen: list[str] = []
+
+        def record(element: Tag, context: VisitContext) -> None:
+            seen.append(element.name)
+
+        converter = _converter((strip_scripts, ["section"]), (record, None))
+        output = converter.convert('<section class="p-4"><p class="p-2">x</p></section><p>y</p>')
+        assert "section" not in output and "x" not in output
+        assert seen == ["html", "body", "p"]
+
+    def test_hybrid_mode(self) -> None:
+        """Test style changes are seen by the shared stylesheet."""
+
+        def red(element: Tag, context: VisitContext) -> None:
+            context.set_style(element, {**context.style(element), "color": "red"})
+
+        converter = _converter((red, ["p"]), compatibility="modern")
+        output = converter.convert('<p class="p-4">a</p><p class="p-4">b</p>')
+        assert "padding: 16px; color: red" in output
+
+    def test_template_values(self) -> None:
+        """Test handlers can tell template regions apart."""
+        flags: list[bool] = []
+
+        def check(element: Tag, context: VisitContext) -> None:
+            flags.append(context.is_template(str(element["href"])))
+
+        converter = _converter((check, ["a"]), preserve_templates=True)
+        converter.convert('<a href="{{ url }}">a</a><a href="https://x.test">b</a>')
+        assert flags == [True, False]
+
+    def test_compile_falls_back(self) -> None:
+        """Test plans are not recorded when handlers are registered."""
+        converter = _converter((presentation_tables, ["table"]))
+        plan = converter.compile('<table class="w-full"><tr><td>x</td></tr></table>')
+        assert not plan.spliceable
+        assert 'role="presentation"' in plan.apply(
+            "<table class='w-full'><tr><td>y</td></tr></table>"
+        )
+
+    def test_theme_registry(self) -> None:
+        """Test tenant converters share the registry's handlers."""
+        plugins = PluginRegistry()
+        plugins.register(presentation_tables, tags=["table"])
+        registry = ThemeRegistry(plugins=plugins)
+        registry.register("acme", {"colors": {"brand": "#0b5fff"}})
+        output = registry.converter("acme").convert(
+            '<table class="bg-brand"><tr><td>x</td></tr></table>'
+        )
+        assert 'role="presentation"' in output
+
+
+class TestBuiltinHandlers:
+    """Tests for the built-in handlers."""
+
+    def test_presentation_tables(self) -> None:
+        """Test tables get role="presentation" unless they have a role."""
+        converter = _converter((presentation_tables, ["table"]))
+        output = converter.convert('<table><tr><td>a</td></tr></table><table role="grid"></table>')
+        assert '<table role="presentation">' in output
+        assert '<table role="grid">' in output
+
+    def test_strip_scripts(self) -> None:
+        """Test scripts are removed from head and body."""
+        converter = _converter((strip_scripts, ["script"]))
+        output = converter.convert(
+            "<html><head><script>a()</script></head><body><p>x</p><script>b()</script></body></html>"
+        )
+        assert output == "<html><head></head><body><p>x</p></body></html>"
+
+    def test_image_dimensions(self) -> None:
+        """Test pixel and percentage sizes become attributes."""
+        converter = _converter((image_dimensions, ["img"]))
+        output = converter.convert(
+            '<img class="w-32 h-8" src="a.png"><img class="w-full" src="b.png">'
+            '<img class="w-32" width="64" src="c.png"><img class="w-[12.5rem]" src="d.png">'
+        )
+        assert 'height="32" src="a.png" style="width: 128px; height: 32px" width="128"' in output
+        assert 'src="b.png" style="width: 100%" width="100%"' in output
+        assert 'src="c.png" style="width: 128px" width="64"' in output
+        assert 'src="d.png" style="width: 200px" width="200"' in output
+
+    def test_link_rewriter(self) -> None:
+        """Test hrefs are rewritten unless the callback returns None."""
+
+        def track(href: str) -> Optional[str]:
+            return None if href.startswith("mailto:") else f"https://t.test/?u={href}"
+
+        converter = _converter((link_rewriter(track), ["a"]))
+        output = converter.convert(
+            '<a class="p-2" href="https://x.test">a</a><a href="mailto:a@x.test">b</a><a>c</a>'
+        )
+        assert 'href="https://t.test/?u=https://x.test"' in output
+        assert 'href="mailto:a@x.test"' in output
+        assert "<a>c</a>" in output
@@ -0,0 +1,193 @@
+"""Tests for the slow-conversion flight recorder."""
+
+import io
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from tailwind_email import TailwindEmailConverter
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.recorder import SlowConversionRecorder, load_case, main, replay_case
+from tailwind_email.registry import ThemeRegistry
+from tailwind_email.theme import compile_theme
+
+
+class TestSlowConversionRecorder:
+    """Tests for SlowConversionRecorder."""
+
+    def test_records_conversion_over_threshold(self, tmp_path: Path) -> None:
+        """Test a conversion exceeding the threshold is spooled."""
+        recorder = SlowConversionRecorder(tmp_path, threshold_ms=0)
+        converter = TailwindEmailConverter(recorder=recorder)
+        html = '<div class="p-4">Content</div>'
+        converter.convert(html)
+
+        cases = recorder.list_cases()
+        assert len(cases) == 1
+        case = load_case(cases[0])
+        assert case["html"] == html
+        assert case["options"]["base_font_size"] == 16
+        assert set(case["timings"]) == {"parse", "process", "serialize"}
+
+    def test_skips_fast_conversion(self, tmp_path: Path) -> None:
+        """Test conversions under the threshold are not recorded."""
+        recorder = SlowConversionRecorder(tmp_path, threshold_ms=60_000)
+        converter = TailwindEmailConverter(recorder=recorder)
+        converter.convert('<div class="p-4">Content</div>')
+        assert recorder.list_cases() == []
+
+    def test_spool_is_bounded(self, tmp_path: Path) -> None:
+        """Test the oldest cases are evicted beyond max_cases."""
+        recorder = SlowConversionRecorder(tmp_path, threshold_ms=0, max_cases=3)
+        converter = TailwindEmailConverter(recorder=recorder)
+        for i in range(6):
+            converter.convert(f'<div class="p-4">Case {i}</div>')
+
+        cases = recorder.list_cases()
+        assert len(cases) == 3
+        assert [load_case(p)["html"] for p in cases] == [
+            f'<div class="p-4">Case {i}</div>' for i in (3, 4, 5)
+        ]
+
+    def test_unwritable_spool_does_not_raise(self, tmp_path: Path) -> None:
+        """Test recording failures never break conversion."""
+        blocker = tmp_path / "file"
+        blocker.write_text("not a directory")
+        recorder = SlowConversionRecorder(blocker / "spool", threshold_ms=0)
+        converter = TailwindEmailConverter(recorder=recorder)
+        output = converter.convert('<div class="p-4">Content</div>')
+        assert "padding: 16px" in output
+
+    def test_options_are_recorded(self, tmp_path: Path) -> None:
+        """Test custom options round-trip through the spool."""
+        recorder = SlowConversionRecorder(tmp_path, threshold_ms=0)
+        options = ConversionOptions(base_font_size=20, include_mso_properties=False)
+        TailwindEmailConverter(options, recorder=recorder).convert("<p>x</p>")
+
+        case = load_case(recorder.list_cases()[0])
+        restored = ConversionOptions.from_dict(case["options"])
+        assert restored.base_font_size == 20
+        assert restored.include_mso_properties is False
+
+    def test_entry_point_is_recorded(self, tmp_path: Path) -> None:
+        """Test the method, fragment flag, encoding and theme of each conversion are spooled."""
+        recorder = SlowConversionRecorder(tmp_path, threshold_ms=0)
+        converter = TailwindEmailConverter(recorder=recorder)
+        converter.convert("<p>a</p>")
+        converter.convert_fragment("<p>b</p>")
+        converter.convert_bytes("<p>\xe9</p>".encode("latin-1"), encoding="latin-1")
+
+        cases = [load_case(path) for path in recorder.list_cases()]
+        assert [(c["entry"], c["fragment"], c["encoding"]) for c in cases] == [
+            ("convert_with_report", False, None),
+            ("convert_with_report", True, None),
+            ("iter_convert", False, "latin-1"),
+        ]
+        assert cases[2]["html"] == "<p>\xe9</p>"
+        assert {c["theme_key"] for c in cases} == {converter.theme.key}
+
+    def test_registry_theme_is_recorded(self, tmp_path: Path) -> None:
+        """Test a tenant conversion records the tenant's theme and options to rebuild it."""
+        recorder = SlowConversionRecorder(tmp_path, threshold_ms=0)
+        registry = ThemeRegistry(recorder=recorder)
+        registry.register("acme", {"colors": {"brand": "#0b5fff"}})
+        registry.converter("acme").convert('<p class="text-brand">x</p>')
+
+        case = load_case(recorder.list_cases()[0])
+        assert case["theme_key"] == registry.tables("acme").key
+        assert compile_theme(case["options"]["theme"]).key == case["theme_key"]
+
+
+class TestReplay:
+    """Tests for replaying spooled cases."""
+
+    def _write_case(self, tmp_path: Path) -> Path:
+        path = tmp_path / "case-1.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "html": '<div class="p-4 bg-blue-500">Content</div>',
+                    "options": {"base_font_size": 16},
+                    "timings": {"parse": 1.0, "process": 2.0, "serialize": 0.5},
+                    "total_ms": 3.5,
+                }
+            )
+        )
+        return path
+
+    def test_replay_prints_profile(self, tmp_path: Path) -> None:
+        """Test replay prints the recorded timings and hottest functions."""
+        path = self._write_case(tmp_path)
+        stream = io.StringIO()
+        stats = replay_case(path, limit=5, stream=stream)
+
+        output = stream.getvalue()
+        assert "Recorded total: 3.5ms" in output
+        assert "function calls" in output
+        assert stats.total_calls > 0  # type: ignore[attr-defined]
+
+    def test_main_list(self, tmp_path: Path, capsys: object) -> None:
+        """Test the list command prints spooled cases."""
+        recorder = SlowConversionRecorder(tmp_path, threshold_ms=0)
+        TailwindEmailConverter(recorder=recorder).convert("<p>x</p>")
+
+        assert main(["list", str(tmp_path)]) == 0
+        captured = capsys.readouterr()  # type: ignore[attr-defined]
+        assert recorder.list_cases()[0].name in captured.out
+
+    def test_replay_uses_recorded_entry_point(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a case recorded from convert_bytes() is replayed through the same path."""
+        recorder = SlowConversionRecorder(tmp_path, threshold_ms=0)
+        TailwindEmailConverter(recorder=recorder).convert_bytes(
+            b'<td class="p-4">x</td>', encoding="utf-8"
+        )
+        calls: list[tuple[Any, ...]] = []
+        iter_convert = TailwindEmailConverter.iter_convert
+
+        def spy(self: TailwindEmailConverter, *args: Any) -> Any:
+            calls.append(args)
+            return iter_convert(self, *args)
+
+        monkeypatch.setattr(TailwindEmailConverter, "iter_convert", spy)
+        stream = io.StringIO()
+        replay_case(recorder.list_cases()[0], stream=stream)
+
+        assert calls == [(b'<td class="p-4">x</td>', False, "utf-8")]
+        assert "Entry: iter_convert, fragment=False, input=bytes (utf-8)" in stream.getvalue()
+        assert "Warning" not in stream.getvalue()
+
+    def test_replay_fragment(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a fragment case is replayed as a fragment."""
+        recorder = SlowConversionRecorder(tmp_path, threshold_ms=0)
+        TailwindEmailConverter(recorder=recorder).convert_fragment("<tr><td>x</td></tr>")
+        calls: list[tuple[Any, ...]] = []
+        convert_with_report = TailwindEmailConverter.convert_with_report
+
+        def spy(self: TailwindEmailConverter, *args: Any) -> Any:
+            calls.append(args)
+            return convert_with_report(self, *args)
+
+        monkeypatch.setattr(TailwindEmailConverter, "convert_with_report", spy)
+        replay_case(recorder.list_cases()[0], stream=io.StringIO())
+        assert calls == [("<tr><td>x</td></tr>", True, None)]
+
+    def test_replay_warns_on_other_theme(self, tmp_path: Path) -> None:
+        """Test replay warns when the options do not describe the recorded theme."""
+        recorder = SlowConversionRecorder(tmp_path, threshold_ms=0)
+        tables = compile_theme({"colors": {"brand": "#0b5fff"}})
+        TailwindEmailConverter(recorder=recorder, theme=tables).convert("<p>x</p>")
+
+        stream = io.StringIO()
+        replay_case(recorder.list_cases()[0], stream=stream)
+        assert f"recorded theme {tables.key[:12]} differs" in stream.getvalue()
+
+    def test_unknown_entry_point(self, tmp_path: Path) -> None:
+        """Test a case naming an unknown method is rejected."""
+        path = tmp_path / "case-1.json"
+        path.write_text(json.dumps({"html": "<p>x</p>", "entry": "compile"}))
+        with pytest.raises(ValueError, match="entry point"):
+            replay_case(path, stream=io.StringIO())
@@ -0,0 +1,149 @@
+"""Tests for the per-tenant theme registry."""
+
+import gc
+import weakref
+
+import pytest
+
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.registry import ThemeRegistry
+from tailwind_email.theme import DEFAULT_THEME, compile_theme
+
+
+def _brand(color: str) -> dict[str, dict[str, str]]:
+    return {"colors": {"brand": color}}
+
+
+class TestThemeRegistry:
+    """Tests for ThemeRegistry."""
+
+    def test_converter_uses_tenant_theme(self) -> None:
+        """Test each tenant converts with its own theme."""
+        registry = ThemeRegistry()
+        registry.register("acme", _brand("#0b5fff"))
+        registry.register("globex", '{"colors": {"brand": "#ff5f0b"}}')
+        html = '<p class="text-brand">x</p>'
+        assert "color: #0b5fff" in registry.convert("acme", html)
+        assert "color: #ff5f0b" in registry.convert("globex", html)
+        assert len(registry) == 2
+        assert "acme" in registry
+
+    def test_compiled_lazily_and_reused(self) -> None:
+        """Test a tenant is compiled on first use and its converter reused."""
+        registry = ThemeRegistry()
+        registry.register("acme", _brand("#0b5fff"))
+        assert not registry.is_compiled("acme")
+        converter = registry.converter("acme")
+        assert registry.is_compiled("acme")
+        assert registry.converter("acme") is converter
+
+    def test_tenant_options(self) -> None:
+        """Test tenant converters copy the shared options with their theme."""
+        options = ConversionOptions(minify=True)
+        registry = ThemeRegistry(options)
+        registry.register("acme", _brand("#0b5fff"))
+        converter = registry.converter("acme")
+        assert converter.options.minify
+        assert converter.options.theme == _brand("#0b5fff")
+        assert options.theme is None
+
+    def test_tables_not_globally_cached(self) -> None:
+        """Test tenant tables are owned by the registry, not the process cache."""
+        registry = ThemeRegistry()
+        registry.register("acme", _brand("#010203"))
+        tables = registry.tables("acme")
+        assert tables == compile_theme(_brand("#010203"))
+        assert tables is not compile_theme(_brand("#010203"))
+
+    def test_lru_eviction_under_memory_cap(self) -> None:
+        """Test least-recently-used tenants are evicted past the cap."""
+        registry = ThemeRegistry()
+        for tenant in ("a", "b", "c"):
+            registry.register(tenant, _brand("#0b5fff"))
+        size = registry.tables("a").nbytes
+        registry.max_bytes = size * 2
+
+        registry.converter("b")
+        registry.converter("a")
+        registry.converter("c")
+        assert not registry.is_compiled("b")
+        assert registry.is_compiled("a")
+        assert registry.is_compiled("c")
+        assert registry.compiled_bytes == size * 2
+
+    def test_class_cache_counted(self) -> None:
+        """Test class results cached by tenant converters count toward the cap."""
+        registry = ThemeRegistry()
+        registry.register("a", _brand("#0b5fff"))
+        registry.register("b", _brand("#0b5fff"))
+        converter = registry.converter("a")
+        tables_size = converter.theme.nbytes
+        converter.convert('<p class="text-brand p-4 m-2 font-bold">x</p>')
+        assert converter.transformer.cache_nbytes > 0
+        assert registry.compiled_bytes == tables_size + converter.transformer.cache_nbytes
+
+        registry.max_bytes = registry.compiled_bytes
+        registry.converter("b")
+        assert not registry.is_compiled("a")
+
+    def test_evicted_tables_released(self) -> None:
+        """Test evicted tenants' tables are not kept alive by the @apply cache."""
+        registry = ThemeRegistry(
+            ConversionOptions(component_css=".btn { @apply p-4 bg-brand; }"), max_bytes=0
+        )
+        registry.register("a", _brand("#0b5fff"))
+        registry.register("b", _brand("#ff5f0b"))
+        assert "background-color: #0b5fff" in registry.convert("a", '<a class="btn">x</a>')
+        tables = weakref.ref(registry.tables("a"))
+        registry.converter("b")
+        assert not registry.is_compiled("a")
+        gc.collect()
+        assert tables() is None
+
+    def test_most_recent_tenant_always_kept(self) -> None:
+        """Test a tenant larger than the cap still gets a converter."""
+        registry = ThemeRegistry(max_bytes=0)
+        registry.register("a", _brand("#0b5fff"))
+        registry.register("b", _brand("#0b5fff"))
+        registry.converter("a")
+        registry.converter("b")
+        assert registry.is_compiled("b")
+        assert not registry.is_compiled("a")
+
+    def test_default_theme_costs_nothing(self) -> None:
+        """Test tenants without overrides share the built-in tables."""
+        registry = ThemeRegistry()
+        registry.register("plain", None)
+        assert registry.tables("plain") == DEFAULT_THEME
+        assert registry.compiled_bytes == 0
+
+    def test_register_reloads_compiled(self) -> None:
+        """Test re-registering a changed theme hot-swaps the compiled converter."""
+        registry = ThemeRegistry()
+        registry.register("acme", _brand("#0b5fff"))
+        converter = registry.converter("acme")
+        registry.register("acme", _brand("#0b5fff"))
+        assert registry.converter("acme") is converter
+        registry.register("acme", {"colors": {"brand": "#000000", "accent": "#111111"}})
+        assert registry.converter("acme") is converter
+        assert registry.compiled_bytes == converter.theme.nbytes
+        assert "color: #000000" in registry.convert("acme", '<p class="text-brand">x</p>')
+
+    def test_invalid_reload_keeps_theme(self) -> None:
+        """Test a malformed replacement leaves the tenant unchanged."""
+        registry = ThemeRegistry()
+        registry.register("acme", _brand("#0b5fff"))
+        registry.converter("acme")
+        with pytest.raises(ValueError):
+            registry.register("acme", {"colors": {"brand": 1}})
+        assert "color: #0b5fff" in registry.convert("acme", '<p class="text-brand">x</p>')
+
+    def test_unknown_tenant(self) -> None:
+        """Test unknown and unregistered tenants raise KeyError."""
+        registry = ThemeRegistry()
+        registry.register("acme", _brand("#0b5fff"))
+        registry.converter("acme")
+        registry.unregister("acme")
+        assert registry.compiled_bytes == 0
+        with pytest.raises(KeyError):
+            registry.converter("acme")
@@ -0,0 +1,168 @@
+"""Tests for the HTML serializer and output minification."""
+
+from bs4 import BeautifulSoup
+
+from tailwind_email import TailwindEmailConverter, convert
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.optimizer import minify_css_value, minify_style, shorten_hex_color
+from tailwind_email.serializer import HTMLSerializer
+
+
+class TestHTMLSerializer:
+    """Tests for HTMLSerializer without minification."""
+
+    def test_matches_beautifulsoup_output(self) -> None:
+        """Test output is identical to str(soup)."""
+        html = """<!DOCTYPE html>
+<html><head><meta charset="ISO-8859-1"><title>a &amp; b</title>
+<style>a > b { color: red }</style></head>
+<body><!--[if mso]><table><![endif]-->
+<p title='He said "hi"' data-x="it's">a &lt; b &amp; c&nbsp;d</p>
+<input disabled><br><img src="x.png" alt="">
+<pre>  keep
+  this</pre></body></html>"""
+        soup = BeautifulSoup(html, "lxml")
+        assert HTMLSerializer().serialize(soup) == str(soup)
+
+    def test_iter_chunks_joins_to_output(self) -> None:
+        """Test streamed chunks concatenate to the full output."""
+        soup = BeautifulSoup("<table><tr><td>Cell</td></tr></table>", "lxml")
+        serializer = HTMLSerializer()
+        assert "".join(serializer.iter_chunks(soup)) == serializer.serialize(soup)
+
+    def test_serialize_fragment(self) -> None:
+        """Test fragments are written without the elements the parser wrapped them in."""
+        soup = BeautifulSoup("<!--c--><title>t</title><tr><td>x</td></tr>", "lxml")
+        serializer = HTMLSerializer()
+        assert serializer.serialize_fragment(soup) == "<!--c--><title>t</title><tr><td>x</td></tr>"
+        assert "".join(serializer.iter_fragment_chunks(soup)) == serializer.serialize_fragment(soup)
+
+    def test_deep_nesting(self) -> None:
+        """Test deeply nested documents serialize without recursion limits."""
+        html = "<div>" * 2000 + "x" + "</div>" * 2000
+        soup = BeautifulSoup(html, "lxml")
+        assert HTMLSerializer().serialize(soup).count("<div>") == 2000
+
+
+class TestMinifyHelpers:
+    """Tests for compact style syntax helpers."""
+
+    def test_shorten_hex_color(self) -> None:
+        """Test six-digit colors shorten when possible."""
+        assert shorten_hex_color("#ffffff") == "#fff"
+        assert shorten_hex_color("#3366CC") == "#36c"
+        assert shorten_hex_color("#3b82f6") == "#3b82f6"
+        assert shorten_hex_color("#aabbccdd") == "#aabbccdd"
+
+    def test_zero_units_dropped(self) -> None:
+        """Test zero lengths lose their unit."""
+        assert minify_css_value("0px 16px") == "0 16px"
+        assert minify_css_value("10px") == "10px"
+        assert minify_css_value("0%") == "0%"
+
+    def test_quoted_strings_untouched(self) -> None:
+        """Test quoted strings and url() arguments keep their content."""
+        assert minify_css_value("Georgia, 'Times New Roman', serif") == (
+            "Georgia,'Times New Roman',serif"
+        )
+        assert minify_css_value("url(a, 0px.png) 0px") == "url(a, 0px.png) 0"
+
+    def test_minify_style(self) -> None:
+        """Test style strings use compact syntax."""
+        assert minify_style("margin: 0px; color: #ffffff;") == "margin:0;color:#fff"
+
+    def test_minify_style_keeps_strings_and_urls(self) -> None:
+        """Test semicolons in data URIs and quoted font names do not split declarations."""
+        assert (
+            minify_style(
+                "background-image: url(data:image/png;base64,AAAA); font-family: 'a;b', serif"
+            )
+            == "background-image:url(data:image/png;base64,AAAA);font-family:'a;b',serif"
+        )
+        assert minify_style("color: red; color: rgb(0, 0, 0)") == "color:red;color:rgb(0,0,0)"
+
+    def test_minify_style_malformed(self) -> None:
+        """Test styles that do not parse cleanly are left unchanged."""
+        for style in ("color: red; font-family: 'open", "background: url(a;b", "color red"):
+            assert minify_style(style) == style
+
+
+class TestMinifiedSerialization:
+    """Tests for HTMLSerializer with minification."""
+
+    def _minify(self, html: str) -> str:
+        return HTMLSerializer(minify=True).serialize(BeautifulSoup(html, "lxml"))
+
+    def test_whitespace_between_blocks_removed(self) -> None:
+        """Test whitespace between block elements is dropped."""
+        output = self._minify("<table>\n  <tr>\n    <td>Cell</td>\n  </tr>\n</table>")
+        assert "<table><tr><td>Cell</td></tr></table>" in output
+
+    def test_inline_whitespace_collapsed(self) -> None:
+        """Test whitespace between inline elements collapses to one space."""
+        output = self._minify("<p><a>One</a>\n    <b>Two</b>   three\n  four</p>")
+        assert "<p><a>One</a> <b>Two</b> three four</p>" in output
+
+    def test_preformatted_content_kept(self) -> None:
+        """Test whitespace inside <pre> and white-space: pre is preserved."""
+        output = self._minify('<pre>  a\n   b</pre><div style="white-space: pre-wrap">  c  </div>')
+        assert "<pre>  a\n   b</pre>" in output
+        assert ">  c  </div>" in output
+
+    def test_nbsp_preserved(self) -> None:
+        """Test non-breaking spaces are not treated as whitespace."""
+        output = self._minify("<td>&nbsp;</td>")
+        assert "\xa0" in output
+
+    def test_empty_attributes_dropped(self) -> None:
+        """Test empty class/style/id attributes are removed but alt is kept."""
+        output = self._minify('<div class="" style="" id="">x</div><img alt="" src="a.png">')
+        assert "<div>x</div>" in output
+        assert 'alt=""' in output
+
+    def test_conditional_comments_kept(self) -> None:
+        """Test MSO conditional comments survive minification."""
+        output = self._minify("<div><!--[if mso]><table><tr><td><![endif]--></div>")
+        assert "<!--[if mso]><table><tr><td><![endif]-->" in output
+
+    def test_bytes_saved_is_exact(self) -> None:
+        """Test reported savings equal the size difference."""
+        html = '<table>\n  <tr>\n    <td style="padding: 0px; color: #ffffff;" class="">x</td>\n  </tr>\n</table>'
+        soup = BeautifulSoup(html, "lxml")
+        plain = HTMLSerializer().serialize(soup)
+        serializer = HTMLSerializer(minify=True)
+        minified = serializer.serialize(soup)
+        assert serializer.bytes_saved == len(plain) - len(minified)
+
+
+class TestConverterMinify:
+    """Tests for the minify conversion option."""
+
+    def test_minify_option(self) -> None:
+        """Test convert() minifies styles when enabled."""
+        output = convert('<div class="p-0 bg-white">\n  Content\n</div>', {"minify": True})
+        assert 'style="padding:0;background-color:#fff"' in output
+
+    def test_unconverted_styles_kept(self) -> None:
+        """Test existing styles with data URIs and quoted ';' survive minification."""
+        html = (
+            '<div style="background-image:url(data:image/png;base64,AAAA)">a</div>'
+            '<p class="p-2" style="font-family: \'x;y\', serif">b</p>'
+        )
+        output = convert(html, {"minify": True})
+        assert '<div style="background-image:url(data:image/png;base64,AAAA)">a</div>' in output
+        assert "<p style=\"font-family:'x;y',serif;padding:8px\">b</p>" in output
+
+    def test_report_bytes_saved(self) -> None:
+        """Test convert_with_report reports bytes saved by minification."""
+        html = '<table class="w-full">\n  <tr>\n    <td class="p-4 text-white">Hi</td>\n  </tr>\n</table>'
+        plain = TailwindEmailConverter().convert(html)
+        result = TailwindEmailConverter(ConversionOptions(minify=True)).convert_with_report(html)
+        assert result.bytes_saved["minify"] == len(plain) - len(result.html)
+        assert result.total_bytes_saved > 0
+
+    def test_report_without_minify(self) -> None:
+        """Test the report is empty of savings when no stage ran."""
+        result = TailwindEmailConverter().convert_with_report('<div class="p-4">x</div>')
+        assert result.bytes_saved == {}
+        assert set(result.timings) == {"parse", "process", "serialize"}
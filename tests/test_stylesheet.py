@@ -0,0 +1,254 @@
+"""Tests for the shared head stylesheet (hybrid output mode)."""
+
+from bs4 import BeautifulSoup
+
+from tailwind_email import TailwindEmailConverter, convert
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.stylesheet import (
+    SharedStyleExtractor,
+    insert_head_style,
+    is_inline_critical,
+    media_query,
+    short_class_name,
+)
+
+CARD = '<tr><td class="p-4 bg-white text-gray-700 w-full">Item</td></tr>'
+CATALOG = f"<html><head><title>Catalog</title></head><body><table>{CARD * 5}</table></body></html>"
+
+
+class TestHelpers:
+    """Tests for stylesheet helpers."""
+
+    def test_short_class_names(self) -> None:
+        """Test generated names count in base 36."""
+        assert [short_class_name(i) for i in (0, 9, 10, 35, 36)] == ["t0", "t9", "ta", "tz", "t10"]
+
+    def test_inline_critical(self) -> None:
+        """Test layout, MSO and !important declarations stay inline."""
+        assert is_inline_critical("width", "100%")
+        assert is_inline_critical("mso-line-height-rule", "exactly")
+        assert is_inline_critical("color", "red !important")
+        assert not is_inline_critical("color", "red")
+
+    def test_insert_creates_head(self) -> None:
+        """Test a head is created when the document has none."""
+        soup = BeautifulSoup("<html><body><p>x</p></body></html>", "html.parser")
+        insert_head_style(soup, "p { color: red }")
+        assert str(soup).startswith("<html><head><style>p { color: red }</style></head>")
+
+
+class TestSharedStyleExtractor:
+    """Tests for SharedStyleExtractor."""
+
+    def _extract(self, html: str, **kwargs: object) -> tuple[str, int]:
+        soup = BeautifulSoup(html, "html.parser")
+        extractor = SharedStyleExtractor(**kwargs)  # type: ignore[arg-type]
+        for element in soup.find_all(True):
+            extractor.add(element)
+        saved = extractor.apply(soup)
+        return str(soup), saved
+
+    def test_single_occurrence_stays_inline(self) -> None:
+        """Test declaration sets used once are not moved."""
+        html = '<p style="color: red; padding: 4px">a</p>'
+        output, saved = self._extract(html)
+        assert output == html
+        assert saved == 0
+
+    def test_unprofitable_sets_stay_inline(self) -> None:
+        """Test tiny declaration sets are not worth a rule."""
+        html = '<p style="color: red">a</p><p style="color: red">b</p>'
+        output, saved = self._extract(html)
+        assert output == html
+        assert saved == 0
+
+    def test_generated_names_avoid_existing_classes(self) -> None:
+        """Test generated names skip classes already in the document."""
+        style = "color: #374151; font-family: Arial, Helvetica, sans-serif"
+        html = (
+            f'<p class="t0" style="{style}">a</p><p style="{style}">b</p><p style="{style}">c</p>'
+        )
+        output, _ = self._extract(html)
+        assert 'class="t0 t1"' in output
+        assert ".t1 {" in output
+
+    def test_reserved_properties_stay_inline(self) -> None:
+        """Test declarations other stylesheet rules may override are not moved."""
+        style = "padding-left: 16px; color: #374151; font-family: Arial, Helvetica, sans-serif"
+        html = "".join(f'<p style="{style}">{i}</p>' for i in range(3))
+        output, _ = self._extract(html, reserved=frozenset(["color", "padding"]))
+        assert ".t0 { font-family: Arial, Helvetica, sans-serif }" in output
+        assert output.count('<p class="t0" style="padding-left: 16px; color: #374151">') == 3
+
+    def test_quoted_semicolons(self) -> None:
+        """Test data URIs and quoted values are moved whole."""
+        style = "background-image: url(data:image/png;base64,AAAA); font-family: 'a;b', serif"
+        html = "".join(f'<div style="{style}">{i}</div>' for i in range(3))
+        output, _ = self._extract(html)
+        assert f".t0 {{ {style} }}" in output
+
+    def test_minified_rules(self) -> None:
+        """Test rules use compact syntax when minifying."""
+        style = "padding: 0px; background-color: #ffffff; color: #374151"
+        html = "".join(f'<div style="{style}">{i}</div>' for i in range(3))
+        output, _ = self._extract(html, minify=True)
+        assert "<style>.t0{padding:0;background-color:#fff;color:#374151}</style>" in output
+
+
+class TestConverterHybridMode:
+    """Tests for compatibility='modern'."""
+
+    def test_strict_mode_inlines_everything(self) -> None:
+        """Test the default mode emits no stylesheet."""
+        assert "<style>" not in convert(CATALOG)
+
+    def test_repeated_styles_move_to_head(self) -> None:
+        """Test repeated declarations become one class rule."""
+        output = convert(CATALOG, {"compatibility": "modern"})
+        assert output.count("<style>") == 1
+        assert ".t0 { padding: 16px; background-color: #ffffff; color: #374151 }" in output
+        assert output.count('<td class="t0" style="width: 100%">') == 5
+
+    def test_stylesheet_in_head(self) -> None:
+        """Test the stylesheet is appended to the existing head."""
+        output = convert(CATALOG, {"compatibility": "modern"})
+        assert "<title>Catalog</title><style>" in output
+        assert output.index("</style>") < output.index("<body>")
+
+    def test_bytes_saved_is_exact(self) -> None:
+        """Test reported savings equal the size difference."""
+        plain = convert(CATALOG)
+        result = TailwindEmailConverter(
+            ConversionOptions(compatibility="modern")
+        ).convert_with_report(CATALOG)
+        assert result.bytes_saved["hybrid_styles"] == len(plain) - len(result.html)
+        assert len(result.html) < len(plain)
+
+    def test_unprofitable_stylesheet_skipped(self) -> None:
+        """Test nothing moves when the gains do not pay for the <head><style> wrapper."""
+        html = '<div class="p-4 text-red-500">a</div><div class="p-4 text-red-500">b</div>'
+        result = TailwindEmailConverter(
+            ConversionOptions(compatibility="modern")
+        ).convert_with_report(html)
+        assert result.html == convert(html)
+        assert result.bytes_saved["hybrid_styles"] == 0
+
+    def test_stage_savings_add_up(self) -> None:
+        """Test each stage is measured against the output of the stage before it."""
+        html = CATALOG.replace('class="', 'class="md:p-2 ')
+        plain = convert(html)
+        modern = convert(html, {"compatibility": "modern"})
+        result = TailwindEmailConverter(
+            ConversionOptions(compatibility="modern", minify=True)
+        ).convert_with_report(html)
+        assert result.bytes_saved["hybrid_styles"] == len(plain) - len(modern)
+        assert result.bytes_saved["minify"] == len(modern) - len(result.html)
+        assert result.total_bytes_saved == len(plain) - len(result.html)
+
+    def test_head_rules_keep_inline_priority(self) -> None:
+        """Test properties set by remaining head rules are not moved into class rules."""
+        body = '<p class="text-black p-4 font-sans">x</p>' * 5
+        html = f"<html><head><style>#main p{{color:red}}</style></head><body><div id=main>{body}</div></body></html>"
+        output = convert(html, {"compatibility": "modern"})
+        assert output.count('style="color: #000000"') == 5
+        assert "color: #000000 }" not in output
+        linked = html.replace(
+            "<style>#main p{color:red}</style>", '<link rel="stylesheet" href="a.css">'
+        )
+        assert convert(linked, {"compatibility": "modern"}) == convert(linked)
+
+    def test_preserved_classes_kept(self) -> None:
+        """Test generated classes are appended to preserved classes."""
+        output = convert(CATALOG, {"compatibility": "modern", "preserve_classes": True})
+        assert 'class="p-4 bg-white text-gray-700 w-full t0"' in output
+
+
+class TestMediaQuery:
+    """Tests for media_query()."""
+
+    def test_breakpoints(self) -> None:
+        """Test min-width and max-width variants."""
+        assert media_query(["md"])[1] == "(min-width: 768px)"
+        assert media_query(["max-sm"])[1] == "(max-width: 639px)"
+
+    def test_combined_variants(self) -> None:
+        """Test stacked variants combine into one query."""
+        assert media_query(["md", "dark"])[1] == (
+            "(min-width: 768px) and (prefers-color-scheme: dark)"
+        )
+
+    def test_ordering(self) -> None:
+        """Test wider min-width queries sort after narrower ones."""
+        queries = [["lg"], ["dark"], ["sm"], ["max-sm"], ["max-lg"], ["sm", "dark"]]
+        ordered = sorted(queries, key=lambda variants: media_query(variants)[0])
+        assert ordered == [["max-lg"], ["max-sm"], ["dark"], ["sm"], ["sm", "dark"], ["lg"]]
+
+
+class TestConverterVariants:
+    """Tests for the variant_styles conversion option."""
+
+    HTML = (
+        "<html><head></head><body>"
+        '<p class="p-2 md:p-6 dark:text-white custom">A</p>'
+        '<p class="p-2 md:p-6 hover:text-red-500">B</p>'
+        "</body></html>"
+    )
+
+    def test_disabled_by_default(self) -> None:
+        """Test variants are not emitted without the option."""
+        output = convert(self.HTML)
+        assert "@media" not in output
+
+    def test_rules_emitted_once(self) -> None:
+        """Test a variant shared by several elements becomes one rule."""
+        output = convert(self.HTML, {"variant_styles": True})
+        assert output.count("padding: 24px !important") == 1
+        assert output.count(" v0") == 2
+        assert "@media (min-width: 768px) {\n.v0 { padding: 24px !important }\n}" in output
+        assert "@media (prefers-color-scheme: dark)" in output
+
+    def test_base_styles_still_inlined(self) -> None:
+        """Test non-variant classes are inlined as before."""
+        output = convert(self.HTML, {"variant_styles": True})
+        assert 'style="padding: 8px"' in output
+
+    def test_variant_classes_replaced(self) -> None:
+        """Test converted variant classes are replaced by generated names."""
+        output = convert(self.HTML, {"variant_styles": True})
+        assert "md:p-6" not in output
+        assert 'class="custom v0 v1"' in output
+
+    def test_state_variants_not_converted(self) -> None:
+        """Test hover: and similar variants are not turned into rules."""
+        output = convert(self.HTML, {"variant_styles": True})
+        assert "color: #ef4444" not in output
+
+    def test_generated_names_avoid_existing_classes(self) -> None:
+        """Test generated names skip classes used in the document."""
+        html = '<p class="v0 md:p-6">x</p>'
+        output = convert(html, {"variant_styles": True})
+        assert 'class="v0 v1"' in output
+
+    def test_minified_stylesheet(self) -> None:
+        """Test media blocks use compact syntax when minifying."""
+        output = convert(self.HTML, {"variant_styles": True, "minify": True})
+        assert "@media (min-width:768px){.v0{padding:24px !important}}" in output
+
+    def test_shared_by_equal_declarations(self) -> None:
+        """Test different classes with equal declarations share a rule."""
+        html = '<p class="md:p-6">a</p><p class="md:p-[24px]">b</p>'
+        output = convert(html, {"variant_styles": True})
+        assert output.count("padding: 24px !important") == 1
+
+    def test_pruning_keeps_values_variants_change(self) -> None:
+        """Test children keep values their parent's variants override."""
+        html = (
+            '<div class="text-black dark:text-white"><p class="text-black">a</p></div>'
+            '<div class="text-black"><span class="dark:text-white">b'
+            '<b class="text-black">c</b></span></div>'
+        )
+        output = convert(html, {"variant_styles": True, "prune_inherited": True})
+        assert '<p style="color: #000000">a</p>' in output
+        assert '<b style="color: #000000">c</b>' in output
+        output = convert(html, {"variant_styles": True, "fit_to_budget": True, "size_budget": 10})
+        assert '<p style="color:#000">a</p>' in output
@@ -0,0 +1,113 @@
+"""Tests for repeated subtree detection."""
+
+from bs4 import BeautifulSoup
+
+from tailwind_email import TailwindEmailConverter
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.serializer import HTMLSerializer
+from tailwind_email.subtrees import SubtreeIndex, copy_converted
+
+CARD = (
+    '<div class="p-4 md:p-8 card"><h3 class="text-lg font-bold">{name}</h3>'
+    '<a class="bg-blue-500 text-white" href="#">Buy</a></div>\n'
+)
+
+
+def _catalog(*names: str) -> str:
+    return '<div class="p-2">' + "".join(CARD.format(name=name) for name in names) + "</div>"
+
+
+class TestSubtreeIndex:
+    """Tests for SubtreeIndex."""
+
+    def test_same_shape_and_content(self) -> None:
+        """Test equal subtrees share ids and text only changes the content id."""
+        soup = BeautifulSoup(_catalog("A", "A", "B"), "lxml")
+        index = SubtreeIndex(soup)
+        first, second, third = soup.find_all("div", class_="card")
+        assert index.shapes[id(first)] == index.shapes[id(second)] == index.shapes[id(third)]
+        assert index.contents[id(first)] == index.contents[id(second)]
+        assert index.contents[id(first)] != index.contents[id(third)]
+
+    def test_attributes_and_children_distinguish(self) -> None:
+        """Test attribute values and child structure are part of the shape."""
+        soup = BeautifulSoup(
+            '<p class="a">x</p><p class="b">x</p><p class="a"><b>x</b></p><p class="a">y</p>',
+            "lxml",
+        )
+        index = SubtreeIndex(soup)
+        shapes = [index.shapes[id(p)] for p in soup.find_all("p")]
+        assert shapes[0] == shapes[3]
+        assert len({shapes[0], shapes[1], shapes[2]}) == 3
+
+    def test_comments_differ_from_text(self) -> None:
+        """Test a comment and a text node with the same data are not confused."""
+        soup = BeautifulSoup('<p class="a">x</p><p class="a"><!--x--></p>', "lxml")
+        index = SubtreeIndex(soup)
+        first, second = soup.find_all("p")
+        assert index.contents[id(first)] != index.contents[id(second)]
+
+    def test_repeated_contents(self) -> None:
+        """Test only content ids shared by several elements are marked as repeated."""
+        soup = BeautifulSoup(_catalog("A", "A", "B"), "lxml")
+        index = SubtreeIndex(soup)
+        first, _, third = soup.find_all("div", class_="card")
+        assert index.contents[id(first)] in index.repeated_contents
+        assert index.contents[id(third)] not in index.repeated_contents
+
+    def test_no_repeats(self) -> None:
+        """Test content ids are skipped when no element with classes repeats."""
+        soup = BeautifulSoup(
+            '<div class="a"><p class="a">x<br></p><p class="b">x<br></p></div>', "lxml"
+        )
+        index = SubtreeIndex(soup)
+        assert not index.repeats
+        assert index.contents == {}
+        assert index.shapes[id(soup.p.br)] == index.shapes[id(soup.find_all("br")[1])]
+
+    def test_copy_converted(self) -> None:
+        """Test attributes are copied element by element without sharing lists."""
+        soup = BeautifulSoup('<p class="a" style="x"><b id="1">a</b></p><p><b>b</b></p>', "lxml")
+        source, target = soup.find_all("p")
+        pairs = list(copy_converted(source, target))
+        assert [copied.name for _, copied in pairs] == ["p", "b"]
+        assert str(target) == '<p class="a" style="x"><b id="1">b</b></p>'
+        target["class"].append("c")
+        assert source["class"] == ["a"]
+
+
+class TestRepeatedConversion:
+    """Tests for converting documents with repeated subtrees."""
+
+    def test_copies_match_first_instance(self) -> None:
+        """Test every repeat gets the converted attributes and keeps its own text."""
+        output = TailwindEmailConverter().convert(_catalog("A", "B", "A"))
+        assert output.count('<div class="md:p-8 card" style="padding: 16px">') == 3
+        assert output.count('<a href="#" style="background-color: #3b82f6; color: #ffffff">') == 3
+        assert ">A</h3>" in output and ">B</h3>" in output
+
+    def test_variants_and_hybrid_on_copies(self) -> None:
+        """Test copied elements get generated variant and shared-style classes."""
+        options = ConversionOptions(variant_styles=True, compatibility="modern")
+        output = TailwindEmailConverter(options).convert(_catalog("A", "B", "C"))
+        assert output.count('<div class="card t0 v0">') == 3
+        assert output.count('<a class="t2" href="#">Buy</a>') == 3
+
+    def test_minified_repeats_count_savings(self) -> None:
+        """Test reused markup matches a full walk, including the bytes minification removed."""
+        html = _catalog("A", "A", "A")
+        reused = TailwindEmailConverter(ConversionOptions(minify=True)).convert_with_report(html)
+        # Size analysis accounts for every element, so it walks all of them
+        walked = TailwindEmailConverter(
+            ConversionOptions(minify=True, analyze_size=True)
+        ).convert_with_report(html)
+        assert reused.html == walked.html
+        assert reused.bytes_saved == walked.bytes_saved
+
+    def test_serializer_reuses_repeated_markup(self) -> None:
+        """Test subtrees marked as repeats are rendered once."""
+        soup = BeautifulSoup("<p>x</p><p>x</p>", "lxml")
+        first, second = soup.find_all("p")
+        second.string = "changed"
+        serializer = HTMLSerializer(repeated={id(first): 0, id(second): 0})
+        assert serializer.serialize(soup.body) == "<body><p>x</p><p>x</p></body>"
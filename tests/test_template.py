@@ -0,0 +1,124 @@
+"""Tests for template-aware conversion."""
+
+from tailwind_email import TailwindEmailConverter, convert
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.template import TemplatePlaceholders
+
+
+def _convert(html: str, **options: object) -> str:
+    return convert(html, {"preserve_templates": True, **options})
+
+
+class TestTemplatePlaceholders:
+    """Tests for TemplatePlaceholders."""
+
+    def test_round_trip(self) -> None:
+        """Test restoring a protected source gives back every region."""
+        source = (
+            '<p title="{{ t }}">{{ a }}{# c #}</p>'
+            "<style>p { color: {{ c }} }</style>{{{ raw }}}{{!-- note --}}{%- if x -%}"
+        )
+        placeholders = TemplatePlaceholders()
+        protected = placeholders.protect(source)
+        assert "{{" not in protected
+        assert len(placeholders.regions) == 7
+        assert placeholders.restore(protected) == source
+
+    def test_placeholder_forms(self) -> None:
+        """Test each context gets a placeholder the HTML parser keeps in place."""
+        placeholders = TemplatePlaceholders()
+        protected = placeholders.protect(
+            '<td {{ attrs }} style="{{ s }}" title="{{ t }}">{{ text }}</td>'
+        )
+        assert protected == (
+            '<td __tpl0__ style="__tpl1__:__tpl1__" title="__tpl2__"><!--__tpl3__--></td>'
+        )
+
+    def test_prefix_avoids_source(self) -> None:
+        """Test the placeholder prefix never occurs in the source."""
+        placeholders = TemplatePlaceholders()
+        protected = placeholders.protect("<p>__tpl0__ {{ a }}</p>")
+        assert placeholders.prefix == "__tplx"
+        assert placeholders.restore(protected) == "<p>__tpl0__ {{ a }}</p>"
+
+    def test_no_regions(self) -> None:
+        """Test sources without template regions pass through untouched."""
+        placeholders = TemplatePlaceholders()
+        assert placeholders.protect("<p>{ a }</p>") == "<p>{ a }</p>"
+        assert not placeholders.contains("__tpl0__")
+
+
+class TestPreserveTemplates:
+    """Tests for the preserve_templates conversion option."""
+
+    def test_loops_between_table_rows(self) -> None:
+        """Test block tags between rows stay inside the table."""
+        html = (
+            '<table class="w-full">{% for row in rows %}'
+            "<tr><td>{{ row }}</td></tr>{% endfor %}</table>"
+        )
+        assert (
+            '<table style="width: 100%">{% for row in rows %}<tr><td>{{ row }}</td></tr>'
+            "{% endfor %}</table>" in _convert(html)
+        )
+
+    def test_handlebars_blocks(self) -> None:
+        """Test Handlebars blocks and triple-stash output are kept."""
+        html = '<div>{{#each users}}<p class="mt-2">{{{ this.bio }}}</p>{{/each}}</div>'
+        assert (
+            '<div>{{#each users}}<p style="margin-top: 8px">{{{ this.bio }}}</p>{{/each}}</div>'
+            in _convert(html)
+        )
+
+    def test_dynamic_classes_kept(self) -> None:
+        """Test static classes convert and template-built classes stay classes."""
+        html = '<td class="p-4 {{ extra }} bg-{{ tone }}-500 card">x</td>'
+        assert '<td class="{{ extra }} bg-{{ tone }}-500 card" style="padding: 16px">' in _convert(
+            html
+        )
+        assert '<td class="{{ extra }} bg-{{ tone }}-500" style=' in _convert(
+            html, preserve_unsupported_classes=False
+        )
+
+    def test_attribute_values(self) -> None:
+        """Test regions in attribute values survive, quoted or not."""
+        html = '<a href="{{ url }}?id={{ id }}" class="block" title={{ t }}>x</a>'
+        output = _convert(html)
+        assert 'href="{{ url }}?id={{ id }}"' in output
+        assert 'title="{{ t }}"' in output
+
+    def test_conditional_attributes(self) -> None:
+        """Test attributes between tag-level blocks stay between them."""
+        html = '<a class="px-4" {% if new_tab %}target="_blank"{% endif %}>x</a>'
+        assert (
+            '<a {% if new_tab %}target="_blank"{% endif %} style="padding-left: 16px; '
+            'padding-right: 16px">' in _convert(html)
+        )
+
+    def test_style_regions(self) -> None:
+        """Test whole and partial style regions merge with converted styles."""
+        html = '<p class="p-4" style="{{ extra }}; color: {{ c }}">x</p>'
+        for minify in (False, True):
+            output = _convert(html, minify=minify, prune_inherited=True)
+            assert "{{ extra }}" in output
+            assert "{{ c }}" in output
+        assert 'style="{{ extra }}; color: {{ c }}; padding: 16px"' in _convert(html)
+
+    def test_raw_text_and_comments(self) -> None:
+        """Test regions in <title>, <style> and comments are kept verbatim."""
+        html = (
+            "<html><head><title>{{ subject }}</title><style>p { color: {{ c }} }</style>"
+            "</head><body><!-- {{ c }} --><p>x</p></body></html>"
+        )
+        output = _convert(html)
+        assert "<title>{{ subject }}</title>" in output
+        assert "p { color: {{ c }} }" in output
+        assert "<!-- {{ c }} -->" in output
+
+    def test_disabled_by_default(self) -> None:
+        """Test template syntax is plain text without the option."""
+        converter = TailwindEmailConverter()
+        assert not converter.options.preserve_templates
+        assert ConversionOptions(preserve_templates=True).to_dict()["preserve_templates"]
+        output = converter.convert('<p class="p-4 {{ extra }}">x</p>')
+        assert 'class="{{ extra }}"' in output
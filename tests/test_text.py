@@ -0,0 +1,115 @@
+"""Tests for plain-text rendering."""
+
+from tailwind_email import TailwindEmailConverter
+from tailwind_email.converter import ConversionOptions
+
+
+def _text(html: str, **options: object) -> str:
+    converter = TailwindEmailConverter(ConversionOptions(plain_text=True, **options))  # type: ignore[arg-type]
+    text = converter.convert_with_report(html).text
+    assert text is not None
+    return text
+
+
+class TestPlainTextRenderer:
+    """Tests for PlainTextRenderer formatting."""
+
+    def test_paragraphs_and_whitespace(self) -> None:
+        """Test blocks are separated and whitespace is collapsed."""
+        html = "<p class='p-4'>Thanks  for\n signing&nbsp;up.</p><div>One</div><div>Two</div>"
+        assert _text(html) == "Thanks for signing up.\n\nOne\nTwo"
+
+    def test_headings(self) -> None:
+        """Test h1 and h2 are underlined and other headings are plain."""
+        html = "<h1>Welcome</h1><h2>News</h2><h3>Small</h3><p>Body</p>"
+        assert _text(html) == "Welcome\n=======\n\nNews\n----\n\nSmall\n\nBody"
+
+    def test_links(self) -> None:
+        """Test links show their URL unless the text already does."""
+        html = (
+            '<p><a href="https://example.com">Visit</a> '
+            '<a href="https://example.com">https://example.com</a> '
+            '<a href="mailto:a@example.com">a@example.com</a> '
+            '<a href="#top">Top</a> <a href="https://x.test"><img src="x.png"></a></p>'
+        )
+        assert _text(html) == (
+            "Visit (https://example.com) https://example.com a@example.com Top https://x.test"
+        )
+
+    def test_lists(self) -> None:
+        """Test list markers, numbering and nesting."""
+        html = (
+            "<ul><li>One</li><li>Two<ul><li>Nested</li></ul></li></ul>"
+            '<ol start="3"><li>Three</li><li>Four</li></ol>'
+        )
+        assert _text(html) == "- One\n- Two\n  - Nested\n\n3. Three\n4. Four"
+
+    def test_table_cells(self) -> None:
+        """Test rows become lines and non-empty cells are joined."""
+        html = (
+            "<table><tr><th>Item</th><th>Qty</th></tr>"
+            "<tr><td>Apple</td><td></td><td>2</td></tr></table>"
+        )
+        assert _text(html) == "Item | Qty\nApple | 2"
+
+    def test_layout_tables(self) -> None:
+        """Test nested layout tables do not add separators or blank lines of their own."""
+        html = (
+            '<table class="w-full"><tr><td class="p-4"><table><tr><td>'
+            "<p>Hello</p><p>World</p></td></tr></table></td></tr></table>"
+        )
+        assert _text(html) == "Hello\n\nWorld"
+
+    def test_line_breaks_and_rules(self) -> None:
+        """Test <br> ends lines and <hr> draws a rule."""
+        assert _text("<p>a<br>b<br><br>c</p><hr><p>d</p>") == "a\nb\n\nc\n\n" + "-" * 40 + "\n\nd"
+
+    def test_blockquote_and_pre(self) -> None:
+        """Test quoted lines are prefixed and preformatted text is kept."""
+        html = "<blockquote><p>Quoted</p><p>Again</p></blockquote><pre>  a\n    b</pre>"
+        assert _text(html) == "> Quoted\n>\n> Again\n\n  a\n    b"
+
+    def test_images(self) -> None:
+        """Test images are replaced by their alt text."""
+        assert _text('<p><img src="logo.png" alt="ACME"> News</p>') == "ACME News"
+
+    def test_skipped_content(self) -> None:
+        """Test head content, scripts, comments and hidden elements are left out."""
+        html = (
+            "<html><head><title>Subject</title><style>p { color: red }</style></head><body>"
+            '<div class="hidden">Preheader</div><span style="display: none">x</span>'
+            "<p hidden>Gone</p><script>alert(1)</script><!-- note --><p>Shown</p></body></html>"
+        )
+        assert _text(html) == "Shown"
+
+
+class TestPlainTextConversion:
+    """Tests for the plain_text option."""
+
+    def test_disabled_by_default(self) -> None:
+        """Test no text is rendered unless requested."""
+        assert TailwindEmailConverter().convert_with_report("<p>Hi</p>").text is None
+
+    def test_html_unchanged(self) -> None:
+        """Test rendering the text does not change the HTML."""
+        html = '<div class="p-4"><p class="text-sm">Hi</p><p class="text-sm">Hi</p></div>'
+        converter = TailwindEmailConverter(ConversionOptions(plain_text=True, minify=True))
+        result = converter.convert_with_report(html)
+        assert result.html == TailwindEmailConverter(ConversionOptions(minify=True)).convert(html)
+        assert result.text == "Hi\n\nHi"
+
+    def test_repeated_list_items_numbered(self) -> None:
+        """Test identical repeated items still get their own numbers."""
+        html = "<ol>" + '<li class="p-2">Same</li>' * 3 + "</ol>"
+        assert _text(html) == "1. Same\n2. Same\n3. Same"
+
+    def test_templates_kept(self) -> None:
+        """Test template regions survive in the text."""
+        html = '<p class="p-4">Hello {{ name }}!</p><a href="{{ url }}">Open</a>'
+        assert _text(html, preserve_templates=True) == "Hello {{ name }}!\n\nOpen ({{ url }})"
+
+    def test_fit_to_budget(self) -> None:
+        """Test the text comes from the pass that fits the budget."""
+        html = "<p class='p-4 text-sm'>Hi</p>" * 50
+        text = _text(html, fit_to_budget=True, size_budget=1000)
+        assert text == "\n\n".join(["Hi"] * 50)
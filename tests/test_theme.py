@@ -0,0 +1,208 @@
+"""Tests for theme configuration."""
+
+import json
+import sys
+from collections import ChainMap
+
+import pytest
+
+from tailwind_email import TailwindEmailConverter, convert
+from tailwind_email.converter import ConversionOptions
+from tailwind_email.mappings.colors import COLOR_PALETTE
+from tailwind_email.parser import TailwindClassParser
+from tailwind_email.theme import (
+    DEFAULT_THEME,
+    compile_theme,
+    is_affected,
+    theme_changes,
+    theme_hash,
+)
+from tailwind_email.transformer import CSSTransformer
+
+BRAND_THEME = {
+    "colors": {"brand": {"DEFAULT": "#0b5fff", "50": "#eef4ff"}, "blue-500": "#1e40af"},
+    "spacing": {"gutter": 18, "section": "40px"},
+    "fonts": {"brand": ["Inter", "Arial", "sans-serif"], "font-sans": "Verdana, sans-serif"},
+}
+
+
+class TestCompileTheme:
+    """Tests for compile_theme() and theme_hash()."""
+
+    def test_tables_merge_over_defaults(self) -> None:
+        """Test theme entries extend and override the built-in tables."""
+        tables = compile_theme(BRAND_THEME)
+        assert tables.colors["brand"] == "#0b5fff"
+        assert tables.colors["brand-50"] == "#eef4ff"
+        assert tables.colors["blue-500"] == "#1e40af"
+        assert tables.colors["red-500"] == COLOR_PALETTE["red-500"]
+        assert tables.spacing["gutter"] == "18px"
+        assert tables.spacing["4"] == "16px"
+        assert tables.fonts["font-brand"] == "Inter, Arial, sans-serif"
+        assert tables.fonts["font-sans"] == "Verdana, sans-serif"
+        assert COLOR_PALETTE["blue-500"] == "#3b82f6"
+
+    def test_untouched_sections_share_defaults(self) -> None:
+        """Test sections the theme omits are not copied."""
+        tables = compile_theme({"colors": {"brand": "#0b5fff"}})
+        assert tables.spacing is DEFAULT_THEME.spacing
+        assert tables.fonts is DEFAULT_THEME.fonts
+
+    def test_overlay_over_defaults(self) -> None:
+        """Test a theme holds only its own entries over the shared built-in tables."""
+        tables = compile_theme({"colors": {"brand": "#0b5fff"}, "spacing": {"gutter": 18}})
+        assert isinstance(tables.colors, ChainMap)
+        assert tables.colors.maps == [{"brand": "#0b5fff"}, COLOR_PALETTE]
+        assert tables.colors.maps[1] is COLOR_PALETTE
+        assert isinstance(tables.spacing, ChainMap)
+        assert tables.spacing.maps[0] == {"gutter": "18px"}
+        assert tables.nbytes < sys.getsizeof(COLOR_PALETTE)
+
+    def test_cached_by_hash(self) -> None:
+        """Test equal configurations compile once, whatever their form."""
+        as_json = json.dumps(BRAND_THEME, indent=2)
+        assert theme_hash(as_json) == theme_hash(BRAND_THEME)
+        assert compile_theme(as_json) is compile_theme(BRAND_THEME)
+        assert compile_theme(None) is DEFAULT_THEME
+        assert compile_theme({}) is DEFAULT_THEME
+
+    def test_invalid_config(self) -> None:
+        """Test malformed configurations raise ValueError."""
+        with pytest.raises(ValueError, match="Unknown theme sections"):
+            compile_theme({"colours": {}})
+        with pytest.raises(ValueError, match="Invalid theme JSON"):
+            compile_theme("{")
+        with pytest.raises(ValueError, match="brand-50"):
+            compile_theme({"colors": {"brand": {"50": 5}}})
+        with pytest.raises(ValueError, match="must be an object"):
+            compile_theme({"spacing": ["gutter"]})
+
+
+class TestThemedConversion:
+    """Tests for the theme conversion option."""
+
+    def test_theme_classes_resolve(self) -> None:
+        """Test themed colors, spacing and fonts convert like built-in classes."""
+        html = '<div class="bg-brand text-brand-50/50 p-gutter font-brand card">x</div>'
+        output = convert(html, {"theme": BRAND_THEME})
+        assert (
+            '<div class="card" style="background-color: #0b5fff; '
+            "color: rgba(238, 244, 255, 0.5); padding: 18px; "
+            'font-family: Inter, Arial, sans-serif">' in output
+        )
+
+    def test_overrides_apply(self) -> None:
+        """Test overridden built-in entries take the theme value."""
+        output = convert('<p class="text-blue-500 font-sans">x</p>', {"theme": BRAND_THEME})
+        assert 'style="color: #1e40af; font-family: Verdana, sans-serif"' in output
+
+    def test_default_unchanged(self) -> None:
+        """Test converters without a theme keep the built-in tables."""
+        convert('<p class="text-blue-500">x</p>', {"theme": BRAND_THEME})
+        assert 'style="color: #3b82f6"' in convert('<p class="text-blue-500">x</p>')
+        assert 'class="p-gutter"' in convert('<p class="p-gutter">x</p>')
+
+    def test_custom_spacing_is_tailwind_class(self) -> None:
+        """Test theme spacing keys are recognised by the parser."""
+        parser = TailwindClassParser(theme=compile_theme(BRAND_THEME))
+        assert parser.is_tailwind_class("mt-section")
+        assert not TailwindClassParser().is_tailwind_class("mt-section")
+
+    def test_apply_cache_keyed_by_theme(self) -> None:
+        """Test @apply resolutions are not shared between themes."""
+        themed = CSSTransformer(theme=compile_theme(BRAND_THEME))
+        assert CSSTransformer().resolve_utilities(["text-blue-500"]) == {"color": "#3b82f6"}
+        assert themed.resolve_utilities(["text-blue-500"]) == {"color": "#1e40af"}
+
+    def test_options_round_trip(self) -> None:
+        """Test the theme survives to_dict() and copy()."""
+        options = ConversionOptions(theme=BRAND_THEME)
+        assert options.to_dict()["theme"] == BRAND_THEME
+        converter = TailwindEmailConverter(options.copy())
+        assert converter.transformer.theme is compile_theme(BRAND_THEME)
+
+
+class TestReloadTheme:
+    """Tests for hot-reloading a converter's theme."""
+
+    def test_reload_swaps_theme(self) -> None:
+        """Test conversions after a reload use the new theme."""
+        converter = TailwindEmailConverter(ConversionOptions(theme={"colors": {"brand": "#111"}}))
+        html = '<p class="text-brand p-4">x</p>'
+        assert "color: #111" in converter.convert(html)
+        tables = converter.reload_theme({"colors": {"brand": "#222"}})
+        assert converter.theme is tables
+        assert converter.options.theme == {"colors": {"brand": "#222"}}
+        assert "color: #222" in converter.convert(html)
+
+    def test_only_affected_cache_entries_dropped(self) -> None:
+        """Test cached class results survive unless the change touches them."""
+        converter = TailwindEmailConverter(ConversionOptions(theme={"colors": {"brand": "#111"}}))
+        converter.convert('<p class="text-brand bg-brand/50 p-4 font-sans">x</p>')
+        old = converter.transformer
+        converter.reload_theme({"colors": {"brand": "#222"}})
+        new = converter.transformer
+        assert new is not old
+        assert set(new._cache) == {"p-4", "font-sans"}
+        assert new._cache["p-4"] is old._cache["p-4"]
+
+    def test_theme_changes(self) -> None:
+        """Test theme_changes() reports added, removed and changed entries."""
+        before = compile_theme({"colors": {"brand": "#111", "old": "#333"}})
+        after = compile_theme({"colors": {"brand": "#222"}, "spacing": {"gutter": 4}})
+        assert theme_changes(before, after) == {"brand", "old", "gutter"}
+        assert is_affected("border-brand/20", frozenset({"brand"}))
+        assert is_affected("mx-gutter", frozenset({"gutter"}))
+        assert not is_affected("text-blue-500", frozenset({"brand"}))
+
+    def test_components_kept_unless_affected(self) -> None:
+        """Test the parsed component CSS is re-resolved only when needed."""
+        css = ".btn { @apply p-4 bg-brand; }"
+        converter = TailwindEmailConverter(
+            ConversionOptions(component_css=css, theme={"colors": {"brand": "#111"}})
+        )
+        converter.convert('<a class="btn">x</a>')
+        index = converter._components[2] if converter._components else None
+        converter.reload_theme({"colors": {"brand": "#111", "accent": "#333"}})
+        converter.convert('<a class="btn">x</a>')
+        assert converter._components is not None
+        assert converter._components[2] is index
+
+        converter.reload_theme({"colors": {"brand": "#222"}})
+        assert "background-color: #222" in converter.convert('<a class="btn">x</a>')
+        assert converter._components[2] is not index
+
+    def test_conversion_pins_snapshot(self) -> None:
+        """Test a reload during a conversion does not change its theme."""
+        converter = TailwindEmailConverter(
+            ConversionOptions(theme={"colors": {"brand": "#111"}}, inline_style_blocks=True)
+        )
+        original = converter._process_element
+
+        def reload_then_process(*args: object, **kwargs: object) -> None:
+            converter.reload_theme({"colors": {"brand": "#222"}})
+            original(*args, **kwargs)  # type: ignore[arg-type]
+
+        converter._process_element = reload_then_process  # type: ignore[method-assign]
+        html = (
+            "<html><head><style>.c { @apply text-brand; }</style></head>"
+            '<body><p class="bg-brand">a</p><p class="c">b</p></body></html>'
+        )
+        output = converter.convert(html)
+        assert output.count("#111") == 2
+        assert "#222" not in output
+
+    def test_reload_async(self) -> None:
+        """Test background reloads resolve to the swapped-in tables."""
+        converter = TailwindEmailConverter()
+        future = converter.reload_theme_async('{"colors": {"brand": "#333"}}')
+        assert future.result(timeout=5) is converter.theme
+        assert "color: #333" in converter.convert('<p class="text-brand">x</p>')
+
+    def test_invalid_reload_keeps_theme(self) -> None:
+        """Test a malformed theme raises and leaves the converter unchanged."""
+        converter = TailwindEmailConverter()
+        theme = converter.theme
+        with pytest.raises(ValueError):
+            converter.reload_theme({"spacing": {"gutter": None}})
+        assert converter.theme is theme